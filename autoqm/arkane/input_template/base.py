@@ -6,10 +6,28 @@ Copied from https://github.com/xiaoruiDong/easy_rmg_model/blob/master/easy_rmg_m
 """
 
 import os.path
+from functools import lru_cache
 
 from jinja2 import Environment, FileSystemLoader, Template
 
 
+@lru_cache(maxsize=None)
+def get_template(template_str):
+    """
+    Compile a template string once per process.
+    """
+    return Template(template_str, autoescape=True)
+
+
+@lru_cache(maxsize=None)
+def get_template_from_file(template_dir, template_file):
+    """
+    Load and compile a template file once per process.
+    """
+    env = Environment(loader=FileSystemLoader(template_dir), autoescape=True)
+    return env.get_template(template_file)
+
+
 class BaseTemplateWriter(object):
     """
     This is a base class for all template writer.
@@ -28,11 +46,12 @@ class BaseTemplateWriter(object):
     @property
     def template(self):
         if self.template_file:
-            template_dir, template_file = os.path.split(self.template_path)
-            env = Environment(loader=FileSystemLoader(template_dir), autoescape=True)
-            template = env.get_template(template_file)
+            template_dir, template_file = os.path.split(
+                os.path.abspath(self.template_file)
+            )
+            template = get_template_from_file(template_dir, template_file)
         else:
-            template = Template(self.default_template, autoescape=True)
+            template = get_template(self.default_template)
         return template
 
     @property
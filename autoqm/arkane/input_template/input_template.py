@@ -6,6 +6,7 @@ Copied from https://github.com/xiaoruiDong/easy_rmg_model/blob/master/easy_rmg_m
 """
 
 import json
+from functools import lru_cache
 
 from arkane.encorr.corr import assign_frequency_scale_factor
 from arkane.input import process_model_chemistry
@@ -14,6 +15,22 @@ from arkane.modelchem import LOT
 from .base import BaseTemplateWriter
 
 
+@lru_cache(maxsize=None)
+def get_model_chemistry(model_chemistry):
+    """
+    Memoized ``process_model_chemistry``, as the same model chemistry is used for all species.
+    """
+    return process_model_chemistry(model_chemistry)
+
+
+@lru_cache(maxsize=None)
+def get_freq_scale_factor(level_of_theory):
+    """
+    Memoized ``assign_frequency_scale_factor`` for a level of theory.
+    """
+    return assign_frequency_scale_factor(level_of_theory)
+
+
 class ArkaneSpecies(BaseTemplateWriter):
 
     default_settings = {
@@ -85,16 +102,14 @@ rotors = [
     @model_chemistry.setter
     def model_chemistry(self, value):
         if isinstance(value, str):
-            self._model_chemistry = process_model_chemistry(value)
+            self._model_chemistry = get_model_chemistry(value)
         elif isinstance(value, LOT):
             self._model_chemsitry = value
 
     @property
     def freq_scale_factor(self):
         if not self._freq_scale_factor:
-            self._freq_scale_factor = assign_frequency_scale_factor(
-                self._model_chemistry
-            )
+            self._freq_scale_factor = get_freq_scale_factor(self._model_chemistry)
         return self._freq_scale_factor
 
     @freq_scale_factor.setter
@@ -248,16 +263,14 @@ thermo("{{ species_label }}",
     @model_chemistry.setter
     def model_chemistry(self, value):
         if isinstance(value, str):
-            self._model_chemistry = process_model_chemistry(value)
+            self._model_chemistry = get_model_chemistry(value)
         elif isinstance(value, LOT):
             self._model_chemsitry = value
 
     @property
     def freq_scale_factor(self):
         if not self._freq_scale_factor:
-            self._freq_scale_factor = assign_frequency_scale_factor(
-                self._model_chemistry
-            )
+            self._freq_scale_factor = get_freq_scale_factor(self._model_chemistry)
         return self._freq_scale_factor
 
     @freq_scale_factor.setter
@@ -297,6 +310,58 @@ thermo("{{ species_label }}",
         }
 
 
+class ArkaneThermoBatch(ArkaneThermo):
+    """
+    Thermo input for many species at once, with ``species_list`` of
+    ``(species_label, species_file, species_smiles)``.
+    """
+
+    default_settings = {
+        "model_chemistry": "cbs-qb3",
+        "freq_scale_factor": None,
+        "use_bond_corrections": True,
+        "use_hindered_rotors": True,
+        "species_list": [],
+        "thermo_type": "NASA",
+        "calc_statmech": True,
+        "template_file": None,
+        "save_path": "./input.py",
+    }
+
+    default_template = """#!/usr/bin/env python3
+# encoding: utf-8
+
+modelChemistry = "{{ model_chemistry }}"
+frequencyScaleFactor = {{ freq_scale_factor }}
+useHinderedRotors = {{ use_hindered_rotors }}
+useBondCorrections = {{ use_bond_corrections }}
+
+{% for species_label, species_file, species_smiles in species_list %}
+species("{{ species_label }}",
+        "{{ species_file }}",
+        structure=SMILES("{{ species_smiles }}"),
+        )
+{%- if calc_statmech %}
+statmech("{{ species_label }}")
+{%- endif %}
+thermo("{{ species_label }}",
+       "{{ thermo_type }}")
+{% endfor %}
+"""
+
+    def to_dict(self):
+        return {
+            "model_chemistry": self.model_chemistry.to_model_chem(),
+            "freq_scale_factor": self.freq_scale_factor,
+            "use_bond_corrections": self.use_bond_corrections,
+            "use_hindered_rotors": self.use_hindered_rotors,
+            "species_list": self.species_list,
+            "thermo_type": self.thermo_type,
+            "calc_statmech": self.calc_statmech,
+            "save_path": self.save_path,
+        }
+
+
 class ArkaneKinetics(BaseTemplateWriter):
 
     default_settings = {
@@ -362,16 +427,14 @@ kinetics(
     @model_chemistry.setter
     def model_chemistry(self, value):
         if isinstance(value, str):
-            self._model_chemistry = process_model_chemistry(value)
+            self._model_chemistry = get_model_chemistry(value)
         elif isinstance(value, LOT):
             self._model_chemsitry = value
 
     @property
     def freq_scale_factor(self):
         if not self._freq_scale_factor:
-            self._freq_scale_factor = assign_frequency_scale_factor(
-                self._model_chemistry
-            )
+            self._freq_scale_factor = get_freq_scale_factor(self._model_chemistry)
         return self._freq_scale_factor
 
     @freq_scale_factor.setter
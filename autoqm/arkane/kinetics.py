@@ -3,10 +3,10 @@
 
 import os
 import shutil
-import subprocess
 
-from .input_template.input_template import Arkanekinetics
+from .input_template.input_template import ArkaneKinetics
 from .species import make_arkane_species_input_file
+from .utils import run_arkane
 
 
 def run_arkane_kinetics(
@@ -18,7 +18,9 @@ def run_arkane_kinetics(
     subinputs_dir,
     suboutputs_dir,
     scratch_dir,
-    RMG_path,
+    RMG_path=None,
+    symmetry_cache_dir=None,
+    in_process=True,
 ):
     # current dir
     current_dir = os.getcwd()
@@ -30,48 +32,56 @@ def run_arkane_kinetics(
     # move to scratch dir
     os.chdir(scratch_dir)
 
-    # make arkane input file for reactants and products
-    for spc in ["r1", "r2", "p1", "p2"]:
-        spc_smi = df.loc[row_index, f"{spc}_smi"]
-        spc_xyz = df.loc[row_index, f"{spc}_dft_xyz"]
-        spc_freq_path = df.loc[row_index, f"{spc}_freq_path"]
-        spc_sp_path = df.loc[row_index, f"{spc}_sp_path"]
-        make_arkane_species_input_file(
-            spc_smi,
-            spc_xyz,
-            spc_freq_path,
-            spc_sp_path,
+    try:
+        # make arkane input file for reactants and products
+        for spc in ["r1", "r2", "p1", "p2"]:
+            spc_smi = df.loc[row_index, f"{spc}_smi"]
+            spc_xyz = df.loc[row_index, f"{spc}_dft_xyz"]
+            spc_freq_path = df.loc[row_index, f"{spc}_freq_path"]
+            spc_sp_path = df.loc[row_index, f"{spc}_sp_path"]
+            make_arkane_species_input_file(
+                spc_smi,
+                spc_xyz,
+                spc_freq_path,
+                spc_sp_path,
+                model_chemistry,
+                use_bond_corrections=False,
+                arkane_species_input_path=f"{spc}.py",
+                symmetry_cache_dir=symmetry_cache_dir,
+            )
+        ts_xyz = df.loc[row_index, "ts_dft_xyz"]
+        ts_freq_path = df.loc[row_index, "ts_freq_path"]
+        ts_sp_path = df.loc[row_index, "ts_sp_path"]
+        make_arkane_reaction_kinetics_input_files(
+            rxn_smi,
+            ts_xyz,
+            ts_freq_path,
+            ts_sp_path,
             model_chemistry,
-            use_bond_corrections=False,
-            arkane_species_input_path=f"{spc}.py",
+            symmetry_cache_dir=symmetry_cache_dir,
         )
-    ts_xyz = df.loc[row_index, "ts_dft_xyz"]
-    ts_freq_path = df.loc[row_index, "ts_freq_path"]
-    ts_sp_path = df.loc[row_index, "ts_sp_path"]
-    make_arkane_reaction_kinetics_input_files(
-        rxn_smi, ts_xyz, ts_freq_path, ts_sp_path, model_chemistry
-    )
 
-    # run arkane
-    subprocess.run(f"python {RMG_path}/Arkane.py input.py", shell=True)
+        # run arkane
+        run_arkane("input.py", RMG_path=RMG_path, in_process=in_process)
 
-    # move kinetics file to suboutputs dir
-    kinetics_file = os.path.join("RMG_libraries", "reactions.py")
-    shutil.copyfile(kinetics_file, os.path.join(suboutputs_dir, f"{ts_id}.py"))
+        # move kinetics file to suboutputs dir
+        kinetics_file = os.path.join("RMG_libraries", "reactions.py")
+        shutil.copyfile(kinetics_file, os.path.join(suboutputs_dir, f"{ts_id}.py"))
 
-    # remove dummy input file
-    tmp_input_file = os.path.join(subinputs_dir, f"{ts_id}.tmp")
-    os.remove(tmp_input_file)
+        # remove dummy input file
+        tmp_input_file = os.path.join(subinputs_dir, f"{ts_id}.tmp")
+        os.remove(tmp_input_file)
 
-    # move back to current dir
-    os.chdir(current_dir)
+    finally:
+        # move back to current dir
+        os.chdir(current_dir)
 
-    # remove scratch dir
-    shutil.rmtree(scratch_dir)
+        # remove scratch dir
+        shutil.rmtree(scratch_dir)
 
 
 def make_arkane_reaction_kinetics_input_files(
-    rxn_smi, ts_xyz, ts_freq_path, ts_sp_path, model_chemistry
+    rxn_smi, ts_xyz, ts_freq_path, ts_sp_path, model_chemistry, symmetry_cache_dir=None
 ):
 
     # make arkane input file for TS
@@ -85,6 +95,7 @@ def make_arkane_reaction_kinetics_input_files(
         model_chemistry,
         use_bond_corrections=False,
         arkane_species_input_path="TS.py",
+        symmetry_cache_dir=symmetry_cache_dir,
     )
 
     reactants = {f"r{i}": f"r{i}.py" for i in range(1, 3)}
@@ -100,4 +111,4 @@ def make_arkane_reaction_kinetics_input_files(
         "save_path": arkane_kinetics_input_file,
     }
 
-    Arkanekinetics(arkane_kinetics_settings).save()
+    ArkaneKinetics(arkane_kinetics_settings).save()
@@ -25,6 +25,7 @@ def make_arkane_species_input_file(
     model_chemistry,
     use_bond_corrections=True,
     arkane_species_input_path="species.py",
+    symmetry_cache_dir=None,
 ):
     # make RDKit molecule
     rdmc_mol = RDKitMol.FromSmiles(smi)
@@ -55,7 +56,9 @@ def make_arkane_species_input_file(
     linear = is_linear(coordinates=coords)
 
     # get external symmetry and optical isomers
-    external_symmetry, optical_isomers = determine_symmetry(symbols, coords)
+    external_symmetry, optical_isomers = determine_symmetry(
+        symbols, coords, cache_dir=symmetry_cache_dir
+    )
     new_optical_isomers = get_optical_isomers(rdkit_mol, smi)
     if new_optical_isomers is not None:
         if new_optical_isomers >= 1:
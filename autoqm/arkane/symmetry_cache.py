@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# encoding: utf-8
+
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+
+
+def get_geometry_hash(coords, atom_numbers, decimals=3):
+    """
+    Hash of a geometry that does not depend on the atom order, orientation or position,
+    built from the atomic numbers and the rounded interatomic distances of each atom pair.
+    """
+    coords = np.asarray(coords, dtype=float)
+    atom_numbers = np.asarray(atom_numbers, dtype=int)
+    i, j = np.triu_indices(len(atom_numbers), k=1)
+    distances = np.round(np.linalg.norm(coords[i] - coords[j], axis=1), decimals)
+    pairs = sorted(
+        zip(
+            np.minimum(atom_numbers[i], atom_numbers[j]).tolist(),
+            np.maximum(atom_numbers[i], atom_numbers[j]).tolist(),
+            distances.tolist(),
+        )
+    )
+    key = repr((sorted(atom_numbers.tolist()), pairs))
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+def load_symmetry_cache(cache_dir, geometry_hash):
+    """
+    Load the symmetry number and optical isomers of a geometry from the on-disk symmetry cache.
+    """
+    cache_path = os.path.join(cache_dir, geometry_hash[:2], f"{geometry_hash}.json")
+    try:
+        with open(cache_path, "r") as f:
+            cache = json.load(f)
+        return cache["symmetry"], cache["optical_isomers"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def save_symmetry_cache(cache_dir, geometry_hash, symmetry, optical_isomers):
+    """
+    Save the symmetry number and optical isomers of a geometry to the on-disk symmetry cache.
+    The file is written to a temporary file first and renamed, so that concurrent workers
+    never read a partially written file.
+    """
+    cache_subdir = os.path.join(cache_dir, geometry_hash[:2])
+    os.makedirs(cache_subdir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=cache_subdir, suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        json.dump({"symmetry": symmetry, "optical_isomers": optical_isomers}, f)
+    os.replace(tmp_path, os.path.join(cache_subdir, f"{geometry_hash}.json"))
@@ -3,10 +3,10 @@
 
 import os
 import shutil
-import subprocess
 
-from .input_template.input_template import ArkaneThermo
+from .input_template.input_template import ArkaneThermo, ArkaneThermoBatch
 from .species import make_arkane_species_input_file
+from .utils import run_arkane
 
 
 def run_arkane_thermo(
@@ -18,7 +18,9 @@ def run_arkane_thermo(
     subinputs_dir,
     suboutputs_dir,
     scratch_dir,
-    RMG_path,
+    RMG_path=None,
+    symmetry_cache_dir=None,
+    in_process=True,
 ):
     # current dir
     current_dir = os.getcwd()
@@ -30,34 +32,126 @@ def run_arkane_thermo(
     # move to scratch dir
     os.chdir(scratch_dir)
 
-    # make arkane species and thermo input files
-    xyz = df.loc[row_index, "dft_xyz"]
-    freq_path = df.loc[row_index, "freq_path"]
-    sp_path = df.loc[row_index, "sp_path"]
-    make_arkane_species_thermo_input_files(
-        mol_id, smi, xyz, freq_path, sp_path, model_chemistry, use_bond_corrections=True
-    )
-
-    # run arkane
-    subprocess.run(f"python {RMG_path}/Arkane.py input.py", shell=True)
-
-    # move thermo file to suboutputs dir
-    thermo_file = os.path.join("RMG_libraries", "thermo.py")
-    shutil.copyfile(thermo_file, os.path.join(suboutputs_dir, f"{mol_id}_thermo.py"))
+    try:
+        # make arkane species and thermo input files
+        xyz = df.loc[row_index, "dft_xyz"]
+        freq_path = df.loc[row_index, "freq_path"]
+        sp_path = df.loc[row_index, "sp_path"]
+        make_arkane_species_thermo_input_files(
+            mol_id,
+            smi,
+            xyz,
+            freq_path,
+            sp_path,
+            model_chemistry,
+            use_bond_corrections=True,
+            symmetry_cache_dir=symmetry_cache_dir,
+        )
+
+        # run arkane
+        run_arkane("input.py", RMG_path=RMG_path, in_process=in_process)
+
+        # move thermo file to suboutputs dir
+        thermo_file = os.path.join("RMG_libraries", "thermo.py")
+        shutil.copyfile(
+            thermo_file, os.path.join(suboutputs_dir, f"{mol_id}_thermo.py")
+        )
+
+        # remove dummy input file
+        tmp_input_file = os.path.join(subinputs_dir, f"{mol_id}.tmp")
+        os.remove(tmp_input_file)
+
+    finally:
+        # move back to current dir
+        os.chdir(current_dir)
+
+        # remove scratch dir
+        shutil.rmtree(scratch_dir)
+
+
+def run_arkane_thermo_batch(
+    batch_id,
+    mol_ids,
+    smis,
+    row_indices,
+    df,
+    model_chemistry,
+    subinputs_dir,
+    suboutputs_dir,
+    scratch_dir,
+    symmetry_cache_dir=None,
+):
+    """
+    Run the thermo of many species with one Arkane input in the current interpreter.
+    The thermo library of the batch is saved as ``batch_{batch_id}_thermo.py`` with one
+    entry labeled by ``mol_id`` per species.
+    """
+    # current dir
+    current_dir = os.getcwd()
 
-    # remove dummy input file
-    tmp_input_file = os.path.join(subinputs_dir, f"{mol_id}.tmp")
-    os.remove(tmp_input_file)
+    # make scratch dir
+    scratch_dir = os.path.join(scratch_dir, f"batch_{batch_id}")
+    os.makedirs(scratch_dir)
 
-    # move back to current dir
-    os.chdir(current_dir)
+    # move to scratch dir
+    os.chdir(scratch_dir)
 
-    # remove scratch dir
-    shutil.rmtree(scratch_dir)
+    try:
+        # make arkane species input files
+        species_list = []
+        for mol_id, smi, row_index in zip(mol_ids, smis, row_indices):
+            arkane_species_input_path = make_arkane_species_input_file(
+                smi,
+                df.loc[row_index, "dft_xyz"],
+                df.loc[row_index, "freq_path"],
+                df.loc[row_index, "sp_path"],
+                model_chemistry,
+                use_bond_corrections=True,
+                arkane_species_input_path=f"{mol_id}.py",
+                symmetry_cache_dir=symmetry_cache_dir,
+            )
+            species_list.append((mol_id, arkane_species_input_path, smi))
+
+        # make arkane thermo input file
+        arkane_thermo_input_file = "input.py"
+        arkane_thermo_settings = {
+            "model_chemistry": model_chemistry,
+            "use_bond_corrections": True,
+            "species_list": species_list,
+            "save_path": arkane_thermo_input_file,
+        }
+        ArkaneThermoBatch(arkane_thermo_settings).save()
+
+        # run arkane
+        run_arkane(arkane_thermo_input_file, in_process=True)
+
+        # move thermo file to suboutputs dir
+        thermo_file = os.path.join("RMG_libraries", "thermo.py")
+        shutil.copyfile(
+            thermo_file, os.path.join(suboutputs_dir, f"batch_{batch_id}_thermo.py")
+        )
+
+        # remove dummy input files
+        for mol_id in mol_ids:
+            os.remove(os.path.join(subinputs_dir, f"{mol_id}.tmp"))
+
+    finally:
+        # move back to current dir
+        os.chdir(current_dir)
+
+        # remove scratch dir
+        shutil.rmtree(scratch_dir)
 
 
 def make_arkane_species_thermo_input_files(
-    mol_id, smi, xyz, freq_path, sp_path, model_chemistry, use_bond_corrections=True
+    mol_id,
+    smi,
+    xyz,
+    freq_path,
+    sp_path,
+    model_chemistry,
+    use_bond_corrections=True,
+    symmetry_cache_dir=None,
 ):
 
     arkane_species_input_path = make_arkane_species_input_file(
@@ -67,6 +161,7 @@ def make_arkane_species_thermo_input_files(
         sp_path,
         model_chemistry,
         use_bond_corrections=use_bond_corrections,
+        symmetry_cache_dir=symmetry_cache_dir,
     )
 
     # make arkane thermo input file
@@ -1,7 +1,9 @@
 #!/usr/bin/env python3
 # encoding: utf-8
 
-import numpy as np
+import logging
+import os
+import subprocess
 
 from rdkit.Chem.EnumerateStereoisomers import (
     EnumerateStereoisomers,
@@ -11,10 +13,18 @@ from rdkit.Chem.EnumerateStereoisomers import (
 
 from rmgpy.qm.qmdata import QMData
 from rmgpy.molecule.molecule import Molecule
-from rmgpy.molecule.element import get_element
 from rmgpy.qm.symmetry import PointGroupCalculator
 from rmgpy.molecule.resonance import generate_kekule_structure
 
+from .symmetry_cache import (
+    get_geometry_hash,
+    load_symmetry_cache,
+    save_symmetry_cache,
+)
+
+from autoqm.parser.elements import symbols_to_atomic_numbers
+from autoqm.parser.utils import parse_xyz
+
 
 def enumerate_bonds(rmg_mol):
     """
@@ -28,24 +38,19 @@ def enumerate_bonds(rmg_mol):
 
 
 def get_symbols_and_coords(xyz):
-    lines = xyz.splitlines()
-    symbols = list()
-    coords = list()
-    for line in lines:
-        if line.strip():
-            symbol, x, y, z = line.split()
-            symbols.append(symbol)
-            coords.append([float(x), float(y), float(z)])
-    return symbols, np.array(coords)
-
-
-def determine_symmetry(symbols, coords):
+    return parse_xyz(xyz)
+
+
+def determine_symmetry(symbols, coords, cache_dir=None):
     """
     Modified from ARC
     """
-    atom_numbers = list()
-    for symbol in symbols:
-        atom_numbers.append(get_element(symbol).number)
+    atom_numbers = symbols_to_atomic_numbers(symbols).tolist()
+    if cache_dir is not None:
+        geometry_hash = get_geometry_hash(coords, atom_numbers)
+        cached = load_symmetry_cache(cache_dir, geometry_hash)
+        if cached is not None:
+            return cached
     # Coords is an N x 3 numpy.ndarray of atomic coordinates in the same order as `atom_numbers`.
     unique_id = "0"  # Just some name that the SYMMETRY code gives to one of its jobs.
     scr_dir = os.path.join(
@@ -69,6 +74,8 @@ def determine_symmetry(symbols, coords):
     if pg is not None:
         symmetry = pg.symmetry_number
         optical_isomers = 2 if pg.chiral else optical_isomers
+        if cache_dir is not None:
+            save_symmetry_cache(cache_dir, geometry_hash, symmetry, optical_isomers)
     return symmetry, optical_isomers
 
 
@@ -92,3 +99,31 @@ def get_optical_isomers(rdkit_mol, smi):
     else:
         num_chiral = 1
     return num_chiral
+
+
+def run_arkane_in_process(input_path, output_dir):
+    """
+    Run an Arkane input file in the current interpreter, so that a long-lived worker only
+    imports RMG once instead of once per species or reaction.
+    """
+    from arkane.main import Arkane
+
+    root_logger = logging.getLogger()
+    handlers = list(root_logger.handlers)
+    try:
+        arkane = Arkane(input_file=input_path, output_directory=output_dir)
+        arkane.execute()
+    finally:
+        # Arkane adds its own log handlers on every run
+        for handler in root_logger.handlers[:]:
+            if handler not in handlers:
+                root_logger.removeHandler(handler)
+                handler.close()
+    return arkane
+
+
+def run_arkane(input_path, output_dir=".", RMG_path=None, in_process=True):
+    if in_process:
+        run_arkane_in_process(input_path, output_dir)
+    else:
+        subprocess.run(f"python {RMG_path}/Arkane.py {input_path}", shell=True)
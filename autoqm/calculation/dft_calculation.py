@@ -5,7 +5,9 @@ import shutil
 from rdkit import Chem
 import copy
 import csv
+import gzip
 import os
+import re
 import subprocess
 import numpy as np
 import time
@@ -27,7 +29,16 @@ def dft_scf_qm_descriptor(
     scratch_dir,
     subinputs_dir,
     suboutputs_dir,
+    chk_path=None,
+    merged_template=None,
 ):
+    """
+    Run the QM descriptor calculations. If ``chk_path`` points to the (optionally gzipped)
+    checkpoint file of the DFT optimization, it is used as ``{guess}`` = ``guess=read``
+    in the template so that the SCF starts from the converged wavefunction. In that case,
+    ``merged_template`` (e.g. templates/qm_des_merged.txt), which runs the NMR and the NBO
+    population analysis in one step, is used instead of ``template`` if given.
+    """
 
     current_dir = Path.cwd()
 
@@ -53,9 +64,21 @@ def dft_scf_qm_descriptor(
 
     os.chdir(job_tmp_output_dir)
 
+    guess = ""
+    if chk_path is not None:
+        if load_chk(chk_path, job_tmp_output_dir / f"{job_id}.chk"):
+            logging.info(f"Reading initial guess from {chk_path}...")
+            guess = "guess=read"
+            if merged_template is not None:
+                template = merged_template
+        else:
+            logging.info(f"{chk_path} not found. Starting from a fresh SCF...")
+
     g16_command = os.path.join(g16_path, "g16")
     xyz_str = clean_xyz_str(xyz_str)
-    content = template.format(job_id=job_id, charge=charge, mult=mult, xyz_str=xyz_str)
+    content = template.format(
+        job_id=job_id, charge=charge, mult=mult, xyz_str=xyz_str, guess=guess
+    )
 
     comfile = Path(f"{job_id}.gjf").absolute()
     logfile = Path(f"{job_id}.log").absolute()
@@ -114,7 +137,22 @@ def dft_scf_opt(
     scratch_dir,
     subinputs_dir,
     suboutputs_dir,
+    chk_dir=None,
+    restart_mode="geom_check",
+    compress_chk=False,
+    max_chk_size=None,
 ):
+    """
+    Run a Gaussian DFT optimization in the scratch directory.
+
+    If ``chk_dir`` is given, Gaussian writes the checkpoint file directly to ``chk_dir``
+    instead of the scratch directory, so that it survives a killed job. If a checkpoint
+    from an interrupted attempt is found there, the job is resumed from it instead of
+    starting again from ``job_xyz``. ``restart_mode`` is either ``geom_check``
+    (``geom=check guess=read``) or ``opt_restart`` (``opt=restart``). After the job ends,
+    the checkpoint of a failed job is removed, and the checkpoint of a converged job is kept
+    (gzipped if ``compress_chk``) unless it is larger than ``max_chk_size`` MB.
+    """
     current_dir = os.getcwd()
 
     job_scratch_dir = os.path.join(scratch_dir, f"{job_id}")
@@ -123,14 +161,39 @@ def dft_scf_opt(
     os.makedirs(job_scratch_dir)
     os.chdir(job_scratch_dir)
 
+    if chk_dir is not None:
+        chkfile = os.path.abspath(os.path.join(chk_dir, f"{job_id}.chk"))
+    else:
+        chkfile = f"{job_id}.chk"
+
+    restart = chk_dir is not None and os.path.exists(chkfile)
+    if restart:
+        print(f"Found checkpoint file {chkfile}. Resuming {job_id} from checkpoint...")
+        level_of_theory = get_restart_level_of_theory(level_of_theory, restart_mode)
+
     g16_command = os.path.join(g16_path, "g16")
-    head = "%chk={}.chk\n%nprocshared={}\n%mem={}mb\n{}\n".format(
-        job_id, n_procs, job_ram, level_of_theory
+    head = "%chk={}\n%nprocshared={}\n%mem={}mb\n{}\n".format(
+        chkfile, n_procs, job_ram, level_of_theory
     )
 
     comfile = f"{job_id}.gjf"
-    xyz2com(job_xyz, head=head, comfile=comfile, charge=charge, mult=mult, footer="\n")
-    shutil.copyfile(comfile, os.path.join(suboutputs_dir, f"{job_id}.gjf"))
+    if not restart:
+        xyz2com(
+            job_xyz, head=head, comfile=comfile, charge=charge, mult=mult, footer="\n"
+        )
+        shutil.copyfile(comfile, os.path.join(suboutputs_dir, f"{job_id}.gjf"))
+    else:
+        if restart_mode == "opt_restart":
+            # everything else is read from the checkpoint file
+            with open(comfile, "w") as com:
+                com.write(head)
+                com.write("\n\n")
+        else:
+            # geometry is read from the checkpoint file
+            xyz2com(
+                "", head=head, comfile=comfile, charge=charge, mult=mult, footer="\n"
+            )
+        shutil.copyfile(comfile, os.path.join(suboutputs_dir, f"{job_id}_restart.gjf"))
 
     logfile = f"{job_id}.log"
     outfile = f"{job_id}.out"
@@ -158,12 +221,96 @@ def dft_scf_opt(
 
     job_stat = check_job_status(read_log_file(logfile))
 
+    if chk_dir is not None:
+        save_chk(
+            chkfile, job_stat, compress_chk=compress_chk, max_chk_size=max_chk_size
+        )
+
     os.chdir(current_dir)
     shutil.rmtree(job_scratch_dir)
 
     return job_stat
 
 
+def get_restart_level_of_theory(level_of_theory, restart_mode="geom_check"):
+    """
+    Modify the route section of a Gaussian job to resume it from its checkpoint file.
+    """
+    level_of_theory = re.sub(
+        r"\s(guess|geom)=(\([^)]*\)|\S+)", "", level_of_theory, flags=re.IGNORECASE
+    )
+    if restart_mode == "geom_check":
+        return f"{level_of_theory} geom=check guess=read"
+    elif restart_mode == "opt_restart":
+
+        def add_restart(match):
+            if match.group(2) is None:
+                return "opt=restart"
+            options = match.group(2).strip("()")
+            return f"opt=(restart,{options})"
+
+        return re.sub(
+            r"\bopt(=(\([^)]*\)|\S+))?",
+            add_restart,
+            level_of_theory,
+            count=1,
+            flags=re.IGNORECASE,
+        )
+    else:
+        raise ValueError(f"Restart mode {restart_mode} is not supported")
+
+
+def save_chk(chkfile, job_stat, compress_chk=False, max_chk_size=None):
+    """
+    Keep the checkpoint file of a converged job and remove the one of a failed job,
+    so that only interrupted jobs are resumed from their checkpoint file.
+    """
+    if not os.path.exists(chkfile):
+        print(f"{chkfile} not found. Nothing to save.")
+        return None
+
+    if not job_stat:
+        print(f"Removing checkpoint file {chkfile} of failed job...")
+        os.remove(chkfile)
+        return None
+
+    chk_size = os.path.getsize(chkfile) / 1024 / 1024
+    if max_chk_size is not None and chk_size > max_chk_size:
+        print(
+            f"Checkpoint file {chkfile} is {chk_size:.1f} MB, larger than {max_chk_size} MB. Removing..."
+        )
+        os.remove(chkfile)
+        return None
+
+    if compress_chk:
+        with open(chkfile, "rb") as f_in, gzip.open(f"{chkfile}.gz", "wb") as f_out:
+            shutil.copyfileobj(f_in, f_out)
+        os.remove(chkfile)
+        return f"{chkfile}.gz"
+
+    return chkfile
+
+
+def load_chk(chk_path, chkfile):
+    """
+    Copy the checkpoint file saved by ``save_chk`` to ``chkfile``, decompressing it if needed.
+    """
+    chk_path = Path(chk_path)
+    gz_path = chk_path.with_name(f"{chk_path.name}.gz")
+    if chk_path.suffix == ".gz" and chk_path.exists():
+        gz_path = chk_path
+    elif chk_path.exists():
+        shutil.copyfile(chk_path, chkfile)
+        return True
+
+    if not gz_path.exists():
+        return False
+
+    with gzip.open(gz_path, "rb") as f_in, open(chkfile, "wb") as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    return True
+
+
 def dft_scf_sp(
     job_id, g16_path, level_of_theory, n_procs, logger, job_ram, charge, mult
 ):
@@ -9,6 +9,8 @@ from .file_parser import write_mol_to_sdf, load_sdf
 import os
 from rdmc.mol import RDKitMol
 
+from autoqm.parser.connectivity import get_connectivity, same_connectivity
+
 
 # algorithm to generate nc conformations
 def _genConf(
@@ -51,7 +53,7 @@ def _genConf(
         print(f"{len(ids)} embedded for {mol_id}")
 
     diz = []
-    pre_adj = Chem.GetAdjacencyMatrix(mol)
+    pre_connectivity = get_connectivity(mol)
     current_dir = os.getcwd()
 
     for conf_search_FF in conf_search_FFs:
@@ -92,8 +94,8 @@ def _genConf(
                             print(f"Error in {output_file_mol_id} file")
                             raise
                         opt_mol = load_sdf("xtbopt.sdf")[0]
-                        post_adj = Chem.GetAdjacencyMatrix(opt_mol)
-                        if (pre_adj == post_adj).all():
+                        post_connectivity = get_connectivity(opt_mol)
+                        if same_connectivity(pre_connectivity, post_connectivity):
                             opt_conf = opt_mol.GetConformer()
                             conf = mol.GetConformer(id)
                             for i in range(mol.GetNumAtoms()):
@@ -3,6 +3,8 @@ from rdkit.Chem import AllChem
 import numpy as np
 import pandas as pd
 
+from autoqm.parser.utils import format_xyz, parse_xyz
+
 
 def mol2xyz(mol, comment=None):
     c = mol.GetConformers()[0]
@@ -10,8 +12,7 @@ def mol2xyz(mol, comment=None):
     atoms = [a.GetSymbol() for a in mol.GetAtoms()]
 
     xyz = "{}\n{}\n".format(len(atoms), comment)
-    for a, c in zip(atoms, coords):
-        xyz += "{0}     {1:14.9f}    {2:14.9f}    {3:14.9f}\n".format(a, *c)
+    xyz += format_xyz(atoms, coords, row_format="%s     %14.9f    %14.9f    %14.9f\n")
 
     return xyz
 
@@ -57,22 +58,13 @@ def xyz2mol(xyz, smiles):
 
 
 def xyz2com(xyz, head, footer, comfile, charge=0, mult=1, title="Title"):
-    coords = [x for x in xyz.splitlines()]
-    new_coords = []
-
-    for coord in coords:
-        symbol, x, y, z = coord.split()
-        new_coords.append(
-            "{} {:.6f} {:.6f} {:.6f}\n".format(symbol, float(x), float(y), float(z))
-        )
-
     with open(comfile, "w") as com:
         com.write(head)
         com.write("\n")
         com.write(title + "\n")
         com.write("\n")
         com.write("{} {}\n".format(charge, mult))
-        com.writelines(new_coords)
+        com.write(clean_xyz_str(xyz))
         com.write("\n")
         com.write(footer)
         com.write("\n\n\n")
@@ -106,13 +98,4 @@ def load_sdf(path, removeHs=False, sanitize=False):
 
 
 def clean_xyz_str(xyz_str):
-    coords = [x for x in xyz_str.splitlines()]
-    new_coords = []
-
-    for coord in coords:
-        symbol, x, y, z = coord.split()
-        new_coords.append(
-            "{} {:.6f} {:.6f} {:.6f}\n".format(symbol, float(x), float(y), float(z))
-        )
-
-    return "".join(new_coords)
+    return format_xyz(*parse_xyz(xyz_str), row_format="%s %.6f %.6f %.6f\n")
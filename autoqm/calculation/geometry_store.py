@@ -0,0 +1,105 @@
+import io
+import os
+
+import pandas as pd
+from rdkit import Chem
+
+INDEX_COLUMNS = ["id", "offset", "length", "valid"]
+
+
+def get_store_paths(store_dir, shard_id, prefix="rxns"):
+    """
+    Paths of the append-only sdf of a shard and of its offset index.
+    """
+    sdf_path = os.path.join(store_dir, f"{prefix}_{shard_id}.sdf")
+    index_path = os.path.join(store_dir, f"{prefix}_{shard_id}_index.csv")
+    return sdf_path, index_path
+
+
+def mols_to_sdf_block(mols):
+    sio = io.StringIO()
+    writer = Chem.rdmolfiles.SDWriter(sio)
+    for mol in mols:
+        writer.write(mol)
+    writer.close()
+    return sio.getvalue()
+
+
+def append_records(store_dir, shard_id, records, prefix="rxns"):
+    """
+    Append ``(id, mols, valid)`` records to the sdf of a shard and their byte offsets to its
+    index. The sdf is written and flushed before the index, so that every indexed record is
+    complete even if the writer is interrupted. Each shard must only be written by one worker.
+    """
+    os.makedirs(store_dir, exist_ok=True)
+    sdf_path, index_path = get_store_paths(store_dir, shard_id, prefix=prefix)
+
+    index_rows = []
+    with open(sdf_path, "ab") as f:
+        for record_id, mols, valid in records:
+            block = mols_to_sdf_block(mols).encode()
+            index_rows.append((record_id, f.tell(), len(block), valid))
+            f.write(block)
+        f.flush()
+        os.fsync(f.fileno())
+
+    write_header = not os.path.exists(index_path)
+    pd.DataFrame(index_rows, columns=INDEX_COLUMNS).to_csv(
+        index_path, mode="a", header=write_header, index=False
+    )
+
+
+def load_index(store_dir, shard_id, prefix="rxns"):
+    _, index_path = get_store_paths(store_dir, shard_id, prefix=prefix)
+    if not os.path.exists(index_path):
+        return pd.DataFrame(columns=INDEX_COLUMNS)
+    return pd.read_csv(index_path)
+
+
+def get_shard_ids(store_dir, prefix="rxns"):
+    if not os.path.exists(store_dir):
+        return []
+    suffix = "_index.csv"
+    return sorted(
+        int(file_name[len(prefix) + 1 : -len(suffix)])
+        for file_name in os.listdir(store_dir)
+        if file_name.startswith(f"{prefix}_") and file_name.endswith(suffix)
+    )
+
+
+def sdf_block_to_mols(block, sanitize=False, removeHs=False):
+    supplier = Chem.SDMolSupplier()
+    supplier.SetData(block, sanitize=sanitize, removeHs=removeHs)
+    return [mol for mol in supplier]
+
+
+def iter_records(
+    store_dir, shard_id, ids=None, only_valid=False, prefix="rxns", **kwargs
+):
+    """
+    Yield the ``(id, mols)`` records of a shard with one sequential read of its sdf.
+    Only the records of ``ids`` are parsed if given.
+    """
+    sdf_path, _ = get_store_paths(store_dir, shard_id, prefix=prefix)
+    index_df = load_index(store_dir, shard_id, prefix=prefix)
+    if only_valid:
+        index_df = index_df[index_df["valid"]]
+    if ids is not None:
+        index_df = index_df[index_df["id"].isin(ids)]
+    if index_df.empty:
+        return
+
+    with open(sdf_path, "rb") as f:
+        data = f.read()
+    for record_id, offset, length in index_df[["id", "offset", "length"]].itertuples(
+        index=False, name=None
+    ):
+        block = data[offset : offset + length].decode()
+        yield record_id, sdf_block_to_mols(block, **kwargs)
+
+
+def get_stored_ids(store_dir, prefix="rxns"):
+    stored_ids = set()
+    for shard_id in get_shard_ids(store_dir, prefix=prefix):
+        stored_ids.update(load_index(store_dir, shard_id, prefix=prefix)["id"])
+    return stored_ids
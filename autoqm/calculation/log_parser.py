@@ -2,132 +2,12 @@ import os, sys
 import re
 import numpy as np
 
-periodictable = [
-    "",
-    "H",
-    "He",
-    "Li",
-    "Be",
-    "B",
-    "C",
-    "N",
-    "O",
-    "F",
-    "Ne",
-    "Na",
-    "Mg",
-    "Al",
-    "Si",
-    "P",
-    "S",
-    "Cl",
-    "Ar",
-    "K",
-    "Ca",
-    "Sc",
-    "Ti",
-    "V",
-    "Cr",
-    "Mn",
-    "Fe",
-    "Co",
-    "Ni",
-    "Cu",
-    "Zn",
-    "Ga",
-    "Ge",
-    "As",
-    "Se",
-    "Br",
-    "Kr",
-    "Rb",
-    "Sr",
-    "Y",
-    "Zr",
-    "Nb",
-    "Mo",
-    "Tc",
-    "Ru",
-    "Rh",
-    "Pd",
-    "Ag",
-    "Cd",
-    "In",
-    "Sn",
-    "Sb",
-    "Te",
-    "I",
-    "Xe",
-    "Cs",
-    "Ba",
-    "La",
-    "Ce",
-    "Pr",
-    "Nd",
-    "Pm",
-    "Sm",
-    "Eu",
-    "Gd",
-    "Tb",
-    "Dy",
-    "Ho",
-    "Er",
-    "Tm",
-    "Yb",
-    "Lu",
-    "Hf",
-    "Ta",
-    "W",
-    "Re",
-    "Os",
-    "Ir",
-    "Pt",
-    "Au",
-    "Hg",
-    "Tl",
-    "Pb",
-    "Bi",
-    "Po",
-    "At",
-    "Rn",
-    "Fr",
-    "Ra",
-    "Ac",
-    "Th",
-    "Pa",
-    "U",
-    "Np",
-    "Pu",
-    "Am",
-    "Cm",
-    "Bk",
-    "Cf",
-    "Es",
-    "Fm",
-    "Md",
-    "No",
-    "Lr",
-    "Rf",
-    "Db",
-    "Sg",
-    "Bh",
-    "Hs",
-    "Mt",
-    "Ds",
-    "Rg",
-    "Uub",
-    "Uut",
-    "Uuq",
-    "Uup",
-    "Uuh",
-    "Uus",
-    "Uuo",
-]
+from autoqm.parser.elements import SYMBOLS
 
 
 def elementID(massno):
-    if massno < len(periodictable):
-        return periodictable[massno]
+    if massno < len(SYMBOLS):
+        return str(SYMBOLS[massno])
     else:
         return "XX"
 
@@ -636,6 +516,12 @@ class G16Log:
             self.lumo = lumo
 
 
+XTB_TOTAL_ENERGY_RE = re.compile(r"TOTAL ENERGY\s+(-?\d+\.\d+)")
+XTB_TOTAL_FREE_ENERGY_RE = re.compile(r"TOTAL FREE ENERGY\s+(-?\d+\.\d+)")
+XTB_FREQ_RE = re.compile(r"\s+(-?\d+\.\d+)")
+XTB_IR_INTENSITY_RE = re.compile(r"\d+:\s+(\d+\.\d+)")
+
+
 class XtbLog:
     def __init__(self, file):
         # default values for thermochemical calculations
@@ -645,81 +531,63 @@ class XtbLog:
         self.file = file
         self.name = os.path.basename(file)
 
-        self.GetTermination()
-        if not self.termination:
-            pass
-            # self.GetError()
-        else:
-            try:
-                self.GetFreq()
-            except:
-                pass
-            self.GetE()
+        self.ParseLog()
 
-    def GetTermination(self):
+    def ParseLog(self):
+        """
+        Parse the termination, total energy, total free energy, frequencies and IR
+        intensities in a single pass over the log. The last energies are kept, and only
+        the first frequency printout is read.
+        """
+        self.termination = False
+        E, G = None, None
+        waveNums, intensities = [], []
+
+        section = None
         with open(self.file) as fh:
             for line in fh:
-                if (
-                    line.find("normal termination") > -1
-                    and not line.find("abnormal termination") > -1
+                if section == "freq":
+                    if "reduced masses" in line:
+                        section = "before_ir"
+                    else:
+                        waveNums.extend(XTB_FREQ_RE.findall(line))
+                elif section == "before_ir":
+                    if "IR intensities" in line:
+                        section = "ir"
+                elif section == "ir":
+                    if "Raman intensities" in line:
+                        section = "done"
+                    else:
+                        intensities.extend(XTB_IR_INTENSITY_RE.findall(line))
+
+                if "TOTAL" in line:
+                    m = XTB_TOTAL_ENERGY_RE.search(line)
+                    if m:
+                        E = float(m[1])
+                        continue
+                    m = XTB_TOTAL_FREE_ENERGY_RE.search(line)
+                    if m:
+                        G = float(m[1])
+                elif section is None and "Frequency Printout" in line:
+                    section = "freq"
+                elif (
+                    "normal termination" in line and "abnormal termination" not in line
                 ):
                     self.termination = True
-                    return True
-            self.termination = False
-
-    def GetFreq(self):
-        with open(self.file) as fh:
-            txt = fh.readlines()
-
-        txt = [x.strip() for x in txt]
-        for i, line in enumerate(txt):
-            if line.find("Frequency Printout") > -1:
-                txt = txt[i + 3 :]
-                break
-
-        waveNums = []
-        for i, line in enumerate(txt):
-            if line.find("reduced masses") > -1:
-                txt = txt[i + 1 :]
-                break
-            m = re.findall("\s+(-?\d+\.\d+)", line)
-            if m:
-                for match in m:
-                    waveNums.append(float(match.strip()))
-
-        for i, line in enumerate(txt):
-            if line.find("IR intensities") > -1:
-                txt = txt[i + 1 :]
-                break
-
-        intensities = []
-        for i, line in enumerate(txt):
-            if line.find("Raman intensities") > -1:
-                txt = txt[i + 1 :]
-                break
-            m = re.findall("\d+:\s+(\d+\.\d+)", line)
-            if m:
-                for match in m:
-                    intensities.append(float(match))
 
-        waveNums, intensities = list(
-            zip(*[(w, i) for w, i in zip(waveNums, intensities) if w != 0])
-        )
-
-        if waveNums and intensities and len(waveNums) == len(intensities):
-            self.wavenum = waveNums
-            self.ir_intensities = intensities
-
-    def GetE(self):
-        with open(self.file) as fh:
-            txt = fh.readlines()
-
-        txt = [x.strip() for x in txt]
-        for i, line in enumerate(txt):
-            m = re.search("TOTAL ENERGY\s+(-?\d+\.\d+)", line)
-            if m:
-                self.E = m[1]
-                continue
-            m = re.search("TOTAL FREE ENERGY\s+(-?\d+\.\d+)", line)
-            if m:
-                self.G = float(m[1])
+        if not self.termination:
+            return
+
+        if E is not None:
+            self.E = E
+        if G is not None:
+            self.G = G
+
+        # drop the translations and rotations
+        n = min(len(waveNums), len(intensities))
+        waveNums = np.array(waveNums[:n], dtype=float)
+        intensities = np.array(intensities[:n], dtype=float)
+        mask = waveNums != 0
+        if mask.any():
+            self.wavenum = waveNums[mask]
+            self.ir_intensities = intensities[mask]
@@ -7,8 +7,14 @@ from rdmc.mol import RDKitMol
 from rdmc.forcefield import OpenBabelFF
 from rdmc.ts import get_formed_and_broken_bonds
 
+from autoqm.calculation.geometry_store import append_records, load_index
 from autoqm.calculation.semiempirical_calculation import run_xtb_opt
 from autoqm.calculation.utils import mol2charge, mol2mult, mol2xyz
+from autoqm.parser.connectivity import (
+    get_connectivity,
+    get_reference_connectivity,
+    same_connectivity,
+)
 
 
 def reset_r_p_complex_semi_opt(
@@ -104,11 +110,12 @@ def reset_r_p_complex_semi_opt(
     shutil.rmtree(ts_scratch_dir)
 
 
-def reset_r_p_complex_ff_opt(
-    rxn_smi, ts_xyz, ts_id, subinputs_dir, suboutputs_dir, scratch_dir
-):
-    current_dir = os.path.abspath(os.getcwd())
-
+def reset_r_p_complex_ff(rxn_smi, ts_xyz, ts_id, max_step=2000, tol=1e-8):
+    """
+    Reset the reactant and product complexes of a TS with force field optimizations in the
+    current process. Returns the RDKit molecules of the reactant complex, product complex and
+    TS, or None if a reacting bond of the TS is longer than 2 Angstrom.
+    """
     r_complex_smi, p_complex_smi = rxn_smi.split(">>")
     r_complex = RDKitMol.FromSmiles(r_complex_smi, removeHs=False, sanitize=False)
     p_complex = RDKitMol.FromSmiles(p_complex_smi, removeHs=False, sanitize=False)
@@ -125,50 +132,100 @@ def reset_r_p_complex_ff_opt(
         print(
             f"Warning: reacting bond length of {ts_id} {rxn_smi} is greater than 2.0 Angstrom: {reacting_bond_lengths}. Skip this TS."
         )
-        try:
-            os.remove(os.path.join(subinputs_dir, f"rxn_{ts_id}.tmp"))
-        except FileNotFoundError:
-            print("File not found. Continuing...")
-            print(os.path.join(subinputs_dir, f"rxn_{ts_id}.tmp"))
-        return
-
-    r_complex_id = f"rxn_{ts_id}_r"
-    rmol_scratch_dir = os.path.join(scratch_dir, r_complex_id)
-    os.makedirs(rmol_scratch_dir)
-    os.chdir(rmol_scratch_dir)
-    new_r_complex = reset_r_complex(ts_mol, r_complex, formed_bonds)
-    os.chdir(current_dir)
+        return None
 
-    p_complex_id = f"rxn_{ts_id}_p"
-    pmol_scratch_dir = os.path.join(scratch_dir, p_complex_id)
-    os.makedirs(pmol_scratch_dir)
-    os.chdir(pmol_scratch_dir)
-    new_p_complex = reset_p_complex(new_r_complex, p_complex, broken_bonds)
+    new_r_complex = reset_r_complex(
+        ts_mol, r_complex, formed_bonds, max_step=max_step, tol=tol
+    )
+    new_p_complex = reset_p_complex(
+        new_r_complex, p_complex, broken_bonds, max_step=max_step, tol=tol
+    )
 
     new_r_complex._mol.SetProp("_Name", r_complex_smi)
     new_p_complex._mol.SetProp("_Name", p_complex_smi)
     ts_mol._mol.SetProp("_Name", rxn_smi)
 
-    sdf_file = f"rxn_{ts_id}.sdf"
-    writer = Chem.rdmolfiles.SDWriter(sdf_file)
-    writer.write(new_r_complex._mol)
-    writer.write(new_p_complex._mol)
-    writer.write(ts_mol._mol)
-    writer.close()
+    return new_r_complex._mol, new_p_complex._mol, ts_mol._mol
 
-    shutil.copyfile(sdf_file, os.path.join(suboutputs_dir, sdf_file))
-    os.chdir(current_dir)
 
-    try:
-        os.remove(os.path.join(subinputs_dir, f"rxn_{ts_id}.tmp"))
-    except FileNotFoundError:
-        print("File not found. Continuing...")
-        print(os.path.join(subinputs_dir, f"rxn_{ts_id}.tmp"))
-    shutil.rmtree(rmol_scratch_dir)
-    shutil.rmtree(pmol_scratch_dir)
+def check_r_p_complex_connectivity(r_mol, p_mol):
+    """
+    Check that the force field optimizations kept the connectivity of the reactant and
+    product complexes given by the smiles in their names.
+    """
+    for mol in [r_mol, p_mol]:
+        pre_connectivity = get_reference_connectivity(mol.GetProp("_Name"))
+        if not same_connectivity(pre_connectivity, get_connectivity(mol)):
+            return False
+    return True
 
 
-def reset_r_complex(ts_mol, r_complex, formed_bonds):
+def reset_r_p_complex_ff_opt_shard(
+    tasks, store_dir, shard_id, max_step=2000, tol=1e-8, flush_every=100
+):
+    """
+    Reset the reactant and product complexes of ``(ts_id, rxn_smi, ts_xyz)`` tasks and append
+    the reactant complex, product complex and TS of all successful reactions to the
+    ``rxns_{shard_id}`` geometry store, together with the result of the connectivity check.
+    Reactions already in the store are skipped, and the records are appended every
+    ``flush_every`` reactions so that an interrupted shard can be resumed.
+    """
+    stored_ids = set(load_index(store_dir, shard_id)["id"])
+
+    num_success = 0
+    records = []
+    for ts_id, rxn_smi, ts_xyz in tasks:
+        if ts_id in stored_ids:
+            continue
+        try:
+            mols = reset_r_p_complex_ff(
+                rxn_smi, ts_xyz, ts_id, max_step=max_step, tol=tol
+            )
+        except Exception as e:
+            print(f"Error in resetting r/p complexes of {ts_id} {rxn_smi}: {e}")
+            continue
+        if mols is None:
+            continue
+        records.append((ts_id, mols, check_r_p_complex_connectivity(*mols[:2])))
+        num_success += 1
+        if len(records) >= flush_every:
+            append_records(store_dir, shard_id, records)
+            records = []
+    if records:
+        append_records(store_dir, shard_id, records)
+
+    return {
+        "shard_id": shard_id,
+        "num_tasks": len(tasks),
+        "num_stored": len(stored_ids),
+        "num_success": num_success,
+    }
+
+
+def merge_r_p_complex_sdfs(sdf_paths, store_dir, shard_id):
+    """
+    Merge per-reaction ``rxn_{ts_id}.sdf`` files of one shard into the ``rxns_{shard_id}``
+    geometry store, skipping reactions already in the store. The files are deleted once
+    their records are appended, so that the migration is only done once.
+    """
+    stored_ids = set(load_index(store_dir, shard_id)["id"])
+
+    records = []
+    for sdf_path in sdf_paths:
+        ts_id = int(os.path.basename(sdf_path).split(".")[0].split("_")[1])
+        if ts_id in stored_ids:
+            continue
+        mols = list(Chem.SDMolSupplier(sdf_path, sanitize=False, removeHs=False))
+        records.append((ts_id, mols, check_r_p_complex_connectivity(*mols[:2])))
+    if records:
+        append_records(store_dir, shard_id, records)
+    for sdf_path in sdf_paths:
+        os.remove(sdf_path)
+
+    return len(records)
+
+
+def reset_r_complex(ts_mol, r_complex, formed_bonds, max_step=2000, tol=1e-8):
     # copy current r_complex and set new positions
     new_r_complex = r_complex.Copy(quickCopy=True)
     new_r_complex.SetPositions(ts_mol.GetPositions())
@@ -180,23 +237,23 @@ def reset_r_complex(ts_mol, r_complex, formed_bonds):
     current_distances = [ts_conf.GetBondLength(b) for b in formed_bonds]
     for b, d in zip(formed_bonds, current_distances):
         obff.add_distance_constraint(b, 1.5 * d)
-    obff.optimize(max_step=2000)
+    obff.optimize(max_step=max_step, tol=tol)
 
     # second minimization without constraints
     obff.constraints = None
-    obff.optimize(max_step=2000)
+    obff.optimize(max_step=max_step, tol=tol)
     new_r_complex = obff.get_optimized_mol()
 
     # third optimization with MMFF94s
     obff = OpenBabelFF(force_field="mmff94s")
     obff.setup(new_r_complex)
-    obff.optimize(max_step=2000)
+    obff.optimize(max_step=max_step, tol=tol)
     new_r_complex = obff.get_optimized_mol()
 
     return new_r_complex
 
 
-def reset_p_complex(new_r_complex, p_complex, broken_bonds):
+def reset_p_complex(new_r_complex, p_complex, broken_bonds, max_step=2000, tol=1e-8):
     # copy current p_complex and set new positions
     new_p_complex = p_complex.Copy(quickCopy=True)
     new_p_complex.SetPositions(new_r_complex.GetPositions())
@@ -208,17 +265,17 @@ def reset_p_complex(new_r_complex, p_complex, broken_bonds):
     current_distances = [r_conf.GetBondLength(b) for b in broken_bonds]
     for b, d in zip(broken_bonds, current_distances):
         obff.add_distance_constraint(b, 1.5 * d)
-    obff.optimize(max_step=2000)
+    obff.optimize(max_step=max_step, tol=tol)
 
     # second minimization without constraints
     obff.constraints = None
-    obff.optimize(max_step=2000)
+    obff.optimize(max_step=max_step, tol=tol)
     new_p_complex = obff.get_optimized_mol()
 
     # third optimization with MMFF94s
     obff = OpenBabelFF(force_field="mmff94s")
     obff.setup(new_p_complex)
-    obff.optimize(max_step=2000)
+    obff.optimize(max_step=max_step, tol=tol)
     new_p_complex = obff.get_optimized_mol()
 
     return new_p_complex
@@ -0,0 +1,185 @@
+import os
+import sqlite3
+import time
+
+import numpy as np
+import pandas as pd
+
+# folder of each stage in the output folder, suffix of the output file of a job, and whether
+# this file is written to a job folder ``outputs_{k}/{job_id}`` rather than to ``outputs_{k}``
+STAGES = {
+    "FF_conf": {"folder": "FF_conf", "output_suffix": "_confs.sdf", "job_dir": False},
+    "semiempirical_opt": {
+        "folder": "semiempirical_opt",
+        "output_suffix": ".tar",
+        "job_dir": False,
+    },
+    "DFT_opt_freq": {
+        "folder": "DFT_opt_freq",
+        "output_suffix": ".log",
+        "job_dir": True,
+    },
+    "COSMO": {"folder": "COSMO_calc", "output_suffix": ".tar", "job_dir": False},
+    "DLPNO_sp": {"folder": "DLPNO_sp", "output_suffix": ".log", "job_dir": False},
+    "QM_descriptors": {
+        "folder": "QM_des_calc",
+        "output_suffix": ".log",
+        "job_dir": False,
+    },
+}
+
+# states of a job from the highest to the lowest precedence, e.g. a job with both a .in file and
+# an output is queued for a restart
+JOB_FILE_STATES = {
+    "tmp": "running",
+    "in": "queued",
+    "failed": "failed",
+    "output": "done",
+}
+STATES = list(JOB_FILE_STATES.values())
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS dirs (path TEXT PRIMARY KEY, stage TEXT, mtime_ns INTEGER);
+CREATE TABLE IF NOT EXISTS files (stage TEXT, dir TEXT, job_id TEXT, kind TEXT, mtime REAL);
+CREATE INDEX IF NOT EXISTS files_dir ON files (dir);
+"""
+
+
+def connect(database_path):
+    conn = sqlite3.connect(database_path)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def list_job_files(path, output_suffix, job_id=None):
+    """
+    ``(job_id, kind, mtime)`` of the ``.in``, ``.tmp`` and ``.failed`` files and of the outputs
+    in a directory. Only the output of ``job_id`` is listed if given.
+    """
+    rows = []
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if not entry.is_file():
+                continue
+            name = entry.name
+            if name.endswith(output_suffix) and job_id in (
+                None,
+                name[: -len(output_suffix)],
+            ):
+                file_job_id, kind = name[: -len(output_suffix)], "output"
+            else:
+                file_job_id, extension = os.path.splitext(name)
+                kind = extension[1:]
+                if kind not in ("in", "tmp", "failed"):
+                    continue
+            try:
+                mtime = entry.stat().st_mtime
+            except FileNotFoundError:
+                # renamed or removed by a worker during the scan
+                continue
+            rows.append((file_job_id, kind, mtime))
+    return rows
+
+
+def get_leaf_dirs(stage_dir, job_dir=False):
+    """
+    ``(path, job_id)`` of the directories holding the job files of a stage, i.e. the
+    ``inputs_{k}`` and ``outputs_{k}`` shards, or the job folders of the output shards.
+    """
+    leaf_dirs = []
+    for subdir in ["inputs", "outputs"]:
+        root = os.path.join(stage_dir, subdir)
+        if not os.path.isdir(root):
+            continue
+        with os.scandir(root) as shards:
+            for shard in shards:
+                if not (shard.is_dir() and shard.name.startswith(f"{subdir}_")):
+                    continue
+                if subdir == "outputs" and job_dir:
+                    with os.scandir(shard.path) as job_dirs:
+                        leaf_dirs.extend(
+                            (job.path, job.name) for job in job_dirs if job.is_dir()
+                        )
+                else:
+                    leaf_dirs.append((shard.path, None))
+    return leaf_dirs
+
+
+def index_stage(conn, stage, stage_dir, output_suffix, job_dir=False):
+    """
+    Update the indexed job files of a stage. A directory is only listed again if its
+    modification time changed since the last scan, so that an up-to-date campaign is indexed
+    with one ``stat`` per directory. The mtime of a file is the one at the last listing of
+    its directory. Returns the number of listed directories.
+    """
+    indexed_mtimes = dict(
+        conn.execute("SELECT path, mtime_ns FROM dirs WHERE stage = ?", (stage,))
+    )
+    num_listed = 0
+    for path, job_id in get_leaf_dirs(stage_dir, job_dir=job_dir):
+        indexed_mtime = indexed_mtimes.pop(path, None)
+        try:
+            # taken before the listing, so that files changed during it are listed next time
+            mtime_ns = os.stat(path).st_mtime_ns
+            if mtime_ns == indexed_mtime:
+                continue
+            rows = list_job_files(path, output_suffix, job_id=job_id)
+        except FileNotFoundError:
+            indexed_mtimes[path] = None
+            continue
+        conn.execute("DELETE FROM files WHERE dir = ?", (path,))
+        conn.executemany(
+            "INSERT INTO files VALUES (?, ?, ?, ?, ?)",
+            [(stage, path, *row) for row in rows],
+        )
+        conn.execute(
+            "INSERT OR REPLACE INTO dirs VALUES (?, ?, ?)", (path, stage, mtime_ns)
+        )
+        num_listed += 1
+
+    # directories removed since the last scan
+    for path in indexed_mtimes:
+        conn.execute("DELETE FROM files WHERE dir = ?", (path,))
+        conn.execute("DELETE FROM dirs WHERE path = ?", (path,))
+    conn.commit()
+    return num_listed
+
+
+def get_job_states(conn):
+    """
+    Frame of the ``stage``, ``job_id``, ``state`` and ``mtime`` of the indexed jobs, where the
+    state is given by the job file of the highest precedence in ``JOB_FILE_STATES``. The
+    outputs are not opened, so a done job may still have failed.
+    """
+    df = pd.read_sql_query("SELECT stage, job_id, kind, mtime FROM files", conn)
+    df["state"] = pd.Categorical(
+        df["kind"].map(JOB_FILE_STATES), categories=STATES, ordered=True
+    )
+    df = df.sort_values("state").drop_duplicates(["stage", "job_id"], keep="first")
+    return df[["stage", "job_id", "state", "mtime"]].reset_index(drop=True)
+
+
+def summarize_job_states(job_states, stages, window, now=None):
+    """
+    Number of jobs in each state per stage, with the throughput of the last ``window`` seconds
+    estimated from the mtimes of the outputs, and the ETA in seconds of the queued and running
+    jobs at this throughput.
+    """
+    now = time.time() if now is None else now
+    report = pd.crosstab(job_states["stage"], job_states["state"], dropna=False)
+    report = report.reindex(index=stages, columns=STATES, fill_value=0)
+
+    done = job_states[job_states["state"] == "done"]
+    report["done_in_window"] = (
+        done[done["mtime"] >= now - window]
+        .groupby("stage")
+        .size()
+        .reindex(stages, fill_value=0)
+    )
+    report["throughput (jobs/s)"] = report["done_in_window"] / window
+    remaining = report["queued"] + report["running"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        report["ETA (s)"] = np.where(
+            remaining == 0, 0.0, remaining / report["throughput (jobs/s)"]
+        )
+    return report
@@ -107,4 +107,15 @@ def add_gaussian_arguments(parser):
     gaussian_parser.add_argument(
         "--g16_path", required=True, type=Path, help="path to installed Gaussian 16"
     )
+    gaussian_parser.add_argument(
+        "--DFT_opt_freq_chk_dir",
+        default=None,
+        type=Path,
+        help="DFT opt freq output directory containing the checkpoint files saved with --DFT_opt_freq_save_chk, used as initial guess",
+    )
+    gaussian_parser.add_argument(
+        "--merged_template_file",
+        default=None,
+        help="template file running all QM descriptor steps in one Gaussian job, e.g. templates/qm_des_merged.txt, used instead of --template_file for the jobs starting from a --DFT_opt_freq_chk_dir checkpoint",
+    )
     return parser
@@ -1,7 +1,26 @@
+import hashlib
+import json
+import os
+import tempfile
+from collections import Counter
+
 import numpy as np
+from rdkit import Chem
 from rmgpy.molecule.molecule import Molecule
 from rmgpy.molecule.group import GroupAtom, Group, GroupBond
 
+# sampled smiles of the fragments seen by this process, by canonical fragment smiles
+FRAGMENT_CACHE = {}
+
+# RDKit bond types of the RMG bond orders
+BOND_TYPES = {
+    1: Chem.BondType.SINGLE,
+    1.5: Chem.BondType.AROMATIC,
+    2: Chem.BondType.DOUBLE,
+    3: Chem.BondType.TRIPLE,
+    4: Chem.BondType.QUADRUPLE,
+}
+
 
 def functional_group_analysis(
     smiles,
@@ -9,6 +28,7 @@ def functional_group_analysis(
     max_num_heavy_atoms_in_functional_group=5,
     min_num_heavy_atoms_in_functional_group=2,
     max_num_heavy_atoms_in_ring=10,
+    cache_dir=None,
 ):
     functional_group_smiles_list = list()
 
@@ -34,7 +54,7 @@ def functional_group_analysis(
         all_ring_atoms.update(ring)
 
     sampled_functional_group_smiles_list = get_ring_functional_groups(
-        molecule, rings=all_rings
+        molecule, rings=all_rings, cache_dir=cache_dir
     )
     functional_group_smiles_list.extend(sampled_functional_group_smiles_list)
 
@@ -47,6 +67,7 @@ def functional_group_analysis(
                 max_n_radius_neighbor=max_n_radius_neighbor,
                 max_num_heavy_atoms_in_functional_group=max_num_heavy_atoms_in_functional_group,
                 min_num_heavy_atoms_in_functional_group=min_num_heavy_atoms_in_functional_group,
+                cache_dir=cache_dir,
             )
             if sampled_functional_group_smiles is not None:
                 functional_group_smiles_list.append(sampled_functional_group_smiles)
@@ -54,6 +75,26 @@ def functional_group_analysis(
     return functional_group_smiles_list
 
 
+def count_functional_groups_batch(
+    smiles_list, cache_dir=None, return_membership=False, **kwargs
+):
+    """
+    Count the functional groups of many molecules in one worker, so that only one
+    ``Counter`` per batch is returned to the parent process. If ``return_membership``,
+    the functional groups of each molecule are also returned.
+    """
+    counts = Counter()
+    membership = [] if return_membership else None
+    for smiles in smiles_list:
+        functional_group_smiles_list = functional_group_analysis(
+            smiles, cache_dir=cache_dir, **kwargs
+        )
+        counts.update(functional_group_smiles_list)
+        if return_membership:
+            membership.append(functional_group_smiles_list)
+    return counts, membership
+
+
 def make_rmg_mol(smiles):
     try:
         molecule = Molecule().from_smiles(smiles)
@@ -71,6 +112,7 @@ def get_n_radius_functional_group(
     max_n_radius_neighbor=None,
     max_num_heavy_atoms_in_functional_group=5,
     min_num_heavy_atoms_in_functional_group=3,
+    cache_dir=None,
 ):
     if center_atom in all_ring_atoms:
         return None
@@ -83,9 +125,9 @@ def get_n_radius_functional_group(
 
     sampled_functional_group_smiles = None
     for n_radius_neighbor in range(1, max_n_radius_neighbor + 1):
-        group = make_group(center_atom, molecule, all_ring_atoms, n_radius_neighbor)
+        group_atoms = get_group_atoms(center_atom, all_ring_atoms, n_radius_neighbor)
         num_heavy_atoms_in_functional_group = sum(
-            group_atom.atomtype[0].label != "H" for group_atom in group.atoms
+            not atom.is_hydrogen() for atom in group_atoms
         )
         if (
             min_num_heavy_atoms_in_functional_group
@@ -93,24 +135,118 @@ def get_n_radius_functional_group(
             and num_heavy_atoms_in_functional_group
             <= max_num_heavy_atoms_in_functional_group
         ):
-            try:
-                sampled_mol = group.make_sample_molecule()
-            except:
-                print(
-                    f"Could not make sample molecule from group: {group.to_adjacency_list()}"
-                )
-            else:
-                sampled_mol.sort_atoms()
-                sampled_functional_group_smiles = sampled_mol.to_smiles()
+            smiles = get_fragment_smiles(
+                molecule, group_atoms, cache_dir=cache_dir, ignore_errors=True
+            )
+            if smiles is not None:
+                sampled_functional_group_smiles = smiles
         else:
             break
     return sampled_functional_group_smiles
 
 
-def make_group(center_atom, molecule, all_ring_atoms, n_radius_neighbor=1):
+def get_fragment_key(atoms):
+    """
+    Canonical smiles of the fragment made of ``atoms`` and the bonds between them, with the
+    same element and bond order information as the sampled group and the hydrogens as explicit
+    atoms. Canonical smiles are a complete invariant of this graph, so fragments with the same
+    key give the same sampled group. None if a bond order has no RDKit bond type.
+    """
+    mol = Chem.RWMol()
+    index = {}
+    for atom in atoms:
+        rd_atom = Chem.Atom(atom.element.number)
+        if atom.element.isotope != -1:
+            rd_atom.SetIsotope(atom.element.isotope)
+        rd_atom.SetNoImplicit(True)
+        index[atom] = mol.AddAtom(rd_atom)
+    for atom1 in atoms:
+        for atom2, bond in atom1.edges.items():
+            if atom2 not in index or index[atom2] < index[atom1]:
+                continue
+            bond_type = BOND_TYPES.get(bond.order)
+            if bond_type is None:
+                return None
+            mol.AddBond(index[atom1], index[atom2], bond_type)
+            if bond_type == Chem.BondType.AROMATIC:
+                mol.GetAtomWithIdx(index[atom1]).SetIsAromatic(True)
+                mol.GetAtomWithIdx(index[atom2]).SetIsAromatic(True)
+    return Chem.MolToSmiles(mol, allBondsExplicit=True)
+
+
+def get_fragment_cache_path(cache_dir, fragment_key):
+    key_hash = hashlib.sha1(fragment_key.encode()).hexdigest()
+    return os.path.join(cache_dir, key_hash[:2], f"{key_hash}.json")
+
+
+def load_fragment_cache(cache_dir, fragment_key):
+    try:
+        with open(get_fragment_cache_path(cache_dir, fragment_key), "r") as f:
+            entry = json.load(f)
+        if entry["fragment"] != fragment_key:
+            raise KeyError(fragment_key)
+        return entry["smiles"]
+    except (OSError, ValueError, KeyError):
+        raise KeyError(fragment_key)
+
+
+def save_fragment_cache(cache_dir, fragment_key, smiles):
+    """
+    Save the sampled smiles of a fragment to the on-disk cache shared by all workers, in a
+    file named by the hash of the fragment key. The file is written to a temporary file first
+    and renamed, so that concurrent workers never read a partially written file.
+    """
+    cache_path = get_fragment_cache_path(cache_dir, fragment_key)
+    cache_subdir = os.path.dirname(cache_path)
+    os.makedirs(cache_subdir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=cache_subdir, suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        json.dump({"fragment": fragment_key, "smiles": smiles}, f)
+    os.replace(tmp_path, cache_path)
+
+
+def get_fragment_smiles(molecule, atoms, cache_dir=None, ignore_errors=False):
+    """
+    Sampled smiles of the fragment made of ``atoms``, looked up by canonical fragment smiles in
+    the cache of this process, then in ``cache_dir``, before making the group and sampling it.
+    If ``ignore_errors``, fragments that cannot be sampled give None.
+    """
+    fragment_key = get_fragment_key(atoms)
+    if fragment_key in FRAGMENT_CACHE:
+        return FRAGMENT_CACHE[fragment_key]
+
+    if cache_dir is not None and fragment_key is not None:
+        try:
+            smiles = load_fragment_cache(cache_dir, fragment_key)
+        except KeyError:
+            pass
+        else:
+            FRAGMENT_CACHE[fragment_key] = smiles
+            return smiles
+
+    group = make_group_from_atoms(molecule, atoms)
+    try:
+        sampled_mol = group.make_sample_molecule()
+    except:
+        if not ignore_errors:
+            raise
+        print(f"Could not make sample molecule from group: {group.to_adjacency_list()}")
+        smiles = None
+    else:
+        sampled_mol.sort_atoms()
+        smiles = sampled_mol.to_smiles()
+
+    if fragment_key is not None:
+        FRAGMENT_CACHE[fragment_key] = smiles
+        if cache_dir is not None:
+            save_fragment_cache(cache_dir, fragment_key, smiles)
+    return smiles
+
+
+def get_group_atoms(center_atom, all_ring_atoms, n_radius_neighbor=1):
 
     group_atoms = {}
-    group_atoms[center_atom] = GroupAtom(atomtype=[center_atom.element.symbol])
+    group_atoms[center_atom] = None
 
     neighbors = list(center_atom.edges.items())
     neighbors.sort()
@@ -119,22 +255,14 @@ def make_group(center_atom, molecule, all_ring_atoms, n_radius_neighbor=1):
         neighbors, group_atoms, all_ring_atoms, n_radius_neighbor, 1
     )
 
-    group = Group(atoms=list(group_atoms.values()))
-
-    group = make_bonds(molecule, group, group_atoms)
-
-    group.atoms = group.sort_by_connectivity(group.atoms)
-
-    group.update()
-
-    return group
+    return list(group_atoms)
 
 
 def get_neighbors(atoms, group_atoms, all_ring_atoms, n_radius_neighbor, degree):
 
     for atom, bond in atoms:
         if atom not in group_atoms:
-            group_atoms[atom] = GroupAtom(atomtype=[atom.element.symbol])
+            group_atoms[atom] = None
 
         if atom in all_ring_atoms:
             continue
@@ -151,21 +279,42 @@ def get_neighbors(atoms, group_atoms, all_ring_atoms, n_radius_neighbor, degree)
     return group_atoms
 
 
-def make_bonds(molecule, group, group_atoms):
+def make_group_from_atoms(molecule, atoms):
+
+    group_atoms = {}
+    for atom in atoms:
+        if atom not in group_atoms:
+            group_atoms[atom] = GroupAtom(atomtype=[atom.element.symbol])
+
+    group = Group(atoms=list(group_atoms.values()))
+
+    group = make_bonds(molecule, group, group_atoms)
+
+    group.atoms = group.sort_by_connectivity(group.atoms)
+
+    group.update()
 
+    return group
+
+
+def make_bonds(molecule, group, group_atoms):
+    """
+    Add the bonds of ``molecule`` between the atoms of the group, going through the bonds
+    of each atom once instead of checking all pairs of atoms.
+    """
+    visited_atoms = set()
     for atom1, group_atom1 in group_atoms.items():
-        for atom2, group_atom2 in group_atoms.items():
-            if molecule.has_bond(atom1, atom2):
-                bond = molecule.get_bond(atom1, atom2)
-                if not group.has_bond(group_atom1, group_atom2):
-                    group.add_bond(
-                        GroupBond(group_atom1, group_atom2, order=[bond.order])
-                    )
+        for atom2, bond in atom1.edges.items():
+            if atom2 in group_atoms and atom2 not in visited_atoms:
+                group.add_bond(
+                    GroupBond(group_atom1, group_atoms[atom2], order=[bond.order])
+                )
+        visited_atoms.add(atom1)
 
     return group
 
 
-def get_ring_functional_groups(molecule, rings=None):
+def get_ring_functional_groups(molecule, rings=None, cache_dir=None):
     sampled_functional_group_smiles_list = list()
 
     if rings is None:
@@ -174,28 +323,9 @@ def get_ring_functional_groups(molecule, rings=None):
         rings = sssr + monorings + polyrings
 
     for ring in rings:
-        group = make_ring_group(molecule, ring)
-
-        sampled_mol = group.make_sample_molecule()
-        sampled_mol.sort_atoms()
-        sampled_functional_group_smiles = sampled_mol.to_smiles()
+        sampled_functional_group_smiles = get_fragment_smiles(
+            molecule, list(dict.fromkeys(ring)), cache_dir=cache_dir
+        )
         sampled_functional_group_smiles_list.append(sampled_functional_group_smiles)
 
     return sampled_functional_group_smiles_list
-
-
-def make_ring_group(molecule, ring):
-    group_atoms = {}
-    for atom in ring:
-        if atom not in group_atoms:
-            group_atoms[atom] = GroupAtom(atomtype=[atom.element.symbol])
-
-    group = Group(atoms=list(group_atoms.values()))
-
-    group = make_bonds(molecule, group, group_atoms)
-
-    group.atoms = group.sort_by_connectivity(group.atoms)
-
-    group.update()
-
-    return group
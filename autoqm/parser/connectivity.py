@@ -0,0 +1,360 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+import hashlib
+import logging
+import os
+import pickle as pkl
+from functools import lru_cache
+
+import numpy as np
+from rdmc.mol import RDKitMol
+
+from .elements import COVALENT_RADII, symbols_to_atomic_numbers
+from .utils import parse_xyz
+
+# maximum number of bonds of an atom in Open Babel's bond perception indexed by atomic number,
+# taken from Open Babel's element table (OBElements::GetMaxBonds)
+MAX_BONDS = np.array(
+    [
+        0,  # dummy
+        1,  # H
+        0,  # He
+        1,  # Li
+        2,  # Be
+        4,  # B
+        4,  # C
+        4,  # N
+        2,  # O
+        1,  # F
+        0,  # Ne
+        1,  # Na
+        2,  # Mg
+        6,  # Al
+        6,  # Si
+        6,  # P
+        6,  # S
+        1,  # Cl
+        0,  # Ar
+        1,  # K
+        2,  # Ca
+        6,  # Sc
+        6,  # Ti
+        6,  # V
+        6,  # Cr
+        8,  # Mn
+        6,  # Fe
+        6,  # Co
+        6,  # Ni
+        6,  # Cu
+        6,  # Zn
+        3,  # Ga
+        4,  # Ge
+        3,  # As
+        2,  # Se
+        1,  # Br
+        0,  # Kr
+        1,  # Rb
+        2,  # Sr
+        6,  # Y
+        6,  # Zr
+        6,  # Nb
+        6,  # Mo
+        6,  # Tc
+        6,  # Ru
+        6,  # Rh
+        6,  # Pd
+        6,  # Ag
+        6,  # Cd
+        3,  # In
+        4,  # Sn
+        3,  # Sb
+        2,  # Te
+        1,  # I
+        0,  # Xe
+        1,  # Cs
+        2,  # Ba
+        12,  # La
+        6,  # Ce
+        6,  # Pr
+        6,  # Nd
+        6,  # Pm
+        6,  # Sm
+        6,  # Eu
+        6,  # Gd
+        6,  # Tb
+        6,  # Dy
+        6,  # Ho
+        6,  # Er
+        6,  # Tm
+        6,  # Yb
+        6,  # Lu
+        6,  # Hf
+        6,  # Ta
+        6,  # W
+        6,  # Re
+        6,  # Os
+        6,  # Ir
+        6,  # Pt
+        6,  # Au
+        6,  # Hg
+        3,  # Tl
+        4,  # Pb
+        3,  # Bi
+        2,  # Po
+        1,  # At
+        0,  # Rn
+        1,  # Fr
+        2,  # Ra
+        6,  # Ac
+        6,  # Th
+        6,  # Pa
+        6,  # U
+        6,  # Np
+        6,  # Pu
+        6,  # Am
+        6,  # Cm
+        6,  # Bk
+        6,  # Cf
+        6,  # Es
+        6,  # Fm
+        6,  # Md
+        6,  # No
+        6,  # Lr
+        6,  # Rf
+        6,  # Db
+        6,  # Sg
+        6,  # Bh
+        6,  # Hs
+        6,  # Mt
+        6,  # Ds
+        6,  # Rg
+        6,  # Cn
+        6,  # Nh
+        6,  # Fl
+        6,  # Mc
+        6,  # Lv
+        6,  # Ts
+        6,  # Og
+    ]
+)
+MAX_BONDS.flags.writeable = False
+
+
+def get_connectivity(mol):
+    """
+    Connectivity of a rdkit or rdmc molecule as ``(num_atoms, bonds)``, where ``bonds`` is a
+    lexicographically sorted (n_bonds, 2) int32 array of ``(i, j)`` atom pairs with ``i < j``.
+    """
+    bonds = np.array(
+        [(bond.GetBeginAtomIdx(), bond.GetEndAtomIdx()) for bond in mol.GetBonds()],
+        dtype=np.int32,
+    ).reshape(-1, 2)
+    bonds.sort(axis=1)
+    bonds = bonds[np.lexsort((bonds[:, 1], bonds[:, 0]))]
+    return mol.GetNumAtoms(), bonds
+
+
+def get_reference_connectivity(smi):
+    """
+    Connectivity of the molecule of a smiles.
+    """
+    return get_connectivity(RDKitMol.FromSmiles(smi))
+
+
+@lru_cache(maxsize=None)
+def get_element_table():
+    """
+    Covalent radii (angstrom, the same as Open Babel's) and maximum number of bonds indexed
+    by atomic number.
+    """
+    return COVALENT_RADII, MAX_BONDS
+
+
+def get_candidate_bonds(coords, cutoffs, max_cutoff, kdtree_threshold=500):
+    """
+    Atom pairs ``(i, j)`` with ``i < j`` and their distances that are within their cutoffs.
+    The pairwise distance matrix is used for small systems and a KD-tree for large ones.
+    """
+    if len(coords) > kdtree_threshold:
+        from scipy.spatial import cKDTree
+
+        pairs = cKDTree(coords).query_pairs(max_cutoff, output_type="ndarray")
+        i, j = pairs[:, 0], pairs[:, 1]
+        distances = np.linalg.norm(coords[i] - coords[j], axis=1)
+    else:
+        i, j = np.triu_indices(len(coords), k=1)
+        distances = np.linalg.norm(coords[i] - coords[j], axis=1)
+    mask = distances <= cutoffs[i] + cutoffs[j]
+    return i[mask], j[mask], distances[mask]
+
+
+def has_small_angle(vectors, cos_min_angle):
+    if len(vectors) < 2:
+        return False
+    vectors = vectors / np.linalg.norm(vectors, axis=1)[:, np.newaxis]
+    cosines = vectors @ vectors.T
+    return (cosines[np.triu_indices(len(vectors), k=1)] > cos_min_angle).any()
+
+
+def get_over_bonded_atoms(coords, i, j, max_bonds, cos_min_angle):
+    """
+    Atoms with more bonds than their maximum or two bonds forming a too small angle, checked
+    for all atoms at once so that only these atoms go through the bond removal loop.
+    """
+    num_atoms = len(coords)
+    centers = np.concatenate([i, j])
+    neighbors = np.concatenate([j, i])
+    order = np.argsort(centers, kind="stable")
+    centers, neighbors = centers[order], neighbors[order]
+
+    degrees = np.bincount(centers, minlength=num_atoms)
+    over_bonded = degrees > max_bonds
+    if degrees.max(initial=0) > 1:
+        # unit bond vectors of each atom padded to the maximum degree
+        slots = np.arange(len(centers)) - np.repeat(
+            np.cumsum(degrees) - degrees, degrees
+        )
+        vectors = np.zeros((num_atoms, degrees.max(), 3))
+        vectors[centers, slots] = coords[neighbors] - coords[centers]
+        vectors /= np.maximum(np.linalg.norm(vectors, axis=2), 1e-12)[:, :, np.newaxis]
+        cosines = np.einsum("aik,ajk->aij", vectors, vectors)
+        pairs = np.triu(np.ones((degrees.max(), degrees.max()), dtype=bool), k=1)
+        over_bonded |= ((cosines > cos_min_angle) & pairs).any(axis=(1, 2))
+    return np.flatnonzero(over_bonded)
+
+
+def perceive_connectivity(
+    atomic_numbers,
+    coords,
+    tolerance=0.45,
+    min_distance=0.4,
+    min_angle=45.0,
+    kdtree_threshold=500,
+):
+    """
+    Perceive the connectivity of a geometry as ``(num_atoms, bonds)`` without building a
+    molecule, following Open Babel's ``ConnectTheDots``: two atoms are bonded if their
+    distance is between ``min_distance`` and the sum of their covalent radii plus
+    ``tolerance`` (in angstrom). The longest bonds of an atom are then removed while it has
+    more bonds than its maximum or two of its bonds form an angle below ``min_angle``.
+    """
+    atomic_numbers = np.asarray(atomic_numbers)
+    coords = np.asarray(coords, dtype=float).reshape(-1, 3)
+    num_atoms = len(atomic_numbers)
+
+    covalent_radii, max_bonds = get_element_table()
+    max_bonds = max_bonds[atomic_numbers]
+    half_cutoffs = covalent_radii[atomic_numbers] + tolerance / 2
+    i, j, distances = get_candidate_bonds(
+        coords, half_cutoffs, 2 * half_cutoffs.max(initial=0.0), kdtree_threshold
+    )
+    mask = distances > min_distance
+    i, j, distances = i[mask], j[mask], distances[mask]
+
+    # clean up over-bonded atoms, in the order of the atoms as Open Babel does
+    keep = np.ones(len(i), dtype=bool)
+    cos_min_angle = np.cos(np.radians(min_angle))
+    for atom in get_over_bonded_atoms(coords, i, j, max_bonds, cos_min_angle):
+        while True:
+            atom_bonds = np.flatnonzero(keep & ((i == atom) | (j == atom)))
+            neighbors = np.where(i[atom_bonds] == atom, j[atom_bonds], i[atom_bonds])
+            if len(atom_bonds) <= max_bonds[atom] and not has_small_angle(
+                coords[neighbors] - coords[atom], cos_min_angle
+            ):
+                break
+            # bonds between hydrogens are removed first
+            if atomic_numbers[atom] == 1 and (atomic_numbers[neighbors] == 1).any():
+                keep[atom_bonds[np.argmax(atomic_numbers[neighbors] == 1)]] = False
+            else:
+                keep[atom_bonds[np.argmax(distances[atom_bonds])]] = False
+
+    bonds = np.stack([i[keep], j[keep]], axis=1).astype(np.int32)
+    bonds = bonds[np.lexsort((bonds[:, 1], bonds[:, 0]))]
+    return num_atoms, bonds
+
+
+def xyz_str_to_atomic_numbers_and_coords(xyz_str):
+    """
+    Atomic numbers and coordinates of a xyz string without the header lines.
+    """
+    symbols, coords = parse_xyz(xyz_str)
+    return symbols_to_atomic_numbers(symbols), coords
+
+
+def get_xyz_connectivity(xyz_str, backend="numpy"):
+    """
+    Connectivity of a xyz string without the header lines, perceived with
+    ``perceive_connectivity`` or, with ``backend="openbabel"``, through a RDKitMol.
+    """
+    if backend == "numpy":
+        return perceive_connectivity(*xyz_str_to_atomic_numbers_and_coords(xyz_str))
+    elif backend == "openbabel":
+        return get_connectivity(
+            RDKitMol.FromXYZ(xyz_str, backend=backend, header=False, sanitize=False)
+        )
+    else:
+        raise ValueError(f"Connectivity backend {backend} is not supported")
+
+
+def same_connectivity(connectivity1, connectivity2):
+    num_atoms1, bonds1 = connectivity1
+    num_atoms2, bonds2 = connectivity2
+    return num_atoms1 == num_atoms2 and np.array_equal(bonds1, bonds2)
+
+
+def build_reference_connectivity(mol_ids, smiles_list):
+    return {
+        mol_id: get_connectivity(RDKitMol.FromSmiles(smi))
+        for mol_id, smi in zip(mol_ids, smiles_list)
+    }
+
+
+def get_species_hash(mol_ids, smiles_list):
+    """
+    Hash of the ``mol_id -> smiles`` mapping of a species table, independent of the row order.
+    """
+    pairs = sorted((str(mol_id), smi) for mol_id, smi in zip(mol_ids, smiles_list))
+    return hashlib.sha1(repr(pairs).encode()).hexdigest()
+
+
+def load_reference_connectivity(path, mol_ids=None, smiles_list=None):
+    """
+    Load the ``{mol_id: (num_atoms, bonds)}`` reference connectivity table of a species table.
+    The table is saved to ``path`` with the hash of the ``mol_ids`` and ``smiles_list`` it was
+    built from, so that later stages and re-parses reuse it. It is built again if ``path`` does
+    not exist yet or was built from another species table. Without ``mol_ids``, the saved
+    table is loaded as is, and a ``ValueError`` is raised if there is none to load.
+    """
+    species_hash = None
+    if mol_ids is not None:
+        species_hash = get_species_hash(mol_ids, smiles_list)
+
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            saved = pkl.load(f)
+        if saved.get("species_hash") is not None and species_hash in (
+            None,
+            saved["species_hash"],
+        ):
+            return saved["connectivity"]
+        if mol_ids is not None:
+            logging.warning(
+                f"{path} was not built from this species table, rebuilding it"
+            )
+
+    if mol_ids is None:
+        raise ValueError(
+            f"{path} does not exist or was saved without a species hash, "
+            "mol_ids and smiles_list are needed to build it"
+        )
+
+    reference_connectivity = build_reference_connectivity(mol_ids, smiles_list)
+    with open(path + ".tmp", "wb") as f:
+        pkl.dump(
+            {"species_hash": species_hash, "connectivity": reference_connectivity},
+            f,
+            protocol=pkl.HIGHEST_PROTOCOL,
+        )
+    os.replace(path + ".tmp", path)
+    return reference_connectivity
@@ -5,133 +5,16 @@ import os
 import re
 import numpy as np
 
-from rdmc.mol import RDKitMol
 from rdmc.external.logparser.gaussian import GaussianLog
 
-from .utils import make_xyz_str
-
-periodictable = [
-    "",
-    "H",
-    "He",
-    "Li",
-    "Be",
-    "B",
-    "C",
-    "N",
-    "O",
-    "F",
-    "Ne",
-    "Na",
-    "Mg",
-    "Al",
-    "Si",
-    "P",
-    "S",
-    "Cl",
-    "Ar",
-    "K",
-    "Ca",
-    "Sc",
-    "Ti",
-    "V",
-    "Cr",
-    "Mn",
-    "Fe",
-    "Co",
-    "Ni",
-    "Cu",
-    "Zn",
-    "Ga",
-    "Ge",
-    "As",
-    "Se",
-    "Br",
-    "Kr",
-    "Rb",
-    "Sr",
-    "Y",
-    "Zr",
-    "Nb",
-    "Mo",
-    "Tc",
-    "Ru",
-    "Rh",
-    "Pd",
-    "Ag",
-    "Cd",
-    "In",
-    "Sn",
-    "Sb",
-    "Te",
-    "I",
-    "Xe",
-    "Cs",
-    "Ba",
-    "La",
-    "Ce",
-    "Pr",
-    "Nd",
-    "Pm",
-    "Sm",
-    "Eu",
-    "Gd",
-    "Tb",
-    "Dy",
-    "Ho",
-    "Er",
-    "Tm",
-    "Yb",
-    "Lu",
-    "Hf",
-    "Ta",
-    "W",
-    "Re",
-    "Os",
-    "Ir",
-    "Pt",
-    "Au",
-    "Hg",
-    "Tl",
-    "Pb",
-    "Bi",
-    "Po",
-    "At",
-    "Rn",
-    "Fr",
-    "Ra",
-    "Ac",
-    "Th",
-    "Pa",
-    "U",
-    "Np",
-    "Pu",
-    "Am",
-    "Cm",
-    "Bk",
-    "Cf",
-    "Es",
-    "Fm",
-    "Md",
-    "No",
-    "Lr",
-    "Rf",
-    "Db",
-    "Sg",
-    "Bh",
-    "Hs",
-    "Mt",
-    "Ds",
-    "Rg",
-    "Uub",
-    "Uut",
-    "Uuq",
-    "Uup",
-    "Uuh",
-    "Uus",
-    "Uuo",
-]
-
+from .connectivity import (
+    get_connectivity,
+    get_reference_connectivity,
+    perceive_connectivity,
+    same_connectivity,
+)
+from .elements import atomic_numbers_to_symbols, symbols_to_atomic_numbers
+from .utils import make_xyz_str, parse_xyz
 
 # In[55]:
 
@@ -197,7 +80,6 @@ def get_wall(self):
 
 def load_geometry(
     self,
-    periodictable=periodictable,
     initial=False,
     input_geom=False,
     standard_orientation=True,
@@ -250,7 +132,7 @@ def load_geometry(
 
     number = np.array(number)
     if not input_geom:
-        symbol = [periodictable[x] for x in number]
+        symbol = atomic_numbers_to_symbols(number)
 
     xyz_str = make_xyz_str(symbol, coord)
     return xyz_str, step
@@ -366,6 +248,8 @@ def dft_opt_freq_parser(
     is_ts=False,
     check_connectivity=True,
     smi=None,
+    pre_connectivity=None,
+    connectivity_backend="numpy",
 ):
     failed_job = dict()
     valid_job = dict()
@@ -404,21 +288,31 @@ def dft_opt_freq_parser(
             return failed_job, valid_job
 
         if check_connectivity:
-            pre_adj = RDKitMol.FromSmiles(smi).GetAdjacencyMatrix()
+            if pre_connectivity is None:
+                pre_connectivity = get_reference_connectivity(smi)
 
             try:
-                post_adj = glog.get_mol(
-                    refid=glog.num_all_geoms - 1,  # The last geometry in the job
-                    converged=False,
-                    sanitize=False,
-                    backend="openbabel",
-                ).GetAdjacencyMatrix()
+                if connectivity_backend == "numpy":
+                    post_connectivity = perceive_connectivity(
+                        glog.cclib_results.atomnos,
+                        glog.all_geometries[-1],  # The last geometry in the job
+                    )
+                else:
+                    # The last geometry in the job
+                    post_connectivity = get_connectivity(
+                        glog.get_mol(
+                            refid=glog.num_all_geoms - 1,
+                            converged=False,
+                            sanitize=False,
+                            backend=connectivity_backend,
+                        )
+                    )
             except:
                 print(g16_log)
                 failed_job["reason"] = "can't get post_adj"
                 return failed_job, valid_job
 
-            if not (pre_adj == post_adj).all():
+            if not same_connectivity(pre_connectivity, post_connectivity):
                 failed_job["reason"] = "adjacency matrix"
                 return failed_job, valid_job
 
@@ -432,7 +326,7 @@ def dft_opt_freq_parser(
         if not pass_freq_check:
             failed_job["reason"] = "freq"
             try:
-                failed_job["dft_freq"] = freqs
+                failed_job["dft_freq"] = np.array(freqs, dtype=np.float64)
                 failed_job["dft_freq_neg"] = has_neg_freq
                 failed_job["dft_xyz_std_ori"] = load_geometry(
                     g16_log, standard_orientation=True
@@ -456,11 +350,17 @@ def dft_opt_freq_parser(
             return failed_job, valid_job
 
         try:
-            valid_job["dft_freq"] = freqs
+            # typed frequencies and geometry, so that they are not re-parsed from strings
+            valid_job["dft_freq"] = np.array(freqs, dtype=np.float64)
             valid_job["dft_freq_neg"] = has_neg_freq
             valid_job["dft_xyz_std_ori"] = load_geometry(
                 g16_log, standard_orientation=True
             )[0]
+            symbols, coords = parse_xyz(valid_job["dft_xyz_std_ori"])
+            valid_job["dft_atomic_numbers_std_ori"] = symbols_to_atomic_numbers(
+                symbols
+            ).astype(np.uint8)
+            valid_job["dft_coords_std_ori"] = coords
             valid_job["dft_initial_xyz_std_ori"] = load_geometry(
                 g16_log, initial=True, standard_orientation=True
             )[0]
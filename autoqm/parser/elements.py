@@ -0,0 +1,163 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+import numpy as np
+from rdkit import Chem
+
+# element symbols indexed by atomic number
+SYMBOLS = np.array(
+    [
+        "",
+        "H",
+        "He",
+        "Li",
+        "Be",
+        "B",
+        "C",
+        "N",
+        "O",
+        "F",
+        "Ne",
+        "Na",
+        "Mg",
+        "Al",
+        "Si",
+        "P",
+        "S",
+        "Cl",
+        "Ar",
+        "K",
+        "Ca",
+        "Sc",
+        "Ti",
+        "V",
+        "Cr",
+        "Mn",
+        "Fe",
+        "Co",
+        "Ni",
+        "Cu",
+        "Zn",
+        "Ga",
+        "Ge",
+        "As",
+        "Se",
+        "Br",
+        "Kr",
+        "Rb",
+        "Sr",
+        "Y",
+        "Zr",
+        "Nb",
+        "Mo",
+        "Tc",
+        "Ru",
+        "Rh",
+        "Pd",
+        "Ag",
+        "Cd",
+        "In",
+        "Sn",
+        "Sb",
+        "Te",
+        "I",
+        "Xe",
+        "Cs",
+        "Ba",
+        "La",
+        "Ce",
+        "Pr",
+        "Nd",
+        "Pm",
+        "Sm",
+        "Eu",
+        "Gd",
+        "Tb",
+        "Dy",
+        "Ho",
+        "Er",
+        "Tm",
+        "Yb",
+        "Lu",
+        "Hf",
+        "Ta",
+        "W",
+        "Re",
+        "Os",
+        "Ir",
+        "Pt",
+        "Au",
+        "Hg",
+        "Tl",
+        "Pb",
+        "Bi",
+        "Po",
+        "At",
+        "Rn",
+        "Fr",
+        "Ra",
+        "Ac",
+        "Th",
+        "Pa",
+        "U",
+        "Np",
+        "Pu",
+        "Am",
+        "Cm",
+        "Bk",
+        "Cf",
+        "Es",
+        "Fm",
+        "Md",
+        "No",
+        "Lr",
+        "Rf",
+        "Db",
+        "Sg",
+        "Bh",
+        "Hs",
+        "Mt",
+        "Ds",
+        "Rg",
+        "Uub",
+        "Uut",
+        "Uuq",
+        "Uup",
+        "Uuh",
+        "Uus",
+        "Uuo",
+    ]
+)
+ATOMIC_NUMBERS = {
+    symbol: atomic_number for atomic_number, symbol in enumerate(SYMBOLS.tolist())
+}
+
+
+def get_periodic_table_property(name):
+    periodic_table = Chem.GetPeriodicTable()
+    getter = getattr(periodic_table, name)
+    return np.array([getter(atomic_number) for atomic_number in range(len(SYMBOLS))])
+
+
+# standard atomic weights (amu) and covalent radii (angstrom) indexed by atomic number
+ATOMIC_MASSES = get_periodic_table_property("GetAtomicWeight")
+COVALENT_RADII = get_periodic_table_property("GetRcovalent")
+
+for array in [SYMBOLS, ATOMIC_MASSES, COVALENT_RADII]:
+    array.flags.writeable = False
+
+
+def atomic_numbers_to_symbols(atomic_numbers):
+    return SYMBOLS[np.asarray(atomic_numbers, dtype=int)].tolist()
+
+
+def symbols_to_atomic_numbers(symbols):
+    return np.fromiter(map(ATOMIC_NUMBERS.__getitem__, symbols), dtype=int)
+
+
+def get_masses(atomic_numbers):
+    return ATOMIC_MASSES[np.asarray(atomic_numbers, dtype=int)]
+
+
+def get_covalent_radii(atomic_numbers):
+    return COVALENT_RADII[np.asarray(atomic_numbers, dtype=int)]
@@ -4,6 +4,11 @@
 import os
 from rdmc.mol import RDKitMol
 
+from .connectivity import (
+    get_connectivity,
+    get_reference_connectivity,
+    same_connectivity,
+)
 from .utils import make_xyz_str
 
 
@@ -24,7 +29,7 @@ def load_energy(mol):
     return mol.GetProp("ConfEnergies")
 
 
-def ff_conf_parser(mol_id, mol_smi, mol_confs_sdf=None):
+def ff_conf_parser(mol_id, mol_smi, mol_confs_sdf=None, pre_connectivity=None):
 
     failed_job = dict()
     valid_job = dict()
@@ -40,18 +45,18 @@ def ff_conf_parser(mol_id, mol_smi, mol_confs_sdf=None):
         failed_job[mol_id] = dict()
         valid_job[mol_id] = dict()
 
-        pre_adj = RDKitMol.FromSmiles(mol_smi).GetAdjacencyMatrix()
+        if pre_connectivity is None:
+            pre_connectivity = get_reference_connectivity(mol_smi)
 
         mols = RDKitMol.FromFile(mol_confs_sdf, removeHs=False, sanitize=False)
         for conf_id, mol in enumerate(mols):
-            post_adj = mol.GetAdjacencyMatrix()
             try:
-                (pre_adj == post_adj).all()
+                post_connectivity = get_connectivity(mol)
             except:
                 print(mol_confs_sdf)
                 break
 
-            if (pre_adj == post_adj).all():
+            if same_connectivity(pre_connectivity, post_connectivity):
                 valid_job[mol_id][conf_id] = {}
                 xyz = load_geometry(mol)
                 en = load_energy(mol)
@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+import os
+import pickle as pkl
+from collections import defaultdict
+
+import pandas as pd
+from joblib import Parallel, delayed
+from tqdm import tqdm
+
+
+def get_shard_id(mol_id):
+    """
+    Shard id of a job, the same ``mol_id // 1000`` used for the ``outputs_{ids}`` folders.
+    Both integer ids and ``id{int}`` strings are supported.
+    """
+    if isinstance(mol_id, str):
+        mol_id = mol_id.split("id")[-1]
+    return int(mol_id) // 1000
+
+
+def group_by_shard(tasks):
+    shard_to_tasks = defaultdict(list)
+    for mol_id, args in tasks:
+        shard_to_tasks[get_shard_id(mol_id)].append((mol_id, args))
+    return shard_to_tasks
+
+
+def make_chunks(tasks, chunk_size=100, key=get_shard_id):
+    """
+    Split ``(task_id, args)`` tasks into chunks of at most ``chunk_size`` tasks, each from
+    a single shard given by ``key(task_id)``, so that a worker stays in one output folder.
+    The position of each task in ``tasks`` is kept to restore the order of the outputs.
+    """
+    shard_to_tasks = defaultdict(list)
+    for index, (task_id, args) in enumerate(tasks):
+        shard_to_tasks[key(task_id)].append((index, args))
+
+    chunks = []
+    for shard_tasks in shard_to_tasks.values():
+        for i in range(0, len(shard_tasks), chunk_size):
+            chunks.append(shard_tasks[i : i + chunk_size])
+    return chunks
+
+
+def parse_chunk(parse_func, chunk):
+    return [(index, parse_func(*args)) for index, args in chunk]
+
+
+def chunked_parse(parse_func, tasks, n_jobs=1, chunk_size=100, key=get_shard_id):
+    """
+    Run ``parse_func(*args)`` for all ``(task_id, args)`` tasks with one joblib task per chunk
+    instead of one per molecule. The outputs are returned in the order of ``tasks``.
+    """
+    chunks = make_chunks(tasks, chunk_size=chunk_size, key=key)
+
+    out = Parallel(n_jobs=n_jobs, backend="multiprocessing", verbose=5)(
+        delayed(parse_chunk)(parse_func, chunk) for chunk in tqdm(chunks)
+    )
+
+    outputs = [None] * len(tasks)
+    for chunk_out in out:
+        for index, output in chunk_out:
+            outputs[index] = output
+    return outputs
+
+
+def get_shard_paths(output_file_name, shard_id, shard_dir):
+    valid_path = os.path.join(shard_dir, f"{output_file_name}_shard_{shard_id}.pkl")
+    failed_path = os.path.join(
+        shard_dir, f"{output_file_name}_shard_{shard_id}_failed.pkl"
+    )
+    return valid_path, failed_path
+
+
+def parse_tasks(parse_func, tasks, keyed=True):
+    """
+    Parse ``(mol_id, args)`` tasks with ``parse_func(*args)`` and merge the results.
+    If ``keyed``, ``parse_func`` returns ``({mol_id: ...}, {mol_id: ...})`` as
+    ``ff_conf_parser`` does, otherwise it returns ``(failed_job, valid_job)`` as
+    ``dft_opt_freq_parser`` does.
+    """
+    failed_jobs = dict()
+    valid_jobs = dict()
+    for mol_id, args in tasks:
+        failed_job, valid_job = parse_func(*args)
+        if keyed:
+            failed_jobs.update(failed_job)
+            valid_jobs.update(valid_job)
+        else:
+            if failed_job:
+                failed_jobs[mol_id] = failed_job
+            if valid_job:
+                valid_jobs[mol_id] = valid_job
+    return failed_jobs, valid_jobs
+
+
+def parse_shard(parse_func, shard_id, tasks, output_file_name, shard_dir, keyed=True):
+    """
+    Parse all tasks of one shard and write the results to the shard files.
+    Only the summary is returned to the parent process.
+    """
+    failed_jobs, valid_jobs = parse_tasks(parse_func, tasks, keyed=keyed)
+
+    valid_path, failed_path = get_shard_paths(output_file_name, shard_id, shard_dir)
+    with open(valid_path, "wb") as outfile:
+        pkl.dump(valid_jobs, outfile, protocol=pkl.HIGHEST_PROTOCOL)
+    with open(failed_path, "wb") as outfile:
+        pkl.dump(failed_jobs, outfile, protocol=pkl.HIGHEST_PROTOCOL)
+
+    return {
+        "shard_id": shard_id,
+        "valid_path": valid_path,
+        "failed_path": failed_path,
+        "num_jobs": len(tasks),
+        "num_valid": len(valid_jobs),
+        "num_failed": len(failed_jobs),
+    }
+
+
+MANIFEST_COLUMNS = [
+    "shard_id",
+    "valid_path",
+    "failed_path",
+    "num_jobs",
+    "num_valid",
+    "num_failed",
+]
+
+
+def sharded_parse(parse_func, tasks, output_file_name, shard_dir, n_jobs=1, keyed=True):
+    """
+    Parse ``(mol_id, args)`` tasks in parallel with one worker per ``mol_id // 1000`` shard.
+    Each worker writes its own ``{output_file_name}_shard_{shard_id}.pkl`` and
+    ``{output_file_name}_shard_{shard_id}_failed.pkl`` to ``shard_dir``, and the parent only
+    writes ``{output_file_name}_manifest.csv`` listing the shards, so that the memory of the
+    parent process does not grow with the number of molecules.
+    """
+    os.makedirs(shard_dir, exist_ok=True)
+    shard_to_tasks = group_by_shard(tasks)
+
+    out = Parallel(n_jobs=n_jobs, backend="multiprocessing", verbose=5)(
+        delayed(parse_shard)(
+            parse_func, shard_id, shard_tasks, output_file_name, shard_dir, keyed
+        )
+        for shard_id, shard_tasks in tqdm(shard_to_tasks.items())
+    )
+
+    manifest_df = pd.DataFrame(out, columns=MANIFEST_COLUMNS).sort_values(
+        "shard_id", ignore_index=True
+    )
+    manifest_df.to_csv(
+        os.path.join(shard_dir, f"{output_file_name}_manifest.csv"), index=False
+    )
+    return manifest_df
+
+
+def iter_shards(manifest_path, failed=False):
+    """
+    Yield the results of one shard at a time from a manifest written by ``sharded_parse``.
+    """
+    manifest_df = pd.read_csv(manifest_path)
+    column = "failed_path" if failed else "valid_path"
+    for path in manifest_df[column]:
+        with open(path, "rb") as f:
+            yield pkl.load(f)
+
+
+def load_shards(manifest_path, failed=False):
+    """
+    Merge all shards of a manifest into one dictionary.
+    """
+    jobs = dict()
+    for shard_jobs in iter_shards(manifest_path, failed=failed):
+        jobs.update(shard_jobs)
+    return jobs
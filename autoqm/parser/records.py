@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+import numpy as np
+
+from .elements import atomic_numbers_to_symbols
+from .utils import make_xyz_str
+
+
+class Record:
+    """
+    Base of the typed parser records, whose fields are stored in ``__slots__`` and pickled as
+    a tuple. The NumPy fields listed in ``ARRAY_FIELDS`` with their dtype and shape are
+    pickled as raw bytes, and unpickled as read-only arrays over these bytes.
+    """
+
+    __slots__ = ()
+    ARRAY_FIELDS = {}
+
+    def __getstate__(self):
+        return tuple(
+            (
+                getattr(self, name).tobytes()
+                if name in self.ARRAY_FIELDS
+                else getattr(self, name)
+            )
+            for name in self.__slots__
+        )
+
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            if name in self.ARRAY_FIELDS:
+                dtype, shape = self.ARRAY_FIELDS[name]
+                dtype = np.dtype(dtype)
+                size = len(value) // dtype.itemsize // int(np.prod(shape[1:]))
+                value = np.ndarray((size, *shape[1:]), dtype=dtype, buffer=value)
+            setattr(self, name, value)
+
+
+class ResultRecord(Record):
+    """
+    Record of a parsed job. ``LEGACY_KEYS`` maps the keys of the former result dicts to the
+    attributes giving their values, so that a record can still be read like those dicts,
+    e.g. ``record["semiempirical_xyz"]`` or ``{**record}``.
+    """
+
+    __slots__ = ()
+    LEGACY_KEYS = {}
+
+    def keys(self):
+        return self.LEGACY_KEYS.keys()
+
+    def __getitem__(self, key):
+        return getattr(self, self.LEGACY_KEYS[key])
+
+    def __contains__(self, key):
+        return key in self.LEGACY_KEYS
+
+    def __iter__(self):
+        return iter(self.LEGACY_KEYS)
+
+    def __len__(self):
+        return len(self.LEGACY_KEYS)
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def items(self):
+        return ((key, self[key]) for key in self.keys())
+
+    def to_dict(self):
+        return dict(self.items())
+
+
+class Geometry(Record):
+    """
+    Atomic numbers and coordinates (angstrom) of a geometry, converted to a xyz string or
+    dict only on request.
+    """
+
+    __slots__ = ("atomic_numbers", "coords")
+    ARRAY_FIELDS = {"atomic_numbers": (np.uint8, (-1,)), "coords": (float, (-1, 3))}
+
+    def __init__(self, atomic_numbers, coords):
+        self.atomic_numbers = np.asarray(atomic_numbers, dtype=np.uint8)
+        self.coords = np.asarray(coords, dtype=float).reshape(-1, 3)
+
+    @property
+    def symbols(self):
+        return atomic_numbers_to_symbols(self.atomic_numbers)
+
+    def to_xyz_str(self):
+        return make_xyz_str(self.symbols, self.coords)
+
+    def to_xyz_dict(self):
+        """
+        ``{center_number: (symbol, (x, y, z))}`` with center numbers starting at 1.
+        """
+        return {
+            i + 1: (symbol, tuple(coord))
+            for i, (symbol, coord) in enumerate(zip(self.symbols, self.coords.tolist()))
+        }
+
+
+class SemiempiricalConformer(ResultRecord):
+    """
+    Result of a semiempirical optimization and frequency job of a conformer.
+    """
+
+    __slots__ = (
+        "mol_smi",
+        "title_card",
+        "freq",
+        "geometry",
+        "geometry_std_ori",
+        "steps",
+        "energy",
+        "cpu",
+        "wall",
+    )
+    ARRAY_FIELDS = {"freq": (float, (-1,))}
+    ENERGY_KEYS = ("scf", "zpe_unscaled", "scf_zpe_unscaled", "gibbs")
+    LEGACY_KEYS = {
+        "mol_smi": "mol_smi",
+        "semiempirical_title_card": "title_card",
+        "semiempirical_freq": "freq_list",
+        "semiempirical_xyz": "xyz",
+        "semiempirical_xyz_dict": "xyz_dict",
+        "semiempirical_steps": "steps",
+        "semiempirical_xyz_std_ori": "xyz_std_ori",
+        "semiempirical_xyz_dict_std_ori": "xyz_dict_std_ori",
+        "semiempirical_energy": "energy_dict",
+        "semiempirical_cpu": "cpu",
+        "semiempirical_wall": "wall",
+    }
+
+    def __init__(
+        self,
+        mol_smi,
+        title_card,
+        freq,
+        geometry,
+        geometry_std_ori,
+        steps,
+        energy,
+        cpu,
+        wall,
+    ):
+        self.mol_smi = mol_smi
+        self.title_card = title_card
+        self.freq = np.asarray(freq, dtype=float)
+        self.geometry = geometry
+        self.geometry_std_ori = geometry_std_ori
+        self.steps = steps
+        self.energy = tuple(float(energy[key]) for key in self.ENERGY_KEYS)
+        self.cpu = cpu
+        self.wall = wall
+
+    @property
+    def freq_list(self):
+        return self.freq.tolist()
+
+    @property
+    def xyz(self):
+        return self.geometry.to_xyz_str()
+
+    @property
+    def xyz_dict(self):
+        return self.geometry.to_xyz_dict()
+
+    @property
+    def xyz_std_ori(self):
+        return self.geometry_std_ori.to_xyz_str()
+
+    @property
+    def xyz_dict_std_ori(self):
+        return self.geometry_std_ori.to_xyz_dict()
+
+    @property
+    def energy_dict(self):
+        return dict(zip(self.ENERGY_KEYS, self.energy))
@@ -0,0 +1,289 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+import json
+import logging
+import os
+import pickle as pkl
+
+import pandas as pd
+
+from autoqm.parser.parallel import iter_shards
+
+COSMO_PROPS = [
+    "H (bar)",
+    "ln(gamma)",
+    "Pvap (bar)",
+    "Gsolv (kcal/mol)",
+    "Hsolv (kcal/mol)",
+]
+
+
+def results_to_frame(results, id_column="id"):
+    """
+    Convert ``{mol_id: {prop: value}}`` results (e.g. DFT or DLPNO) to a frame with one row per molecule.
+    """
+    df = pd.DataFrame.from_dict(results, orient="index")
+    df.index.name = id_column
+    return df
+
+
+def conf_results_to_frame(results, id_column="id"):
+    """
+    Convert ``{mol_id: {conf_id: {prop: value}}}`` results (e.g. FF or semiempirical) to a frame
+    with one row per conformer and ``id_column``, ``conf_id`` and one column per property.
+    """
+    records = [
+        {id_column: mol_id, "conf_id": conf_id, **conf_dict}
+        for mol_id, mol_dict in results.items()
+        for conf_id, conf_dict in mol_dict.items()
+    ]
+    return pd.DataFrame.from_records(
+        records, columns=None if records else [id_column, "conf_id"]
+    )
+
+
+def conf_frame_to_columns(conf_df, num_confs=10, id_column="id"):
+    """
+    Pivot a conformer frame to one row per molecule with ``{prop}_conf_{conf_id}`` columns.
+    Columns are created for at least ``num_confs`` conformers.
+    """
+    prop_names = [col for col in conf_df.columns if col not in (id_column, "conf_id")]
+    conf_ids = sorted(set(range(num_confs)) | set(conf_df["conf_id"]))
+
+    wide_df = conf_df.set_index([id_column, "conf_id"])[prop_names].unstack("conf_id")
+    wide_df = wide_df.reindex(
+        columns=pd.MultiIndex.from_product([prop_names, conf_ids])
+    )
+    wide_df.columns = [
+        f"{prop_name}_conf_{conf_id}" for prop_name, conf_id in wide_df.columns
+    ]
+    return wide_df
+
+
+def get_min_energy_conf(
+    conf_df, energy_column="semiempirical_energy", energy_key="scf", id_column="id"
+):
+    """
+    Select the lowest energy conformer of each molecule, with ``energy_key`` of the ``energy_column`` dicts.
+    """
+    energies = (
+        conf_df[energy_column].map(lambda energy: energy[energy_key]).astype(float)
+    )
+    min_index = energies.groupby(conf_df[id_column]).idxmin()
+    return conf_df.loc[min_index.values].drop(columns="conf_id").set_index(id_column)
+
+
+def min_energy_conf_to_columns(
+    conf_df, energy_column="semiempirical_energy", energy_key="scf", id_column="id"
+):
+    min_df = get_min_energy_conf(
+        conf_df, energy_column=energy_column, energy_key=energy_key, id_column=id_column
+    )
+    return min_df.add_suffix("_min_energy_conf")
+
+
+def cosmo_results_to_columns(
+    cosmo_df, props=COSMO_PROPS, id_column="id", project_column="project"
+):
+    """
+    Pivot the long COSMO results frame to one row per ``(project, solute)`` with
+    ``{solvent_name}_{temp}_{prop}`` columns. Solute ids are only unique within a project,
+    e.g. the TS and species projects both number from 0, so the project is part of the index.
+    """
+    keys = [project_column, "solute_name"]
+    cosmo_df = cosmo_df.drop_duplicates(
+        subset=keys + ["solvent_name", "temp (K)"], keep="last"
+    )
+    wide_df = cosmo_df.pivot(
+        index=keys, columns=["solvent_name", "temp (K)"], values=props
+    )
+    wide_df = wide_df.reorder_levels([1, 2, 0], axis=1)
+    wide_df = wide_df.reindex(
+        columns=pd.MultiIndex.from_product(
+            [
+                cosmo_df["solvent_name"].unique(),
+                cosmo_df["temp (K)"].unique(),
+                props,
+            ]
+        )
+    )
+    wide_df.columns = [
+        f"{solvent_name}_{temp}_{prop}" for solvent_name, temp, prop in wide_df.columns
+    ]
+    wide_df.index.names = [project_column, id_column]
+    return wide_df
+
+
+def join_columns(df, columns_df, id_column="id"):
+    """
+    Add the per-molecule columns to ``df`` by matching ``id_column``, keeping the rows of ``df``.
+    """
+    return df.join(columns_df, on=id_column)
+
+
+# stages of the results table in the order of the columns, and whether the results are per conformer
+RESULTS_STAGES = {
+    "ff": {"conf": True, "min_energy_conf": False},
+    "semiempirical": {"conf": True, "min_energy_conf": True},
+    "dft": {"conf": False, "min_energy_conf": False},
+    "dlpno": {"conf": False, "min_energy_conf": False},
+}
+
+PROP_NAMES_TO_REMOVE = ["mol_smi"]
+
+
+def load_manifest(manifest_path):
+    """
+    Load a project manifest of the form::
+
+        {
+            "output_table": "path to the compiled results table",
+            "output_cosmo_table": "path to the compiled COSMO results table",
+            "output_cosmo_columns_table": "path to the COSMO table with one row per (project, solute id)",
+            "cache_dir": "folder for the compiled table of each project",
+            "projects": {
+                "project_name": {
+                    "inputs": "inputs csv", "ff": "...", "semiempirical": "...",
+                    "dft": "...", "dlpno": "...", "cosmo": "..."
+                }
+            }
+        }
+
+    Stages missing from a project are skipped, and the output tables other than
+    ``output_table`` are optional. The results of the ff, semiempirical, dft and dlpno stages
+    are either a results pickle or the ``{output_file_name}_manifest.csv`` of a sharded parse.
+    """
+    with open(manifest_path, "r") as f:
+        manifest = json.load(f)
+    for project, project_config in manifest["projects"].items():
+        if "inputs" not in project_config:
+            raise ValueError(f"No inputs file for project {project} in {manifest_path}")
+    return manifest
+
+
+def get_file_stamp(paths):
+    stamp = {}
+    for path in paths:
+        stat = os.stat(path)
+        stamp[path] = [stat.st_mtime_ns, stat.st_size]
+    return stamp
+
+
+def is_shard_manifest(path):
+    return path.endswith("_manifest.csv")
+
+
+def get_stage_paths(path):
+    """
+    Files of the results of a stage, i.e. the results pickle, or a shard manifest and its shards.
+    """
+    if not is_shard_manifest(path):
+        return [path]
+    return [path] + list(pd.read_csv(path)["valid_path"])
+
+
+def iter_stage_results(path):
+    """
+    Yield the results of a stage, in one piece for a results pickle and one shard at a time
+    for a shard manifest.
+    """
+    if is_shard_manifest(path):
+        yield from iter_shards(path)
+    else:
+        with open(path, "rb") as f:
+            yield pkl.load(f)
+
+
+def get_stage_columns(results, conf=False, min_energy_conf=False):
+    if conf:
+        conf_df = conf_results_to_frame(results)
+        columns_df = conf_frame_to_columns(conf_df)
+        if min_energy_conf:
+            columns_df = columns_df.join(min_energy_conf_to_columns(conf_df))
+    else:
+        columns_df = results_to_frame(results)
+        columns_df = columns_df.drop(columns=PROP_NAMES_TO_REMOVE, errors="ignore")
+    return columns_df
+
+
+def compile_project(project, project_config, cache_dir=None):
+    """
+    Compile the results table of one project. The stage results are only loaded when the
+    project is rebuilt, and the compiled table is cached in ``cache_dir`` together with the
+    modification time and size of the input files, so that it is only rebuilt when they change.
+    """
+    paths = [project_config["inputs"]]
+    for stage in RESULTS_STAGES:
+        if stage in project_config:
+            paths += get_stage_paths(project_config[stage])
+    stamp = get_file_stamp(paths)
+
+    if cache_dir is not None:
+        cache_path = os.path.join(cache_dir, f"{project}_results_table.pkl")
+        if os.path.exists(cache_path):
+            with open(cache_path, "rb") as f:
+                cache = pkl.load(f)
+            if cache["stamp"] == stamp:
+                logging.info(f"Using cached results table for {project}")
+                return cache["df"]
+
+    logging.info(f"Compiling results table for {project}")
+    df = pd.read_csv(project_config["inputs"], index_col=0)
+    df["project"] = project
+
+    for stage, stage_config in RESULTS_STAGES.items():
+        if stage not in project_config:
+            continue
+        logging.info(f"Filling {stage} results for {project}")
+        # the molecules of a shard are not in any other shard, so the columns of each shard
+        # are built separately and only the columns are kept in memory
+        columns_dfs = [
+            get_stage_columns(results, **stage_config)
+            for results in iter_stage_results(project_config[stage])
+            if results
+        ]
+        if not columns_dfs:
+            continue
+        df = join_columns(df, pd.concat(columns_dfs))
+        del columns_dfs
+
+    if "dft_input_xyz" in df.columns and "ff_xyz_conf_0" in df.columns:
+        df["dft_input_xyz_source"] = None
+        df.loc[df["dft_input_xyz"].notna(), "dft_input_xyz_source"] = (
+            "semiempirical_xyz_min_energy_conf"
+        )
+        df.loc[df["ff_xyz_conf_0"] == df["dft_input_xyz"], "dft_input_xyz_source"] = (
+            "ff_xyz_conf_0"
+        )
+
+    if cache_dir is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(cache_path, "wb") as f:
+            pkl.dump({"stamp": stamp, "df": df}, f, protocol=pkl.HIGHEST_PROTOCOL)
+
+    return df
+
+
+def merge_project_tables(df, path, project_order):
+    """
+    Merge the table ``df`` of some projects into the table saved at ``path``, replacing the
+    rows of these projects and keeping those of the others, with the rows ordered as the
+    projects in ``project_order``. ``df`` is returned as is if ``path`` does not exist yet.
+    """
+    if not os.path.exists(path):
+        return df
+    with open(path, "rb") as f:
+        saved_df = pkl.load(f)
+    saved_df = saved_df[~saved_df["project"].isin(df["project"].unique())]
+    merged_df = pd.concat([saved_df, df], ignore_index=True)
+    project_rank = {project: rank for rank, project in enumerate(project_order)}
+    order = merged_df["project"].map(project_rank).fillna(len(project_rank))
+    return merged_df.iloc[order.argsort(kind="stable")].reset_index(drop=True)
+
+
+def load_cosmo_project(project, project_config):
+    with open(project_config["cosmo"], "rb") as f:
+        cosmo_result = pkl.load(f)
+    cosmo_result["project"] = project
+    return cosmo_result
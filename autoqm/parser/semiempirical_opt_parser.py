@@ -7,131 +7,15 @@ import tarfile
 import numpy as np
 import rdkit
 
-from rdmc.mol import RDKitMol
-
-from .utils import make_xyz_str
-
-periodictable = [
-    "",
-    "H",
-    "He",
-    "Li",
-    "Be",
-    "B",
-    "C",
-    "N",
-    "O",
-    "F",
-    "Ne",
-    "Na",
-    "Mg",
-    "Al",
-    "Si",
-    "P",
-    "S",
-    "Cl",
-    "Ar",
-    "K",
-    "Ca",
-    "Sc",
-    "Ti",
-    "V",
-    "Cr",
-    "Mn",
-    "Fe",
-    "Co",
-    "Ni",
-    "Cu",
-    "Zn",
-    "Ga",
-    "Ge",
-    "As",
-    "Se",
-    "Br",
-    "Kr",
-    "Rb",
-    "Sr",
-    "Y",
-    "Zr",
-    "Nb",
-    "Mo",
-    "Tc",
-    "Ru",
-    "Rh",
-    "Pd",
-    "Ag",
-    "Cd",
-    "In",
-    "Sn",
-    "Sb",
-    "Te",
-    "I",
-    "Xe",
-    "Cs",
-    "Ba",
-    "La",
-    "Ce",
-    "Pr",
-    "Nd",
-    "Pm",
-    "Sm",
-    "Eu",
-    "Gd",
-    "Tb",
-    "Dy",
-    "Ho",
-    "Er",
-    "Tm",
-    "Yb",
-    "Lu",
-    "Hf",
-    "Ta",
-    "W",
-    "Re",
-    "Os",
-    "Ir",
-    "Pt",
-    "Au",
-    "Hg",
-    "Tl",
-    "Pb",
-    "Bi",
-    "Po",
-    "At",
-    "Rn",
-    "Fr",
-    "Ra",
-    "Ac",
-    "Th",
-    "Pa",
-    "U",
-    "Np",
-    "Pu",
-    "Am",
-    "Cm",
-    "Bk",
-    "Cf",
-    "Es",
-    "Fm",
-    "Md",
-    "No",
-    "Lr",
-    "Rf",
-    "Db",
-    "Sg",
-    "Bh",
-    "Hs",
-    "Mt",
-    "Ds",
-    "Rg",
-    "Uub",
-    "Uut",
-    "Uuq",
-    "Uup",
-    "Uuh",
-    "Uus",
-    "Uuo",
-]
+from .connectivity import (
+    get_reference_connectivity,
+    get_xyz_connectivity,
+    perceive_connectivity,
+    same_connectivity,
+)
+from .elements import atomic_numbers_to_symbols
+from .records import Geometry, SemiempiricalConformer
+from .utils import format_xyz, make_xyz_str
 
 
 def check_job_status(member, tar):
@@ -181,16 +65,13 @@ def get_wall(member, tar):
 
 
 def make_input_file_from_xyz(symbols, coords):
-    xyz_str = ""
-    for s, c in zip(symbols, coords):
-        xyz_str = xyz_str + f"{s}  {c[0]: .10f}  {c[1]: .10f}  {c[2]: .10f}\n"
-    return xyz_str
+    return format_xyz(symbols, coords)
 
 
 # In[10]:
 
 
-def load_geometry(member, tar, periodictable=periodictable, initial=False):
+def load_geometry(member, tar, initial=False):
     """
     Return the optimum geometry of the molecular configuration from the
     Gaussian log file. If multiple such geometries are identified, only the
@@ -222,7 +103,7 @@ def load_geometry(member, tar, periodictable=periodictable, initial=False):
             break
 
     number = np.array(number)
-    symbol = [periodictable[x] for x in number]
+    symbol = atomic_numbers_to_symbols(number)
 
     xyz_dict = dict()
     for x in zip(idx, symbol, coord):
@@ -232,7 +113,7 @@ def load_geometry(member, tar, periodictable=periodictable, initial=False):
     return xyz_str, xyz_dict, step
 
 
-def load_geometry_std(member, tar, periodictable=periodictable, initial=False):
+def load_geometry_std(member, tar, initial=False):
     """
     Return the optimum geometry IN STANDARD ORIENTATION of the molecular configuration from the
     Gaussian log file. If multiple such geometries are identified, only the
@@ -264,7 +145,7 @@ def load_geometry_std(member, tar, periodictable=periodictable, initial=False):
             break
 
     number = np.array(number)
-    symbol = [periodictable[x] for x in number]
+    symbol = atomic_numbers_to_symbols(number)
 
     xyz_dict = dict()
     for x in zip(idx, symbol, coord):
@@ -274,6 +155,43 @@ def load_geometry_std(member, tar, periodictable=periodictable, initial=False):
     return xyz_str, xyz_dict, step
 
 
+def load_geometries(member, tar):
+    """
+    Return the last geometries in input and standard orientation and the number of
+    optimization steps, reading the log once.
+    """
+    orientations = {b"Input orientation:": [], b"Standard orientation:": []}
+    f = tar.extractfile(member)
+    line = f.readline()
+    while line != b"":
+        for orientation, geometries in orientations.items():
+            if orientation in line:
+                number, coord = [], []
+                for i in range(5):
+                    line = f.readline()
+                while (
+                    b"---------------------------------------------------------------------"
+                    not in line
+                ):
+                    data = line.split()
+                    number.append(int(data[1]))
+                    coord.append([float(data[3]), float(data[4]), float(data[5])])
+                    line = f.readline()
+                geometries.append((number, coord))
+                break
+        line = f.readline()
+
+    geometry, geometry_std_ori = [
+        Geometry(*geometries[-1]) if geometries else Geometry([], [])
+        for geometries in orientations.values()
+    ]
+    # both orientations share the atomic numbers
+    if np.array_equal(geometry.atomic_numbers, geometry_std_ori.atomic_numbers):
+        geometry_std_ori.atomic_numbers = geometry.atomic_numbers
+    step = len(orientations[b"Input orientation:"]) - 1
+    return geometry, geometry_std_ori, step
+
+
 # In[11]:
 
 
@@ -297,7 +215,7 @@ def load_freq(member, tar):
     return frequencies
 
 
-def load_first_mode(member, tar, periodictable=periodictable):
+def load_first_mode(member, tar):
     f = tar.extractfile(member)
     line = f.readline()
 
@@ -318,7 +236,7 @@ def load_first_mode(member, tar, periodictable=periodictable):
         line = f.readline()
 
         number = np.array(number)
-        symbol = [periodictable[x] for x in number]
+        symbol = atomic_numbers_to_symbols(number)
 
         result = dict()
         for x in zip(idx, symbol, coord):
@@ -467,7 +385,13 @@ def get_title_card(member, tar, flag=b"Initial command:"):
     return title_card.decode()
 
 
-def semiempirical_opt_parser(mol_id, mol_smi, mol_confs_tar=None):
+def semiempirical_opt_parser(
+    mol_id,
+    mol_smi,
+    mol_confs_tar=None,
+    pre_connectivity=None,
+    connectivity_backend="numpy",
+):
 
     valid_job = dict()
     failed_job = dict()
@@ -483,7 +407,8 @@ def semiempirical_opt_parser(mol_id, mol_smi, mol_confs_tar=None):
         valid_job[mol_id] = dict()
         failed_job[mol_id] = dict()
 
-        pre_adj = RDKitMol.FromSmiles(mol_smi).GetAdjacencyMatrix()
+        if pre_connectivity is None:
+            pre_connectivity = get_reference_connectivity(mol_smi)
 
         tar = tarfile.open(mol_confs_tar)
         for member in tar:
@@ -499,42 +424,32 @@ def semiempirical_opt_parser(mol_id, mol_smi, mol_confs_tar=None):
                 failed_job[mol_id][conf_id] = "freq check"
                 continue
 
-            xyz, _, _ = load_geometry(member, tar)
+            geometry, geometry_std_ori, steps = load_geometries(member, tar)
             try:
-                post_mol = RDKitMol.FromXYZ(
-                    xyz,
-                    header=False,
-                    sanitize=False,
-                )
+                if connectivity_backend == "numpy":
+                    post_connectivity = perceive_connectivity(
+                        geometry.atomic_numbers, geometry.coords
+                    )
+                else:
+                    post_connectivity = get_xyz_connectivity(
+                        geometry.to_xyz_str(), backend=connectivity_backend
+                    )
             except Exception as e:
                 failed_job[mol_id][conf_id] = f"rdkit failed with {e}"
                 continue
-            post_adj = post_mol.GetAdjacencyMatrix()
-            if (pre_adj == post_adj).all():
-
-                valid_job[mol_id][conf_id] = dict()
-                valid_job[mol_id][conf_id]["mol_smi"] = mol_smi
-                valid_job[mol_id][conf_id]["semiempirical_title_card"] = get_title_card(
-                    member, tar
-                )
-                valid_job[mol_id][conf_id]["semiempirical_freq"] = load_freq(
-                    member, tar
-                )
-                (
-                    valid_job[mol_id][conf_id]["semiempirical_xyz"],
-                    valid_job[mol_id][conf_id]["semiempirical_xyz_dict"],
-                    valid_job[mol_id][conf_id]["semiempirical_steps"],
-                ) = load_geometry(member, tar)
-                (
-                    valid_job[mol_id][conf_id]["semiempirical_xyz_std_ori"],
-                    valid_job[mol_id][conf_id]["semiempirical_xyz_dict_std_ori"],
-                    _,
-                ) = load_geometry_std(member, tar)
-                valid_job[mol_id][conf_id]["semiempirical_energy"] = load_energies(
-                    member, tar
+            if same_connectivity(pre_connectivity, post_connectivity):
+
+                valid_job[mol_id][conf_id] = SemiempiricalConformer(
+                    mol_smi=mol_smi,
+                    title_card=get_title_card(member, tar),
+                    freq=load_freq(member, tar),
+                    geometry=geometry,
+                    geometry_std_ori=geometry_std_ori,
+                    steps=steps,
+                    energy=load_energies(member, tar),
+                    cpu=get_cpu(member, tar),
+                    wall=get_wall(member, tar),
                 )
-                valid_job[mol_id][conf_id]["semiempirical_cpu"] = get_cpu(member, tar)
-                valid_job[mol_id][conf_id]["semiempirical_wall"] = get_wall(member, tar)
             else:
                 failed_job[mol_id][conf_id] = "adjacency matrix"
                 continue
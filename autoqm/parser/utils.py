@@ -1,9 +1,38 @@
 #!/usr/bin/env python
 # coding: utf-8
 
+import numpy as np
+
+XYZ_ROW_FORMAT = "%s  % .10f  % .10f  % .10f\n"
+
+
+def format_xyz(symbols, coords, row_format=XYZ_ROW_FORMAT):
+    """
+    Xyz string without the header lines of ``symbols`` and (N, 3) ``coords``. The rows are
+    formatted into a single buffer with one ``%`` operation, as ``np.savetxt`` does with
+    ``row_format``, instead of concatenating the lines one by one.
+    """
+    coords = np.asarray(coords, dtype=float).reshape(-1, 3)
+    values = np.empty((len(coords), 4), dtype=object)
+    values[:, 0] = symbols
+    values[:, 1:] = coords
+    return (row_format * len(coords)) % tuple(values.ravel().tolist())
+
+
+def parse_xyz(xyz_str, header=False):
+    """
+    Symbols and (N, 3) coordinates of a xyz string, parsed in bulk from its whitespace
+    separated tokens. The number of atoms and comment lines are skipped if ``header``.
+    """
+    if header:
+        xyz_str = "".join(xyz_str.split("\n", 2)[2:])
+    tokens = xyz_str.split()
+    if len(tokens) % 4:
+        raise ValueError("Xyz string does not have 4 columns")
+    symbols = tokens[0::4]
+    del tokens[0::4]
+    return symbols, np.array(tokens, dtype=float).reshape(-1, 3)
+
 
 def make_xyz_str(symbols, coords):
-    xyz_str = ""
-    for s, c in zip(symbols, coords):
-        xyz_str = xyz_str + f"{s}  {c[0]: .10f}  {c[1]: .10f}  {c[2]: .10f}\n"
-    return xyz_str
+    return format_xyz(symbols, coords)
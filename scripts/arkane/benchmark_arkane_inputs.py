@@ -0,0 +1,74 @@
+"""
+This module benchmarks the per-species cost of rendering Arkane species and thermo inputs,
+with and without the template and model chemistry caches
+"""
+
+import argparse
+import time
+
+from autoqm.arkane.input_template.base import get_template
+from autoqm.arkane.input_template.input_template import (
+    ArkaneSpecies,
+    ArkaneThermo,
+    get_freq_scale_factor,
+    get_model_chemistry,
+)
+
+
+def clear_caches():
+    get_template.cache_clear()
+    get_model_chemistry.cache_clear()
+    get_freq_scale_factor.cache_clear()
+
+
+def render_species_inputs(n_species, model_chemistry, cached=True):
+    start_time = time.time()
+    for i in range(n_species):
+        if not cached:
+            clear_caches()
+        ArkaneSpecies(
+            {
+                "model_chemistry": model_chemistry,
+                "atom_dict": {"C": 1, "H": 4},
+                "bond_dict": {"C-H": 4},
+                "external_symmetry": 12,
+                "freq": f"freq_{i}.log",
+                "sp": f"sp_{i}.log",
+            }
+        ).rendered_template
+        ArkaneThermo(
+            {
+                "model_chemistry": model_chemistry,
+                "species_label": f"id{i}",
+                "species_file": f"id{i}.py",
+                "species_smiles": "C",
+            }
+        ).rendered_template
+    return (time.time() - start_time) / n_species
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--n_species", type=int, help="Number of species to render", default=1000
+    )
+    parser.add_argument(
+        "--model_chemistry",
+        type=str,
+        help="Model chemistry of the inputs",
+        default="wb97xd/def2svp",
+    )
+    args = parser.parse_args()
+
+    clear_caches()
+    uncached = render_species_inputs(args.n_species, args.model_chemistry, cached=False)
+    clear_caches()
+    cached = render_species_inputs(args.n_species, args.model_chemistry, cached=True)
+
+    print(f"Uncached: {uncached * 1000:.3f} ms per species")
+    print(f"Cached: {cached * 1000:.3f} ms per species")
+    print(f"Speedup: {uncached / cached:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,128 +2,290 @@
 This module computes rate coefficient from .csv file containing energies and frequencies
 """
 
-import ast
 import logging
+import shutil
 
 from copy import deepcopy
-import pandas as pd
+import numpy as np
 from joblib import Parallel, delayed
 
 from arkane.kinetics import KineticsJob
-from rmgpy import constants
+from rmgpy.kinetics import Arrhenius
 from rmgpy.kinetics.tunneling import Eckart
-from rmgpy.molecule import Molecule
-from rmgpy.molecule.element import get_element
 from rmgpy.reaction import Reaction
 from rmgpy.species import Species, TransitionState
+from tst import (
+    conformers_to_species_data,
+    fit_arrhenius,
+    get_default_temperatures,
+    get_tst_rate_coefficients,
+)
 from utils import (
+    get_atomic_numbers_and_coords,
+    get_frequencies,
     get_lot_and_freq_scale,
+    get_mass,
     get_rmg_conformer,
+    get_xyz,
+    load_input_table,
     parse_command_line_arguments,
-    xyz_str_to_coords,
 )
 
 # get logger
 logger = logging.getLogger()
 
 
-def get_rmg_conformer_from_df(
-    row,
+SPC_LABELS = ["r1", "r2", "p1", "p2"]
+
+
+def get_energy_column(energy_level, spc_label):
+    if energy_level == "qgdlpnoccsd(t)f12d/ccpvtzf12":
+        return f"{spc_label}_dlpno_sp_hartree"
+    elif energy_level == "qgwb97xd/def2svp":
+        return f"{spc_label}_dft_hartreefock_energy_hartree"
+    else:
+        raise ValueError(f"Energy level {energy_level} not recognized")
+
+
+def get_species_data(row, spc_label, energy_level):
+    """
+    Smiles, geometry, frequencies and electronic energy of a reactant or product.
+    """
+    return (
+        row[f"{spc_label}smi"],
+        get_xyz(row, f"{spc_label}_matched_std_xyz_str"),
+        row[f"{spc_label}_dft_frequencies"],
+        row[get_energy_column(energy_level, spc_label)],
+    )
+
+
+def get_species_key(species_data):
+    """
+    Key of a reactant or product, the same species in different reactions share the same key.
+    The arrays of the typed input tables are compared by their bytes.
+    """
+    smi, xyz, frequencies, e_electronic = species_data
+    if not isinstance(xyz, str):
+        atomic_numbers, coords = xyz
+        xyz = (
+            np.asarray(atomic_numbers, dtype=np.uint8).tobytes(),
+            np.asarray(coords, dtype=float).tobytes(),
+        )
+    if not isinstance(frequencies, str):
+        frequencies = np.asarray(frequencies, dtype=float).tobytes()
+    return smi, xyz, frequencies, e_electronic
+
+
+def get_conformer(
+    label,
+    xyz,
+    frequencies,
+    e_electronic,
+    multiplicity,
+    molecule,
+    level_of_theory,
     freq_scale,
-    energy_level,
-    freq_level,
-    energy_software,
-    freq_software,
     use_atom_corrections,
     use_bond_corrections,
     bac_type,
     scr_dir=None,
+    symmetry_cache=None,
+    symmetry_cache_dir=None,
 ):
-    # No bond correction at this moment
-
-    level_of_theory, freq_scale = get_lot_and_freq_scale(
-        energy_level=energy_level,
-        freq_level=freq_level,
-        energy_software=energy_software,
-        freq_software=freq_software,
-        freq_scale=freq_scale,
-    )
-
-    rmg_conformers = []
+    atomic_numbers, coords = get_atomic_numbers_and_coords(xyz)
+    mass = get_mass(atomic_numbers)
 
-    for spc_label in ["ts", "r1", "r2", "p1", "p2"]:
+    frequencies = get_frequencies(frequencies)
 
+    if isinstance(e_electronic, str):
+        e_electronic = float(e_electronic)
 
-        if spc_label == "ts":
-            molecule = None
-            multiplicity = row["multiplicity"]
-            use_bond_corrections = False
-        else:
-            molecule = Molecule().from_smiles(row[f"{spc_label}smi"])
-            multiplicity = molecule.multiplicity
+    e_electronic = e_electronic * 2625500  # hartree to J/mol
 
-        if spc_label == "ts":
-            xyz = row["std_xyz_str"]
-        else:
-            xyz = row[f"{spc_label}_matched_std_xyz_str"]
-        atomic_numbers, coords = xyz_str_to_coords(xyz)
-        mass = (
-            sum(
-                [
-                    get_element(int(atomic_number)).mass
-                    for atomic_number in atomic_numbers
-                ]
-            )
-            / constants.Na,
-            "kg",
-        )
-
-        frequencies = ast.literal_eval(row[f"{spc_label}_dft_frequencies"])
+    return get_rmg_conformer(
+        label=label,
+        level_of_theory=level_of_theory,
+        e_electronic=e_electronic,
+        frequencies=frequencies,
+        coords=coords,
+        numbers=atomic_numbers,
+        mass=mass,
+        multiplicity=multiplicity,
+        freq_scale=freq_scale,
+        molecule=molecule,
+        use_atom_corrections=use_atom_corrections,
+        use_bond_corrections=use_bond_corrections,
+        bac_type=bac_type,
+        scr_dir=scr_dir,
+        symmetry_cache=symmetry_cache,
+        symmetry_cache_dir=symmetry_cache_dir,
+    )
 
-        if energy_level == "qgdlpnoccsd(t)f12d/ccpvtzf12":
-            e_electronic = row[f"{spc_label}_dlpno_sp_hartree"]
-        elif energy_level == "qgwb97xd/def2svp":
-            e_electronic = row[f"{spc_label}_dft_hartreefock_energy_hartree"]
-        else:
-            raise ValueError(f"Energy level {energy_level} not recognized")
 
-        if isinstance(e_electronic, str):
-            e_electronic = float(e_electronic)
+def calc_species(
+    species_data,
+    level_of_theory,
+    freq_scale,
+    energy_level,
+    scr_dir=None,
+    symmetry_cache=None,
+    symmetry_cache_dir=None,
+):
+    """
+    Build the RMG species of a reactant or product once for all reactions it appears in,
+    without bond corrections for the kinetics, and with Petersson (p) and Melius (m)
+    bond corrections for the reaction thermo.
+    """
+    smi, xyz, frequencies, e_electronic = species_data
 
-        e_electronic = e_electronic * 2625500  # hartree to J/mol
+    if energy_level == "qgdlpnoccsd(t)f12d/ccpvtzf12":
+        settings = {"kinetics": (False, "p"), "p": (True, "p"), "m": (True, "m")}
+    else:
+        settings = {"p": (True, "p"), "m": (True, "m")}
 
+    species = {}
+    for name, (use_bond_corrections, bac_type) in settings.items():
         try:
-            rmg_conformer = get_rmg_conformer(
-                label=spc_label,
-                level_of_theory=level_of_theory,
-                e_electronic=e_electronic,
+            spc = Species().from_smiles(smi)
+            molecule = spc.molecule[0]
+            spc.conformer = get_conformer(
+                label=smi,
+                xyz=xyz,
                 frequencies=frequencies,
-                coords=coords,
-                numbers=atomic_numbers,
-                mass=mass,
-                multiplicity=multiplicity,
-                freq_scale=freq_scale,
+                e_electronic=e_electronic,
+                multiplicity=molecule.multiplicity,
                 molecule=molecule,
-                use_atom_corrections=use_atom_corrections,
+                level_of_theory=level_of_theory,
+                freq_scale=freq_scale,
+                use_atom_corrections=True,
                 use_bond_corrections=use_bond_corrections,
                 bac_type=bac_type,
                 scr_dir=scr_dir,
+                symmetry_cache=symmetry_cache,
+                symmetry_cache_dir=symmetry_cache_dir,
             )
-            rmg_conformers.append(rmg_conformer)
         except Exception as e:
-            logger.error(f"Error in getting rmg conformer for {row.values}: {e}")
-            return None
+            logger.error(f"Error in getting rmg conformer for {smi} {xyz}: {e}")
+            spc = None
+        species[name] = spc
 
-    return rmg_conformers
+    return species
+
+
+def calc_species_batch(
+    batch,
+    level_of_theory,
+    freq_scale,
+    energy_level,
+    scr_dir,
+    symmetry_cache_dir=None,
+):
+    symmetry_cache = {}
+    species_list = []
+    try:
+        for species_data in batch:
+            species_list.append(
+                calc_species(
+                    species_data,
+                    level_of_theory,
+                    freq_scale,
+                    energy_level,
+                    scr_dir=scr_dir,
+                    symmetry_cache=symmetry_cache,
+                    symmetry_cache_dir=symmetry_cache_dir,
+                )
+            )
+    finally:
+        shutil.rmtree(scr_dir, ignore_errors=True)
+    return species_list
+
+
+def get_ts_conformer(
+    row,
+    freq_scale,
+    level_of_theory,
+    energy_level,
+    scr_dir=None,
+    symmetry_cache_dir=None,
+):
+    try:
+        return get_conformer(
+            label="ts",
+            xyz=get_xyz(row, "std_xyz_str"),
+            frequencies=row["ts_dft_frequencies"],
+            e_electronic=row[get_energy_column(energy_level, "ts")],
+            multiplicity=row["multiplicity"],
+            molecule=None,
+            level_of_theory=level_of_theory,
+            freq_scale=freq_scale,
+            use_atom_corrections=True,
+            use_bond_corrections=False,
+            bac_type="p",
+            scr_dir=scr_dir,
+            symmetry_cache_dir=symmetry_cache_dir,
+        )
+    except Exception as e:
+        logger.error(f"Error in getting rmg conformer for {row.values}: {e}")
+        return None
+
+
+def get_reaction_thermo(reaction_species, kinetics):
+    """
+    Reactions with Petersson (p) and Melius (m) bond corrected species for the reaction thermo.
+    """
+    rxns = []
+    for bac_type in ["p", "m"]:
+        spcs = [species[bac_type] for species in reaction_species]
+        if any(spc is None for spc in spcs):
+            rxns.append(None)
+            continue
+
+        spc_r1, spc_r2, spc_p1, spc_p2 = spcs
+        rxns.append(
+            Reaction(
+                reactants=[spc_r1, spc_r2],
+                products=[spc_p1, spc_p2],
+                kinetics=deepcopy(kinetics),
+            )
+        )
+    return rxns
+
+
+def get_kinetics_job(row, reaction_species, ts, **kwargs):
+    """
+    Arkane ``KineticsJob`` of a reaction with Eckart tunneling, or None if its TS or one of its
+    species could not be built. ``kwargs`` are passed to ``KineticsJob``.
+    """
+    spcs = [species["kinetics"] for species in reaction_species]
+    if ts is None or any(spc is None for spc in spcs):
+        return None
+
+    spc_r1, spc_r2, spc_p1, spc_p2 = spcs
+
+    neg_frequency = row["neg_freq"]
+    neg_frequency = (neg_frequency, "cm^-1")
+
+    spc_ts = TransitionState(
+        conformer=ts,
+        frequency=neg_frequency,
+        tunneling=Eckart(frequency=None, E0_reac=None, E0_TS=None, E0_prod=None),
+    )
+
+    rxn = Reaction(
+        reactants=[spc_r1, spc_r2],
+        products=[spc_p1, spc_p2],
+        transition_state=spc_ts,
+    )
+
+    return KineticsJob(reaction=rxn, **kwargs)
 
 
 def calc_rate_coefficient(
     row,
+    reaction_species,
     freq_scale,
+    level_of_theory,
     energy_level,
-    freq_level,
-    energy_software,
-    freq_software,
     Tmin=None,
     Tmax=None,
     Tcount=0,
@@ -131,65 +293,43 @@ def calc_rate_coefficient(
     sensitivity_conditions=None,
     three_params=True,
     scr_dir=None,
+    symmetry_cache_dir=None,
 ):
-    
+    """
+    Compute the kinetics and the reaction thermo of a reaction. ``reaction_species`` are the
+    species of r1, r2, p1 and p2 from ``calc_species``, so only the TS is built here.
+    """
+
     if energy_level == "qgwb97xd/def2svp":
         kinetics = None
 
     elif energy_level == "qgdlpnoccsd(t)f12d/ccpvtzf12":
         # get rates
-        output = get_rmg_conformer_from_df(
+        ts = get_ts_conformer(
             row,
             freq_scale,
+            level_of_theory,
             energy_level,
-            freq_level,
-            energy_software=energy_software,
-            freq_software=freq_software,
-            use_atom_corrections=True,
-            use_bond_corrections=False,
-            bac_type="p",
             scr_dir=scr_dir,
+            symmetry_cache_dir=symmetry_cache_dir,
         )
 
-        if output is None:
+        kinetics_job = get_kinetics_job(
+            row,
+            reaction_species,
+            ts,
+            Tmin=Tmin,
+            Tmax=Tmax,
+            Tcount=Tcount,
+            Tlist=Tlist,
+            sensitivity_conditions=sensitivity_conditions,
+            three_params=three_params,
+        )
+
+        if kinetics_job is None:
             kinetics = None
 
         else:
-
-            ts, r1, r2, p1, p2 = output
-
-            spc_r1 = Species().from_smiles(row["r1smi"])
-            spc_r1.conformer = r1
-            spc_r2 = Species().from_smiles(row["r2smi"])
-            spc_r2.conformer = r2
-            spc_p1 = Species().from_smiles(row["p1smi"])
-            spc_p1.conformer = p1
-            spc_p2 = Species().from_smiles(row["p2smi"])
-            spc_p2.conformer = p2
-
-            neg_frequency = row["neg_freq"]
-            neg_frequency = (neg_frequency, "cm^-1")
-
-            spc_ts = TransitionState(
-                conformer=ts,
-                frequency=neg_frequency,
-                tunneling=Eckart(frequency=None, E0_reac=None, E0_TS=None, E0_prod=None),
-            )
-
-            rxn = Reaction(
-                reactants=[spc_r1, spc_r2], products=[spc_p1, spc_p2], transition_state=spc_ts
-            )
-
-            kinetics_job = KineticsJob(
-                reaction=rxn,
-                Tmin=Tmin,
-                Tmax=Tmax,
-                Tcount=Tcount,
-                Tlist=Tlist,
-                sensitivity_conditions=sensitivity_conditions,
-                three_params=three_params,
-            )
-
             try:
                 kinetics_job.generate_kinetics()
                 kinetics = kinetics_job.reaction.kinetics
@@ -199,76 +339,159 @@ def calc_rate_coefficient(
 
     else:
         raise ValueError(f"Energy level {energy_level} not recognized")
-    
-    # get reaction thermo (Petersson)
-    output = get_rmg_conformer_from_df(
-        row,
-        freq_scale,
-        energy_level,
-        freq_level,
-        energy_software=energy_software,
-        freq_software=freq_software,
-        use_atom_corrections=True,
-        use_bond_corrections=True,
-        bac_type="p",
-        scr_dir=scr_dir,
-    )
 
-    if output is None:
-        p_rxn = None
+    # get reaction thermo (Petersson and melius)
+    p_rxn, m_rxn = get_reaction_thermo(reaction_species, kinetics)
 
-    else:
-
-        _, r1, r2, p1, p2 = output
-
-        spc_r1 = Species().from_smiles(row["r1smi"])
-        spc_r1.conformer = r1
-        spc_r2 = Species().from_smiles(row["r2smi"])
-        spc_r2.conformer = r2
-        spc_p1 = Species().from_smiles(row["p1smi"])
-        spc_p1.conformer = p1
-        spc_p2 = Species().from_smiles(row["p2smi"])
-        spc_p2.conformer = p2
+    return kinetics, p_rxn, m_rxn
 
-        p_rxn = Reaction(
-            reactants=[spc_r1, spc_r2], products=[spc_p1, spc_p2], kinetics=deepcopy(kinetics)
-        )
 
-    # get reaction thermo (melius)
-    output = get_rmg_conformer_from_df(
-        row,
-        freq_scale,
-        energy_level,
-        freq_level,
-        energy_software=energy_software,
-        freq_software=freq_software,
-        use_atom_corrections=True,
-        use_bond_corrections=True,
-        bac_type="m",
-        scr_dir=scr_dir,
+def calc_rate_coefficient_validation(
+    row, reaction_species, ts, Tlist, three_params=True
+):
+    """
+    Rate coefficients at ``Tlist`` and Arrhenius fit of a reaction from an Arkane
+    ``KineticsJob``, to validate the NumPy engine against. None if the job fails.
+    """
+    kinetics_job = get_kinetics_job(
+        row, reaction_species, ts, Tlist=(Tlist, "K"), three_params=three_params
+    )
+    if kinetics_job is None:
+        return None
+
+    try:
+        kinetics_job.generate_kinetics()
+    except Exception as e:
+        logger.error(f"Error in generating kinetics for {row}: {e}")
+        return None
+
+    # the same rate coefficients as the ones fitted by KineticsJob, with its tunneling parameters
+    rxn = kinetics_job.reaction
+    klist = np.array(
+        [
+            rxn.calculate_tst_rate_coefficient(T)
+            * rxn.transition_state.calculate_tunneling_factor(T)
+            for T in Tlist
+        ]
     )
+    return klist, rxn.kinetics
 
-    if output is None:
-        m_rxn = None
 
-    else:
+def log_rate_differences(Tlist, klists, kinetics_list, validations):
+    """
+    Log the largest differences of the rate coefficients and of the Arrhenius fits of the NumPy
+    engine to the ones of ``KineticsJob``, relative for all but the temperature exponent n.
+    """
+    valid = [
+        i
+        for i in range(len(klists))
+        if kinetics_list[i] is not None and validations[i] is not None
+    ]
+    logger.info(f"Validated the rates of {len(valid)} reactions against KineticsJob")
+    if not valid:
+        return
+
+    arkane_kinetics_list = [validations[i][1] for i in valid]
+    values = {
+        "k(T)": (
+            np.array([klists[i] for i in valid]),
+            np.array([validations[i][0] for i in valid]),
+        ),
+        "Arrhenius k(T)": (
+            np.array(
+                [
+                    [kinetics_list[i].get_rate_coefficient(T) for T in Tlist]
+                    for i in valid
+                ]
+            ),
+            np.array(
+                [
+                    [kinetics.get_rate_coefficient(T) for T in Tlist]
+                    for kinetics in arkane_kinetics_list
+                ]
+            ),
+        ),
+    }
+    for column in ["A", "n", "Ea"]:
+        values[f"Arrhenius {column}"] = (
+            np.array([getattr(kinetics_list[i], column).value_si for i in valid]),
+            np.array(
+                [
+                    getattr(kinetics, column).value_si
+                    for kinetics in arkane_kinetics_list
+                ]
+            ),
+        )
 
-        _, r1, r2, p1, p2 = output
+    for key, (numpy_values, arkane_values) in values.items():
+        diff = np.abs(numpy_values - arkane_values)
+        if key == "Arrhenius n":
+            logger.info(f"{key}: max difference to KineticsJob {np.max(diff)}")
+            continue
+        with np.errstate(divide="ignore", invalid="ignore"):
+            max_diff = np.nanmax(diff / np.abs(arkane_values))
+        logger.info(f"{key}: max relative difference to KineticsJob {max_diff}")
 
-        spc_r1 = Species().from_smiles(row["r1smi"])
-        spc_r1.conformer = r1
-        spc_r2 = Species().from_smiles(row["r2smi"])
-        spc_r2.conformer = r2
-        spc_p1 = Species().from_smiles(row["p1smi"])
-        spc_p1.conformer = p1
-        spc_p2 = Species().from_smiles(row["p2smi"])
-        spc_p2.conformer = p2
 
-        m_rxn = Reaction(
-            reactants=[spc_r1, spc_r2], products=[spc_p1, spc_p2], kinetics=deepcopy(kinetics)
+def calc_rate_coefficients_numpy(
+    ts_list,
+    reaction_species_list,
+    neg_freqs,
+    Tlist=None,
+    three_params=True,
+    return_rate_coefficients=False,
+):
+    """
+    Compute the TST + Eckart kinetics of all reactions at once with the NumPy engine in ``tst``
+    instead of one ``KineticsJob`` per reaction. If ``return_rate_coefficients``, the rate
+    coefficients at ``Tlist`` of each reaction are also returned.
+    """
+    Tlist = get_default_temperatures() if Tlist is None else np.asarray(Tlist)
+
+    kinetics_list = [None] * len(ts_list)
+    klists = [None] * len(ts_list)
+    valid = [
+        i
+        for i, (ts, reaction_species) in enumerate(zip(ts_list, reaction_species_list))
+        if ts is not None
+        and all(species["kinetics"] is not None for species in reaction_species)
+    ]
+    if not valid:
+        return (kinetics_list, klists) if return_rate_coefficients else kinetics_list
+
+    spc_data = [
+        conformers_to_species_data(
+            [reaction_species_list[i][j]["kinetics"].conformer for i in valid]
         )
-
-    return kinetics, p_rxn, m_rxn
+        for j in range(len(SPC_LABELS))
+    ]
+    ts_data = conformers_to_species_data([ts_list[i] for i in valid])
+
+    klist = get_tst_rate_coefficients(
+        reactants=spc_data[:2],
+        ts=ts_data,
+        products=spc_data[2:],
+        ts_frequency=np.asarray([neg_freqs[i] for i in valid], dtype=float),
+        T=Tlist,
+    )
+    As, ns, Eas = fit_arrhenius(Tlist, klist, three_params=three_params)
+
+    for i, k, A, n, Ea in zip(valid, klist, As, ns, Eas):
+        if np.isnan(A):
+            logger.error(f"Error in generating kinetics for reaction {i}")
+            continue
+        klists[i] = k
+        kinetics_list[i] = Arrhenius(
+            A=(A, "m^3/(mol*s)"),
+            n=n,
+            Ea=(Ea, "J/mol"),
+            T0=(1, "K"),
+            Tmin=(np.min(Tlist), "K"),
+            Tmax=(np.max(Tlist), "K"),
+        )
+    if return_rate_coefficients:
+        return kinetics_list, klists
+    return kinetics_list
 
 
 def main():
@@ -278,7 +501,7 @@ def main():
     # 0. Parse input
     args = parse_command_line_arguments()
 
-    df = pd.read_csv(args.csv_path)
+    df = load_input_table(args.csv_path)
     df = df.dropna()
 
     energy_level = args.energy_level
@@ -287,18 +510,103 @@ def main():
     freq_software = args.freq_software
     freq_scale = args.freq_scale
 
-    reactions_list = Parallel(n_jobs=args.n_jobs, backend="multiprocessing")(
-        delayed(calc_rate_coefficient)(
-            row,
+    level_of_theory, freq_scale = get_lot_and_freq_scale(
+        energy_level=energy_level,
+        freq_level=freq_level,
+        energy_software=energy_software,
+        freq_software=freq_software,
+        freq_scale=freq_scale,
+    )
+
+    # 1. Build each unique reactant and product once
+    species_data_dict = {}
+    for _, row in df.iterrows():
+        for spc_label in SPC_LABELS:
+            species_data = get_species_data(row, spc_label, energy_level)
+            species_data_dict.setdefault(get_species_key(species_data), species_data)
+    species_keys = list(species_data_dict)
+    logger.info(f"{len(species_keys)} unique species in {len(df.index)} reactions")
+    batches = [
+        species_keys[i : i + args.batch_size]
+        for i in range(0, len(species_keys), args.batch_size)
+    ]
+    species_batches = Parallel(n_jobs=args.n_jobs, backend="multiprocessing")(
+        delayed(calc_species_batch)(
+            [species_data_dict[species_key] for species_key in batch],
+            level_of_theory,
             freq_scale,
             energy_level,
-            freq_level,
-            energy_software,
-            freq_software,
-            scr_dir=args.scratch_dir / f"reaction_{idx}",
+            scr_dir=args.scratch_dir / f"species_batch_{batch_idx}",
+            symmetry_cache_dir=args.symmetry_cache_dir,
         )
-        for idx, row in df.iterrows()
+        for batch_idx, batch in enumerate(batches)
     )
+    species_dict = {
+        species_key: species
+        for batch, species_list in zip(batches, species_batches)
+        for species_key, species in zip(batch, species_list)
+    }
+
+    reaction_species_list = [
+        [
+            species_dict[
+                get_species_key(get_species_data(row, spc_label, energy_level))
+            ]
+            for spc_label in SPC_LABELS
+        ]
+        for _, row in df.iterrows()
+    ]
+
+    # 2. Build the TS and the kinetics of each reaction
+    if args.rate_engine == "numpy" and energy_level == "qgdlpnoccsd(t)f12d/ccpvtzf12":
+        ts_list = Parallel(n_jobs=args.n_jobs, backend="multiprocessing")(
+            delayed(get_ts_conformer)(
+                row,
+                freq_scale,
+                level_of_theory,
+                energy_level,
+                scr_dir=args.scratch_dir / f"reaction_{idx}",
+                symmetry_cache_dir=args.symmetry_cache_dir,
+            )
+            for idx, row in df.iterrows()
+        )
+        Tlist = get_default_temperatures()
+        kinetics_list, klists = calc_rate_coefficients_numpy(
+            ts_list,
+            reaction_species_list,
+            df["neg_freq"].tolist(),
+            Tlist=Tlist,
+            return_rate_coefficients=True,
+        )
+        if args.validate_rates:
+            validations = Parallel(n_jobs=args.n_jobs, backend="multiprocessing")(
+                delayed(calc_rate_coefficient_validation)(
+                    row, reaction_species, ts, Tlist
+                )
+                for (_, row), reaction_species, ts in zip(
+                    df.iterrows(), reaction_species_list, ts_list
+                )
+            )
+            log_rate_differences(Tlist, klists, kinetics_list, validations)
+        reactions_list = [
+            (kinetics, *get_reaction_thermo(reaction_species, kinetics))
+            for kinetics, reaction_species in zip(kinetics_list, reaction_species_list)
+        ]
+    else:
+        reactions_list = Parallel(n_jobs=args.n_jobs, backend="multiprocessing")(
+            delayed(calc_rate_coefficient)(
+                row,
+                reaction_species,
+                freq_scale,
+                level_of_theory,
+                energy_level,
+                scr_dir=args.scratch_dir / f"reaction_{idx}",
+                symmetry_cache_dir=args.symmetry_cache_dir,
+            )
+            for (idx, row), reaction_species in zip(
+                df.iterrows(), reaction_species_list
+            )
+        )
 
     def get_kinetics_values(kinetics, key):
         if kinetics is None:
@@ -323,14 +631,14 @@ def main():
             return rxn.get_free_energy_of_reaction(298)
         else:
             raise ValueError(f"Key {key} is not recognized")
-    
+
     def get_rev_kin(rxn):
         if rxn is None:
             return None
-        
+
         if rxn.kinetics is None:
             return None
-        
+
         return rxn.generate_reverse_rate_coefficient()
 
     kinetics_list = [x[0] for x in reactions_list]
@@ -344,16 +652,40 @@ def main():
 
     for column in ["A", "n", "Ea"]:
         df[column] = df["kinetics"].apply(lambda x: get_kinetics_values(x, column))
-        df["p_rev_" + column] = df["p_rev_kinetics"].apply(lambda x: get_kinetics_values(x, column))
-        df["m_rev_" + column] = df["m_rev_kinetics"].apply(lambda x: get_kinetics_values(x, column))
+        df["p_rev_" + column] = df["p_rev_kinetics"].apply(
+            lambda x: get_kinetics_values(x, column)
+        )
+        df["m_rev_" + column] = df["m_rev_kinetics"].apply(
+            lambda x: get_kinetics_values(x, column)
+        )
 
     for column in ["deltaHrxn298", "deltaGrxn298"]:
         df["p_" + column] = df["p_reaction"].apply(lambda x: get_rxn_values(x, column))
         df["m_" + column] = df["m_reaction"].apply(lambda x: get_rxn_values(x, column))
 
-    df = df.drop(columns=["kinetics", "p_reaction", "m_reaction", "p_rev_kinetics", "m_rev_kinetics"])
+    df = df.drop(
+        columns=[
+            "kinetics",
+            "p_reaction",
+            "m_reaction",
+            "p_rev_kinetics",
+            "m_rev_kinetics",
+        ]
+    )
 
-    df = df.dropna(subset=["A", "n", "Ea", "p_rev_A", "p_rev_n", "p_rev_Ea", "m_rev_A", "m_rev_n", "m_rev_Ea"])
+    df = df.dropna(
+        subset=[
+            "A",
+            "n",
+            "Ea",
+            "p_rev_A",
+            "p_rev_n",
+            "p_rev_Ea",
+            "m_rev_A",
+            "m_rev_n",
+            "m_rev_Ea",
+        ]
+    )
 
     df.to_csv(args.save_path, index=False)
 
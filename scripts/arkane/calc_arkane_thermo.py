@@ -2,9 +2,9 @@
 This module computes rate coefficient from .csv file containing energies and frequencies
 """
 
-import ast
 import os
 import logging
+import shutil
 from tqdm import tqdm
 
 import numpy as np
@@ -12,17 +12,21 @@ import pandas as pd
 from joblib import Parallel, delayed
 
 from arkane.thermo import ThermoJob
-from rmgpy import constants
-from rmgpy.molecule.element import get_element
 from rmgpy.molecule.molecule import Molecule
 from rmgpy.species import Species
 from rmgpy.thermo import ThermoData
 
+from statmech import THERMO_COLUMNS, get_thermo_columns, get_thermo_model_value
+from tst import conformers_to_species_data
 from utils import (
+    get_atomic_numbers_and_coords,
+    get_frequencies,
     get_lot_and_freq_scale,
+    get_mass,
     get_rmg_conformer,
+    get_xyz_columns,
+    load_input_table,
     parse_command_line_arguments,
-    xyz_str_to_coords,
 )
 
 logger = logging.getLogger()
@@ -43,6 +47,9 @@ def get_rmg_conformer_from_df(
     bac_type,
     molecule,
     scr_dir=None,
+    cleanup_scr_dir=True,
+    symmetry_cache=None,
+    symmetry_cache_dir=None,
 ):
     # No bond correction at this moment
 
@@ -54,14 +61,9 @@ def get_rmg_conformer_from_df(
         freq_scale=freq_scale,
     )
 
-    atomic_numbers, coords = xyz_str_to_coords(xyz_str)
-    mass = (
-        sum([get_element(int(atomic_number)).mass for atomic_number in atomic_numbers])
-        / constants.Na,
-        "kg",
-    )
-    frequencies = ast.literal_eval(frequencies)
-    frequencies = np.array(frequencies)
+    atomic_numbers, coords = get_atomic_numbers_and_coords(xyz_str)
+    mass = get_mass(atomic_numbers)
+    frequencies = get_frequencies(frequencies)
     e_electronic = energy * 2625500  # hartree to J/mol
 
     try:
@@ -80,6 +82,9 @@ def get_rmg_conformer_from_df(
             use_bond_corrections=use_bond_corrections,
             bac_type=bac_type,
             scr_dir=scr_dir,
+            cleanup_scr_dir=cleanup_scr_dir,
+            symmetry_cache=symmetry_cache,
+            symmetry_cache_dir=symmetry_cache_dir,
         )
     except Exception as e:
         logger.error(f"Error in getting rmg conformer for multiplicity {multiplicity}, xyz_str {xyz_str}, frequencies {frequencies}, energy {energy}, freq_scale {freq_scale}, energy_level {energy_level}, freq_level {freq_level}, energy_software {energy_software}, freq_software {freq_software}, use_atom_corrections {use_atom_corrections}, use_bond_corrections {use_bond_corrections}, molecule {molecule}, scr_dir {scr_dir}: {e}")
@@ -101,65 +106,97 @@ def calc_thermo(
     freq_software,
     use_bond_corrections,
     scr_dir=None,
+    cleanup_scr_dir=True,
+    symmetry_cache=None,
+    symmetry_cache_dir=None,
+    generate_thermo=True,
 ):
+    """
+    Build the Petersson (p) and Melius (m) bond corrected species. If ``generate_thermo``,
+    their thermo is also computed with a ThermoJob, otherwise only the conformers are built
+    for the NumPy engine in ``statmech``.
+    """
 
-    molecule = Molecule().from_smiles(smi)
+    spcs = []
+    for bac_type in ["p", "m"]:
+        molecule = Molecule().from_smiles(smi)
 
-    rmg_conformer = get_rmg_conformer_from_df(
-        multiplicity=multiplicity,
-        xyz_str=xyz_str,
-        frequencies=frequencies,
-        energy=energy,
-        freq_scale=freq_scale,
-        energy_level=energy_level,
-        freq_level=freq_level,
-        energy_software=energy_software,
-        freq_software=freq_software,
-        use_atom_corrections=True,
-        use_bond_corrections=use_bond_corrections,
-        molecule=molecule,
-        scr_dir=scr_dir,
-        bac_type="p",
-    )
+        rmg_conformer = get_rmg_conformer_from_df(
+            multiplicity=multiplicity,
+            xyz_str=xyz_str,
+            frequencies=frequencies,
+            energy=energy,
+            freq_scale=freq_scale,
+            energy_level=energy_level,
+            freq_level=freq_level,
+            energy_software=energy_software,
+            freq_software=freq_software,
+            use_atom_corrections=True,
+            use_bond_corrections=use_bond_corrections,
+            molecule=molecule,
+            scr_dir=scr_dir,
+            cleanup_scr_dir=cleanup_scr_dir,
+            symmetry_cache=symmetry_cache,
+            symmetry_cache_dir=symmetry_cache_dir,
+            bac_type=bac_type,
+        )
 
-    if rmg_conformer is None:
-        return None, None
+        if rmg_conformer is None:
+            return None, None
 
-    spc = Species(molecule=[molecule])
-    spc.conformer = rmg_conformer
-    thermo_job = ThermoJob(species=spc, thermo_class="wilhoit")
-    thermo_job.generate_thermo()
-    p_thermo = thermo_job.species.thermo
+        spc = Species(molecule=[molecule])
+        spc.conformer = rmg_conformer
+        if generate_thermo:
+            thermo_job = ThermoJob(species=spc, thermo_class="wilhoit")
+            thermo_job.generate_thermo()
+        spcs.append(spc)
 
-    molecule = Molecule().from_smiles(smi)
+    return tuple(spcs)
 
-    rmg_conformer = get_rmg_conformer_from_df(
-        multiplicity=multiplicity,
-        xyz_str=xyz_str,
-        frequencies=frequencies,
-        energy=energy,
-        freq_scale=freq_scale,
-        energy_level=energy_level,
-        freq_level=freq_level,
-        energy_software=energy_software,
-        freq_software=freq_software,
-        use_atom_corrections=True,
-        use_bond_corrections=use_bond_corrections,
-        molecule=molecule,
-        scr_dir=scr_dir,
-        bac_type="m",
-    )
-
-    if rmg_conformer is None:
-        return None, None
-
-    spc = Species(molecule=[molecule])
-    spc.conformer = rmg_conformer
-    thermo_job = ThermoJob(species=spc, thermo_class="wilhoit")
-    thermo_job.generate_thermo()
-    m_thermo = thermo_job.species.thermo
 
-    return p_thermo, m_thermo
+def calc_thermo_batch(
+    batch,
+    freq_scale,
+    energy_level,
+    freq_level,
+    energy_software,
+    freq_software,
+    use_bond_corrections,
+    scr_dir,
+    symmetry_cache_dir=None,
+    generate_thermo=True,
+):
+    """
+    Compute the thermo of a batch of ``(smi, multiplicity, xyz_str, frequencies, energy)`` tuples
+    in one worker, reusing the scratch directory and the symmetry results of the batch.
+    """
+    symmetry_cache = {}
+    thermoss = []
+    try:
+        for smi, multiplicity, xyz_str, frequencies, energy in batch:
+            thermoss.append(
+                calc_thermo(
+                    smi,
+                    multiplicity,
+                    xyz_str,
+                    frequencies,
+                    energy,
+                    freq_scale,
+                    energy_level,
+                    freq_level,
+                    energy_software,
+                    freq_software,
+                    use_bond_corrections=use_bond_corrections,
+                    scr_dir=scr_dir,
+                    cleanup_scr_dir=False,
+                    symmetry_cache=symmetry_cache,
+                    symmetry_cache_dir=symmetry_cache_dir,
+                    generate_thermo=generate_thermo,
+                )
+            )
+    finally:
+        shutil.rmtree(scr_dir, ignore_errors=True)
+    return thermoss
 
 
 def main():
@@ -178,75 +215,92 @@ def main():
     else:
         raise ValueError(f"Energy level {args.energy_level} is not supported")
 
-    df = pd.read_csv(args.csv_path)
+    df = load_input_table(args.csv_path)
     energy_level = args.energy_level
     freq_level = args.freq_level
     energy_software = args.energy_software
     freq_software = args.freq_software
     freq_scale = args.freq_scale
 
-    columns = [
-        "H298",
-        "S298",
-        "Cp300",
-        "Cp400",
-        "Cp500",
-        "Cp600",
-        "Cp800",
-        "Cp1000",
-        "Cp1500",
+    atomic_numbers_column, coords_column = get_xyz_columns("std_xyz_str")
+    if atomic_numbers_column in df.columns:
+        xyzs = list(zip(df[atomic_numbers_column], df[coords_column]))
+    else:
+        xyzs = df["std_xyz_str"].tolist()
+    rows = list(
+        zip(
+            df["asmi"],
+            df["multiplicity"],
+            xyzs,
+            df["species_dft_frequencies"],
+            df[energy_column],
+        )
+    )
+    batches = [
+        rows[i : i + args.batch_size] for i in range(0, len(rows), args.batch_size)
     ]
 
-    thermoss = Parallel(n_jobs=args.n_jobs)(
-        delayed(calc_thermo)(
-            row["asmi"],
-            row["multiplicity"],
-            row["std_xyz_str"],
-            row["species_dft_frequencies"],
-            row[energy_column],
+    generate_thermo = args.thermo_engine == "arkane" or args.validate_thermo
+    thermoss_batches = Parallel(n_jobs=args.n_jobs)(
+        delayed(calc_thermo_batch)(
+            batch,
             freq_scale,
             energy_level,
             freq_level,
             energy_software,
             freq_software,
             use_bond_corrections=not args.no_bac_for_thermo,
-            scr_dir=args.scratch_dir / f"thermo_{idx}",
+            scr_dir=args.scratch_dir / f"thermo_batch_{batch_idx}",
+            symmetry_cache_dir=args.symmetry_cache_dir,
+            generate_thermo=generate_thermo,
         )
-        for idx, row in tqdm(df.iterrows())
+        for batch_idx, batch in enumerate(tqdm(batches))
     )
+    thermoss = [thermos for batch in thermoss_batches for thermos in batch]
+
+    p_spcs = [thermos[0] for thermos in thermoss]
+    m_spcs = [thermos[1] for thermos in thermoss]
+
+    if args.thermo_engine == "numpy":
+        bac_values = {}
+        for bac_type, spcs in [("p", p_spcs), ("m", m_spcs)]:
+            valid = [i for i, spc in enumerate(spcs) if spc is not None]
+            values = get_thermo_columns(
+                conformers_to_species_data([spcs[i].conformer for i in valid])
+            )
+            bac_values[bac_type] = {}
+            for column in THERMO_COLUMNS:
+                column_values = np.full(len(spcs), np.nan)
+                column_values[valid] = values[column]
+                bac_values[bac_type][column] = column_values
+
+                if args.validate_thermo:
+                    arkane_values = np.array(
+                        [get_thermo_model_value(spcs[i].thermo, column) for i in valid],
+                        dtype=float,
+                    )
+                    max_diff = np.max(
+                        np.abs(values[column] - arkane_values), initial=0.0
+                    )
+                    logger.info(
+                        f"{bac_type}_{column}: max difference to ThermoJob {max_diff}"
+                    )
+
+        for column in THERMO_COLUMNS:
+            df["p_" + column] = bac_values["p"][column]
+            df["m_" + column] = bac_values["m"][column]
 
-    def get_values(thermo, key):
-        if thermo is None:
-            return None
-
-        if key == "H298":
-            return thermo.get_enthalpy(298)
-        elif key == "S298":
-            return thermo.get_entropy(298)
-        elif key == "Cp300":
-            return thermo.get_heat_capacity(300)
-        elif key == "Cp400":
-            return thermo.get_heat_capacity(400)
-        elif key == "Cp500":
-            return thermo.get_heat_capacity(500)
-        elif key == "Cp600":
-            return thermo.get_heat_capacity(600)
-        elif key == "Cp800":
-            return thermo.get_heat_capacity(800)
-        elif key == "Cp1000":
-            return thermo.get_heat_capacity(1000)
-        elif key == "Cp1500":
-            return thermo.get_heat_capacity(1500)
-        else:
-            raise ValueError(f"Key {key} is not supported")
-
-
-    df["p_thermo"] = [thermos[0] for thermos in thermoss]
-    df["m_thermo"] = [thermos[1] for thermos in thermoss]
-
-    for column in columns:
-        df["p_" + column] = df["p_thermo"].apply(lambda x: get_values(x, column))
-        df["m_" + column] = df["m_thermo"].apply(lambda x: get_values(x, column))
+    else:
+        df["p_thermo"] = [spc.thermo if spc is not None else None for spc in p_spcs]
+        df["m_thermo"] = [spc.thermo if spc is not None else None for spc in m_spcs]
+
+        for column in THERMO_COLUMNS:
+            df["p_" + column] = df["p_thermo"].apply(
+                lambda x: get_thermo_model_value(x, column)
+            )
+            df["m_" + column] = df["m_thermo"].apply(
+                lambda x: get_thermo_model_value(x, column)
+            )
 
     df.to_csv(args.save_path, index=False)
 
@@ -0,0 +1,66 @@
+"""
+This module converts a .csv input of calc_arkane_rate.py or calc_arkane_thermo.py to the .pkl
+table with typed columns read by load_input_table, so that frequencies and geometries are
+parsed once instead of on every run
+"""
+
+import argparse
+import pickle as pkl
+
+import numpy as np
+import pandas as pd
+
+from utils import get_frequencies, get_xyz_columns, xyz_str_to_coords
+
+
+def convert_input_table(df):
+    """
+    Convert the stringified ``*_dft_frequencies`` columns to float64 arrays, and replace each
+    ``*xyz_str`` column by the uint8 atomic numbers and float64 (N, 3) coordinates columns of
+    ``get_xyz_columns``, e.g. ``std_xyz_str`` by ``std_atomic_numbers`` and ``std_coords``.
+    Missing values, e.g. of the second reactant of unimolecular reactions, are kept as is.
+    """
+    df = df.copy()
+    for column in list(df.columns):
+        if column.endswith("_dft_frequencies"):
+            df[column] = [
+                get_frequencies(value) if isinstance(value, str) else value
+                for value in df[column]
+            ]
+        elif column.endswith("xyz_str"):
+            atomic_numbers_column, coords_column = get_xyz_columns(column)
+            atomic_numbers_list, coords_list = [], []
+            for value in df[column]:
+                if isinstance(value, str):
+                    atomic_numbers, coords = xyz_str_to_coords(value)
+                    atomic_numbers = np.asarray(atomic_numbers, dtype=np.uint8)
+                else:
+                    atomic_numbers, coords = value, value
+                atomic_numbers_list.append(atomic_numbers)
+                coords_list.append(coords)
+            df[atomic_numbers_column] = atomic_numbers_list
+            df[coords_column] = coords_list
+            df = df.drop(columns=column)
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--csv_path",
+        type=str,
+        help=".csv file path containing parsed results",
+        required=True,
+    )
+    parser.add_argument(
+        "--save_path", type=str, help=".pkl file path of the typed table", required=True
+    )
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.csv_path)
+    df = convert_input_table(df)
+    df.to_pickle(args.save_path, protocol=pkl.HIGHEST_PROTOCOL)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+"""
+This module runs the Arkane thermo of species or the Arkane kinetics of reactions with the
+runners of autoqm.arkane. Arkane is run in this worker, so that RMG is imported once per task,
+and the thermo of ``--batch_size`` species can be computed from one Arkane input. With
+``--subprocess``, each input is run with ``Arkane.py`` of ``--RMG_path`` instead.
+
+The input table has the ``id``, ``smiles``, ``dft_xyz``, ``freq_path`` and ``sp_path`` of each
+species for thermo, and the ``id``, ``rxn_smi``, ``{spc}_smi``, ``{spc}_dft_xyz``,
+``{spc}_freq_path`` and ``{spc}_sp_path`` of the reactants, products and TS of each reaction
+for kinetics, with ``spc`` in r1, r2, p1, p2 and ts.
+"""
+
+import os
+import re
+import traceback
+from argparse import ArgumentParser
+
+import pandas as pd
+
+from autoqm.arkane.kinetics import run_arkane_kinetics
+from autoqm.arkane.thermo import run_arkane_thermo, run_arkane_thermo_batch
+
+parser = ArgumentParser()
+parser.add_argument(
+    "--input_table",
+    type=str,
+    required=True,
+    help="input .csv or .pkl table of the species or reactions",
+)
+parser.add_argument(
+    "--calculation",
+    type=str,
+    choices=["thermo", "kinetics"],
+    default="thermo",
+    help="Arkane calculation to run",
+)
+parser.add_argument(
+    "--output_folder", type=str, default="output", help="output folder name"
+)
+parser.add_argument(
+    "--arkane_folder",
+    type=str,
+    default=None,
+    help="folder for the Arkane calculations, arkane_{calculation} by default",
+)
+parser.add_argument("--scratch_dir", type=str, required=True, help="scratch directory")
+parser.add_argument(
+    "--model_chemistry",
+    type=str,
+    required=True,
+    help="Arkane model chemistry of the energies and frequencies",
+)
+parser.add_argument(
+    "--symmetry_cache_dir",
+    type=str,
+    default=None,
+    help="directory of the symmetry cache shared by all workers and runs",
+)
+parser.add_argument(
+    "--batch_size",
+    type=int,
+    default=1,
+    help="number of species whose thermo is computed from one Arkane input",
+)
+parser.add_argument(
+    "--subprocess",
+    action="store_true",
+    help="run each Arkane input with Arkane.py in a new interpreter instead of in this worker",
+)
+parser.add_argument(
+    "--RMG_path",
+    type=str,
+    default=None,
+    help="path to RMG-Py, only used with --subprocess",
+)
+parser.add_argument(
+    "--task_id",
+    type=int,
+    default=0,
+    help="task id for the calculation",
+)
+parser.add_argument(
+    "--num_tasks",
+    type=int,
+    default=1,
+    help="number of tasks for the calculation",
+)
+
+args = parser.parse_args()
+
+if args.batch_size > 1 and (args.calculation != "thermo" or args.subprocess):
+    raise ValueError("--batch_size is only supported for in-process thermo")
+if args.subprocess and args.RMG_path is None:
+    raise ValueError("--RMG_path must be provided with --subprocess")
+
+if args.input_table.endswith(".pkl"):
+    df = pd.read_pickle(args.input_table)
+else:
+    df = pd.read_csv(args.input_table)
+df = df.reset_index(drop=True)
+smiles_column = "smiles" if args.calculation == "thermo" else "rxn_smi"
+mol_ids = list(df.id)
+mol_id_to_row_index = {mol_id: row_index for row_index, mol_id in enumerate(mol_ids)}
+mol_id_to_smi = dict(zip(mol_ids, df[smiles_column]))
+
+project_dir = os.path.abspath(args.output_folder)
+arkane_dir = os.path.join(
+    project_dir, args.arkane_folder or f"arkane_{args.calculation}"
+)
+inputs_dir = os.path.join(arkane_dir, "inputs")
+outputs_dir = os.path.join(arkane_dir, "outputs")
+scratch_dir = os.path.abspath(args.scratch_dir)
+os.makedirs(inputs_dir, exist_ok=True)
+os.makedirs(outputs_dir, exist_ok=True)
+
+
+def get_done_ids(suboutputs_dir):
+    """
+    Ids with an Arkane output in a shard, including the species of the batch thermo libraries.
+    """
+    done_ids = set()
+    if not os.path.isdir(suboutputs_dir):
+        return done_ids
+    for output_file in os.listdir(suboutputs_dir):
+        if output_file.startswith("batch_"):
+            with open(os.path.join(suboutputs_dir, output_file), "r") as f:
+                done_ids.update(re.findall(r"label = [\"'](.+?)[\"']", f.read()))
+        elif output_file.endswith(".py"):
+            done_ids.add(output_file[: -len(".py")].replace("_thermo", ""))
+    return done_ids
+
+
+def mark_failed(mol_ids, subinputs_dir):
+    for mol_id in mol_ids:
+        try:
+            os.rename(
+                os.path.join(subinputs_dir, f"{mol_id}.tmp"),
+                os.path.join(subinputs_dir, f"{mol_id}.failed"),
+            )
+        except FileNotFoundError:
+            pass
+
+
+def run_batch(batch_ids, subinputs_dir, suboutputs_dir):
+    print(f"Starting Arkane thermo for batch of {len(batch_ids)} species...")
+    try:
+        run_arkane_thermo_batch(
+            batch_ids[0],
+            [str(mol_id) for mol_id in batch_ids],
+            [mol_id_to_smi[mol_id] for mol_id in batch_ids],
+            [mol_id_to_row_index[mol_id] for mol_id in batch_ids],
+            df,
+            args.model_chemistry,
+            subinputs_dir,
+            suboutputs_dir,
+            scratch_dir,
+            symmetry_cache_dir=args.symmetry_cache_dir,
+        )
+    except Exception:
+        print(f"Arkane thermo failed for batch {batch_ids[0]} of {batch_ids}")
+        traceback.print_exc()
+        mark_failed(batch_ids, subinputs_dir)
+        return
+    print(f"Finished Arkane thermo for batch {batch_ids[0]}")
+
+
+print("Making helper input files...")
+print(f"Task id: {args.task_id}")
+print(f"Number of tasks: {args.num_tasks}")
+
+shard_to_done_ids = {}
+for mol_id in mol_ids[args.task_id :: args.num_tasks]:
+    ids = mol_id // 1000
+    subinputs_dir = os.path.join(inputs_dir, f"inputs_{ids}")
+    suboutputs_dir = os.path.join(outputs_dir, f"outputs_{ids}")
+    if ids not in shard_to_done_ids:
+        shard_to_done_ids[ids] = get_done_ids(suboutputs_dir)
+    if str(mol_id) in shard_to_done_ids[ids]:
+        continue
+
+    os.makedirs(subinputs_dir, exist_ok=True)
+    input_file_path = os.path.join(subinputs_dir, f"{mol_id}.in")
+    tmp_input_file_path = os.path.join(subinputs_dir, f"{mol_id}.tmp")
+    if not os.path.exists(input_file_path) and not os.path.exists(tmp_input_file_path):
+        with open(input_file_path, "w+") as f:
+            f.write("")
+
+print(f"Starting Arkane {args.calculation} calculations...")
+for subinputs_folder in os.listdir(inputs_dir):
+    ids = int(subinputs_folder.split("_")[1])
+    subinputs_dir = os.path.join(inputs_dir, subinputs_folder)
+    suboutputs_dir = os.path.join(outputs_dir, f"outputs_{ids}")
+    os.makedirs(suboutputs_dir, exist_ok=True)
+
+    batch_ids = []
+    for input_file in os.listdir(subinputs_dir):
+        if not input_file.endswith(".in"):
+            continue
+        mol_id = int(input_file.split(".in")[0])
+        if mol_id not in mol_id_to_row_index:
+            continue
+        try:
+            os.rename(
+                os.path.join(subinputs_dir, input_file),
+                os.path.join(subinputs_dir, f"{mol_id}.tmp"),
+            )
+        except:
+            continue
+
+        if args.batch_size > 1:
+            batch_ids.append(mol_id)
+            if len(batch_ids) == args.batch_size:
+                run_batch(batch_ids, subinputs_dir, suboutputs_dir)
+                batch_ids = []
+            continue
+
+        print(f"Starting Arkane {args.calculation} for {mol_id}...")
+        if args.calculation == "thermo":
+            run_arkane_func = run_arkane_thermo
+        else:
+            run_arkane_func = run_arkane_kinetics
+        try:
+            run_arkane_func(
+                str(mol_id),
+                mol_id_to_smi[mol_id],
+                mol_id_to_row_index[mol_id],
+                df,
+                args.model_chemistry,
+                subinputs_dir,
+                suboutputs_dir,
+                scratch_dir,
+                RMG_path=args.RMG_path,
+                symmetry_cache_dir=args.symmetry_cache_dir,
+                in_process=not args.subprocess,
+            )
+        except Exception:
+            print(f"Arkane {args.calculation} failed for {mol_id}")
+            traceback.print_exc()
+            mark_failed([mol_id], subinputs_dir)
+            continue
+        print(f"Finished Arkane {args.calculation} for {mol_id}")
+
+    if batch_ids:
+        run_batch(batch_ids, subinputs_dir, suboutputs_dir)
+
+print("Done!")
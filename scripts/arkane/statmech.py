@@ -0,0 +1,74 @@
+"""
+This module computes the ideal gas thermo of many species at once with NumPy from their
+translation, rigid rotor and harmonic oscillator modes, following the same equations as
+the RMG ``Conformer`` used by Arkane's ThermoJob
+"""
+
+import numpy as np
+
+from tst import R, c, h, kB, get_log_partition_function
+
+# columns of the thermo table, with their property and temperature in K
+THERMO_COLUMNS = {
+    "H298": ("H", 298.0),
+    "S298": ("S", 298.0),
+    "Cp300": ("Cp", 300.0),
+    "Cp400": ("Cp", 400.0),
+    "Cp500": ("Cp", 500.0),
+    "Cp600": ("Cp", 600.0),
+    "Cp800": ("Cp", 800.0),
+    "Cp1000": ("Cp", 1000.0),
+    "Cp1500": ("Cp", 1500.0),
+}
+
+# methods of the RMG thermo models giving each property
+THERMO_METHODS = {"H": "get_enthalpy", "S": "get_entropy", "Cp": "get_heat_capacity"}
+
+
+def get_thermo_properties(species_data, T):
+    """
+    Enthalpy (J/mol, including E0), entropy and heat capacity (J/(mol*K)) of n species from
+    ``tst.make_species_data`` at temperatures T, each of shape (n, len(T)).
+    """
+    T = np.asarray(T, dtype=float)
+    T_row = T[np.newaxis, :]
+
+    # translation (Cp = 5/2 R) and classical rigid rotor (R for linear, 3/2 R for nonlinear)
+    classical = 2.5 + np.where(species_data["linear"], 1.0, 1.5)[:, np.newaxis]
+
+    # quantum harmonic oscillator without the zero point energy, which is in E0
+    frequencies = species_data["frequencies"][:, :, np.newaxis]
+    x = h * c * 100.0 * frequencies / (kB * T_row[:, np.newaxis, :])
+    with np.errstate(over="ignore"):
+        h_vib = np.nansum(x / np.expm1(x), axis=1)
+        cp_vib = np.nansum(x * x * np.exp(-x) / np.expm1(-x) ** 2, axis=1)
+
+    H_thermal = R * T_row * (classical + h_vib)
+    H = species_data["E0"][:, np.newaxis] + H_thermal
+    S = R * get_log_partition_function(species_data, T) + H_thermal / T_row
+    Cp = R * (classical + cp_vib)
+    return H, S, Cp
+
+
+def get_thermo_columns(species_data, columns=THERMO_COLUMNS):
+    """
+    Values of the thermo ``columns`` of n species, as a dictionary of arrays of length n.
+    """
+    T = np.unique([temperature for _, temperature in columns.values()])
+    H, S, Cp = get_thermo_properties(species_data, T)
+    properties = {"H": H, "S": S, "Cp": Cp}
+
+    return {
+        column: properties[prop][:, np.searchsorted(T, temperature)]
+        for column, (prop, temperature) in columns.items()
+    }
+
+
+def get_thermo_model_value(thermo, column, columns=THERMO_COLUMNS):
+    """
+    Value of a thermo column from a RMG thermo model, e.g. the one of Arkane's ThermoJob.
+    """
+    if thermo is None:
+        return None
+    prop, temperature = columns[column]
+    return getattr(thermo, THERMO_METHODS[prop])(temperature)
@@ -0,0 +1,279 @@
+"""
+This module computes conventional TST rate coefficients with Eckart tunneling for many reactions
+at once with NumPy, following the same equations as Arkane's KineticsJob
+"""
+
+import numpy as np
+
+# same values as rmgpy.constants
+h = 6.62607015e-34  # J*s
+kB = 1.380649e-23  # J/K
+Na = 6.02214076e23  # 1/mol
+R = kB * Na  # J/(mol*K)
+c = 299792458.0  # m/s
+amu = 1.66053906660e-27  # kg
+
+# standard state pressure of IdealGasTranslation and the conversion in Reaction.calculate_tst_rate_coefficient
+TRANSLATION_PRESSURE = 1e5  # Pa
+TST_PRESSURE = 101325.0  # Pa
+
+
+def get_default_temperatures(Tmin=298.0, Tmax=2500.0, Tcount=50):
+    """
+    Temperatures evenly spaced in 1/T, as used by Arkane when no Tlist is given.
+    """
+    return 1.0 / np.linspace(1.0 / Tmax, 1.0 / Tmin, Tcount)
+
+
+def pad(arrays, fill_value=np.nan):
+    width = max([len(array) for array in arrays] + [1])
+    padded = np.full((len(arrays), width), fill_value)
+    for i, array in enumerate(arrays):
+        padded[i, : len(array)] = array
+    return padded
+
+
+def make_species_data(
+    mass, inertia, symmetry, frequencies, multiplicity, optical_isomers, E0
+):
+    """
+    Stack the statmech data of n species into arrays.
+
+    Args:
+        mass: masses in kg per molecule.
+        inertia: moments of inertia in kg*m^2, one value for a linear rotor and three for a nonlinear one.
+        symmetry: external symmetry numbers.
+        frequencies: harmonic frequencies in cm^-1, already scaled.
+        multiplicity: spin multiplicities.
+        optical_isomers: numbers of optical isomers.
+        E0: ground state energies in J/mol.
+    """
+    inertia = [np.atleast_1d(np.asarray(moments, dtype=float)) for moments in inertia]
+    return {
+        "mass": np.asarray(mass, dtype=float),
+        "inertia": pad(inertia),
+        "linear": np.array([len(moments) == 1 for moments in inertia]),
+        "symmetry": np.asarray(symmetry, dtype=float),
+        "frequencies": pad([np.asarray(freqs, dtype=float) for freqs in frequencies]),
+        "multiplicity": np.asarray(multiplicity, dtype=float),
+        "optical_isomers": np.asarray(optical_isomers, dtype=float),
+        "E0": np.asarray(E0, dtype=float),
+    }
+
+
+def conformers_to_species_data(conformers):
+    """
+    Extract the statmech data of RMG ``Conformer`` objects with an ``IdealGasTranslation``,
+    a ``LinearRotor`` or ``NonlinearRotor`` and a ``HarmonicOscillator`` mode, as built by
+    ``get_rmg_conformer``.
+    """
+    mass, inertia, symmetry, frequencies = [], [], [], []
+    for conformer in conformers:
+        conf_inertia, conf_symmetry, conf_frequencies = [], 1, []
+        for mode in conformer.modes:
+            mode_type = type(mode).__name__
+            if mode_type == "IdealGasTranslation":
+                mass.append(mode.mass.value_si)
+            elif mode_type in ["LinearRotor", "NonlinearRotor"]:
+                conf_inertia = np.atleast_1d(mode.inertia.value_si)
+                conf_symmetry = mode.symmetry
+            elif mode_type == "HarmonicOscillator":
+                conf_frequencies = np.asarray(mode.frequencies.value_si)
+            else:
+                raise ValueError(f"Mode {mode_type} is not supported")
+        inertia.append(conf_inertia)
+        symmetry.append(conf_symmetry)
+        frequencies.append(conf_frequencies)
+
+    return make_species_data(
+        mass=mass,
+        inertia=inertia,
+        symmetry=symmetry,
+        frequencies=frequencies,
+        multiplicity=[conformer.spin_multiplicity for conformer in conformers],
+        optical_isomers=[conformer.optical_isomers for conformer in conformers],
+        E0=[conformer.E0.value_si for conformer in conformers],
+    )
+
+
+def get_log_partition_function(species_data, T):
+    """
+    ln Q of n species at temperatures T, shape (n, len(T)), with the zero of energy at E0.
+    """
+    T = np.asarray(T, dtype=float)[np.newaxis, :]
+
+    # translation
+    mass = species_data["mass"][:, np.newaxis]
+    ln_q = 1.5 * np.log(2 * np.pi * mass / (h * h)) - np.log(TRANSLATION_PRESSURE)
+    ln_q = ln_q + 2.5 * np.log(kB * T)
+
+    # classical rigid rotor
+    theta = h * h / (8 * np.pi * np.pi * species_data["inertia"] * kB)
+    ln_theta = np.nansum(np.log(theta), axis=1)[:, np.newaxis]
+    ln_symmetry = np.log(species_data["symmetry"])[:, np.newaxis]
+    linear = species_data["linear"][:, np.newaxis]
+    ln_q_linear = np.log(T) - ln_theta - ln_symmetry
+    ln_q_nonlinear = 0.5 * (np.log(np.pi) + 3 * np.log(T) - ln_theta) - ln_symmetry
+    ln_q = ln_q + np.where(linear, ln_q_linear, ln_q_nonlinear)
+
+    # quantum harmonic oscillator
+    frequencies = species_data["frequencies"][:, :, np.newaxis]
+    x = h * c * 100.0 * frequencies / (kB * T[:, np.newaxis, :])
+    ln_q = ln_q + np.nansum(-np.log1p(-np.exp(-x)), axis=1)
+
+    ln_q = (
+        ln_q
+        + np.log(species_data["multiplicity"] * species_data["optical_isomers"])[
+            :, np.newaxis
+        ]
+    )
+    return ln_q
+
+
+def get_eckart_tunneling_function(E, E0, dV1, dV2, frequency):
+    """
+    Microcanonical Eckart transmission probability kappa(E) of n reactions on an energy grid
+    E of shape (n, m). Energies are in J/mol and the imaginary frequency in cm^-1.
+    """
+    frequency = np.abs(frequency) * h * c * 100.0 * Na
+    alpha1 = (2 * np.pi * dV1 / frequency)[:, np.newaxis]
+    alpha2 = (2 * np.pi * dV2 / frequency)[:, np.newaxis]
+    xi = (E - E0[:, np.newaxis]) / dV1[:, np.newaxis]
+
+    norm = 1.0 / np.sqrt(alpha1) + 1.0 / np.sqrt(alpha2)
+    twopia = 2.0 * np.sqrt(alpha1 * xi) / norm
+    twopib = 2.0 * np.sqrt(np.abs((xi - 1.0) * alpha1 + alpha2)) / norm
+    twopid = 2.0 * np.sqrt(np.abs(alpha1 * alpha2 - 4 * np.pi * np.pi / 16.0))
+
+    # 1 - (cosh(a - b) + cosh(d)) / (cosh(a + b) + cosh(d)) evaluated without overflow
+    twopid = np.broadcast_to(twopid, twopia.shape)
+    scale = np.maximum(twopia + twopib, twopid)
+    numerator = (
+        np.exp(np.abs(twopia - twopib) - scale)
+        + np.exp(-np.abs(twopia - twopib) - scale)
+        + np.exp(twopid - scale)
+        + np.exp(-twopid - scale)
+    )
+    denominator = (
+        np.exp(twopia + twopib - scale)
+        + np.exp(-twopia - twopib - scale)
+        + np.exp(twopid - scale)
+        + np.exp(-twopid - scale)
+    )
+    return 1.0 - numerator / denominator
+
+
+def get_eckart_tunneling_factor(E0_reac, E0_TS, E0_prod, frequency, T, dE=100.0):
+    """
+    Eckart tunneling correction kappa(T) of n reactions, shape (n, len(T)).
+    kappa(E) is evaluated once per reaction on a common energy grid and integrated for all
+    temperatures with one matrix product. Reactions with a negative barrier get NaN,
+    where Arkane raises an error.
+    """
+    E0_reac = np.asarray(E0_reac, dtype=float)
+    E0_TS = np.asarray(E0_TS, dtype=float)
+    E0_prod = np.asarray(E0_prod, dtype=float)
+    T = np.asarray(T, dtype=float)
+
+    E0 = np.maximum(E0_reac, E0_prod)
+    dV1 = E0_TS - E0
+    dV2 = E0_TS - np.minimum(E0_reac, E0_prod)
+    valid = (dV1 >= 0) & (dV2 >= 0)
+    dV1 = np.where(valid, dV1, 1.0)
+    dV2 = np.where(valid, dV2, 1.0)
+
+    # grid up to E0 + 2 * dV1 + 40 RT as in Arkane, beyond which the integrand is negligible
+    n_points = int(
+        np.ceil((2.0 * np.max(dV1, initial=0.0) + 40.0 * R * np.max(T)) / dE)
+    )
+    dE_list = np.arange(n_points) * dE
+    kappa_E = get_eckart_tunneling_function(
+        E0[:, np.newaxis] + dE_list[np.newaxis, :], E0, dV1, dV2, frequency
+    )
+
+    beta = 1.0 / (R * T)
+    with np.errstate(over="ignore", under="ignore"):
+        boltzmann = np.exp(-np.outer(dE_list, beta))
+        kappa = (
+            np.exp(np.outer(dV1, beta))
+            * (kappa_E @ boltzmann)
+            * dE
+            * beta[np.newaxis, :]
+        )
+    kappa[~valid, :] = np.nan
+    return kappa
+
+
+def get_tst_rate_coefficients(
+    reactants, ts, products, ts_frequency, T, tunneling="Eckart", degeneracy=1.0
+):
+    """
+    Conventional TST rate coefficients of n reactions at temperatures T, shape (n, len(T)),
+    in SI units (m^3/(mol*s) for a bimolecular reaction).
+
+    Args:
+        reactants: list of species data from ``make_species_data``, one per reactant position.
+        ts: species data of the transition states.
+        products: list of species data, one per product position, used for Eckart tunneling.
+        ts_frequency: imaginary frequencies of the transition states in cm^-1.
+        T: temperatures in K.
+        tunneling: ``"Eckart"`` or ``None``.
+        degeneracy: reaction path degeneracy.
+    """
+    T = np.asarray(T, dtype=float)
+    ln_pressure_factor = np.log(R * T / TST_PRESSURE)[np.newaxis, :]
+
+    ln_q_reac = 0.0
+    E0_reac = 0.0
+    for reactant in reactants:
+        ln_q_reac = (
+            ln_q_reac + get_log_partition_function(reactant, T) - ln_pressure_factor
+        )
+        E0_reac = E0_reac + reactant["E0"]
+    ln_q_ts = get_log_partition_function(ts, T) - ln_pressure_factor
+    dE0 = (ts["E0"] - E0_reac)[:, np.newaxis]
+
+    k = (
+        kB
+        * T[np.newaxis, :]
+        / h
+        * np.exp(ln_q_ts - ln_q_reac - dE0 / (R * T[np.newaxis, :]))
+    )
+
+    if tunneling == "Eckart":
+        E0_prod = sum([product["E0"] for product in products])
+        k = k * get_eckart_tunneling_factor(E0_reac, ts["E0"], E0_prod, ts_frequency, T)
+    elif tunneling is not None:
+        raise ValueError(f"Tunneling {tunneling} is not supported")
+
+    return k * degeneracy
+
+
+def fit_arrhenius(T, k, three_params=True, T0=1.0):
+    """
+    Fit k = A (T / T0)^n exp(-Ea / RT) to the rate coefficients of n reactions, shape (n, len(T)),
+    with one least squares solve as in ``Arrhenius.fit_to_data``.
+    Returns A (units of k), n and Ea (J/mol). Reactions with non-finite or non-positive k get NaN.
+    """
+    T = np.asarray(T, dtype=float)
+    k = np.atleast_2d(np.asarray(k, dtype=float))
+
+    if three_params:
+        design = np.stack([np.ones_like(T), np.log(T / T0), -1.0 / (R * T)], axis=1)
+    else:
+        design = np.stack([np.ones_like(T), -1.0 / (R * T)], axis=1)
+
+    valid = np.all(np.isfinite(k) & (k > 0), axis=1)
+    A = np.full(k.shape[0], np.nan)
+    n = np.full(k.shape[0], np.nan)
+    Ea = np.full(k.shape[0], np.nan)
+    if np.any(valid):
+        x, _, _, _ = np.linalg.lstsq(design, np.log(k[valid]).T, rcond=None)
+        A[valid] = np.exp(x[0])
+        if three_params:
+            n[valid] = x[1]
+            Ea[valid] = x[2]
+        else:
+            n[valid] = 0.0
+            Ea[valid] = x[1]
+    return A, n, Ea
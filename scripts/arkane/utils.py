@@ -1,10 +1,13 @@
 import argparse
+import ast
 import logging
 import os
 import shutil
+from functools import lru_cache
 from pathlib import Path
 
 import numpy as np
+import pandas as pd
 from arkane.common import get_principal_moments_of_inertia, symbol_by_number
 from arkane.encorr.corr import (
     assign_frequency_scale_factor,
@@ -15,7 +18,7 @@ from arkane.modelchem import CompositeLevelOfTheory, LevelOfTheory
 from rmgpy import constants
 from rmgpy.qm.qmdata import QMData
 from rmgpy.qm.symmetry import PointGroupCalculator
-from rmgpy.molecule.element import get_element
+from rmgpy.molecule.element import element_list
 from rmgpy.statmech import (
     Conformer,
     HarmonicOscillator,
@@ -24,8 +27,33 @@ from rmgpy.statmech import (
     NonlinearRotor,
 )
 
+from autoqm.arkane.symmetry_cache import (
+    get_geometry_hash,
+    load_symmetry_cache,
+    save_symmetry_cache,
+)
+
+
+def get_symmetry(
+    coords, atom_numbers, scr_dir=None, cleanup=True, cache=None, cache_dir=None
+):
+    """
+    Get the external symmetry number and the number of optical isomers with the symmetry program.
+    Results are looked up by ``get_geometry_hash`` in the in-memory ``cache`` dictionary and in
+    the on-disk cache in ``cache_dir``, which can be shared by the thermo and rate runs.
+    If not ``cleanup``, ``scr_dir`` is kept so that it can be reused.
+    """
 
-def get_symmetry(coords, atom_numbers, scr_dir=None):
+    if cache is not None or cache_dir is not None:
+        geometry_hash = get_geometry_hash(coords, atom_numbers)
+        if cache is not None and geometry_hash in cache:
+            return cache[geometry_hash]
+        if cache_dir is not None:
+            cached = load_symmetry_cache(cache_dir, geometry_hash)
+            if cached is not None:
+                if cache is not None:
+                    cache[geometry_hash] = cached
+                return cached
 
     scr_dir = scr_dir or os.path.join(".", "scratch")
     os.makedirs(scr_dir, exist_ok=True)
@@ -53,6 +81,10 @@ def get_symmetry(coords, atom_numbers, scr_dir=None):
                 f"Symmetry algorithm found {optical_isomers} optical isomers "
                 f"and a symmetry number of {symmetry}"
             )
+            if cache is not None:
+                cache[geometry_hash] = (symmetry, optical_isomers)
+            if cache_dir is not None:
+                save_symmetry_cache(cache_dir, geometry_hash, symmetry, optical_isomers)
         else:
             logging.warning(
                 "Symmetry algorithm errored when computing point group. "
@@ -61,7 +93,8 @@ def get_symmetry(coords, atom_numbers, scr_dir=None):
             )
         return symmetry, optical_isomers
     finally:
-        shutil.rmtree(scr_dir)
+        if cleanup:
+            shutil.rmtree(scr_dir)
 
 
 def get_lot_and_freq_scale(
@@ -159,9 +192,19 @@ def get_rmg_conformer(
     use_bond_corrections=False,
     bac_type="p",
     scr_dir=None,
+    cleanup_scr_dir=True,
+    symmetry_cache=None,
+    symmetry_cache_dir=None,
 ):
 
-    external_symmetry, optical_isomers = get_symmetry(coords, numbers, scr_dir=scr_dir)
+    external_symmetry, optical_isomers = get_symmetry(
+        coords,
+        numbers,
+        scr_dir=scr_dir,
+        cleanup=cleanup_scr_dir,
+        cache=symmetry_cache,
+        cache_dir=symmetry_cache_dir,
+    )
 
     modes = []
     # Translational
@@ -246,7 +289,10 @@ def parse_command_line_arguments(command_line_args=None):
 
     parser = argparse.ArgumentParser()
     parser.add_argument(
-        "--csv_path", type=str, help=".csv file path containing parsed results", required=True
+        "--csv_path",
+        type=str,
+        help=".csv file path containing parsed results, or a .pkl file with typed frequency and geometry columns from convert_arkane_inputs.py",
+        required=True,
     )
     parser.add_argument(
         "--freq_level", type=str, help="Frequency level of theory", required=True
@@ -261,12 +307,48 @@ def parse_command_line_arguments(command_line_args=None):
     parser.add_argument(
         "--n_jobs", type=int, help="Number of jobs to run in parallel", default=1
     )
+    parser.add_argument(
+        "--batch_size",
+        type=int,
+        help="Number of species computed by a worker at a time",
+        default=100,
+    )
     parser.add_argument(
         "--save_path", type=str, help="Directory to save the results", required=True
     )
     parser.add_argument(
         "--scratch_dir", type=Path, help="Scratch directory to store temporary files", required=True
     )
+    parser.add_argument(
+        "--rate_engine",
+        type=str,
+        choices=["arkane", "numpy"],
+        help="Compute the rates with one Arkane KineticsJob per reaction or with the NumPy TST engine for all reactions at once",
+        default="arkane",
+    )
+    parser.add_argument(
+        "--thermo_engine",
+        type=str,
+        choices=["arkane", "numpy"],
+        help="Compute the thermo with one Arkane ThermoJob per species or with the NumPy statmech engine for all species at once",
+        default="arkane",
+    )
+    parser.add_argument(
+        "--validate_thermo",
+        action="store_true",
+        help="Also run ThermoJob with the NumPy thermo engine and log the largest differences",
+    )
+    parser.add_argument(
+        "--validate_rates",
+        action="store_true",
+        help="Also run KineticsJob with the NumPy rate engine and log the largest differences",
+    )
+    parser.add_argument(
+        "--symmetry_cache_dir",
+        type=Path,
+        help="Directory of the symmetry cache shared by thermo and rate runs",
+        default=None,
+    )
     args = parser.parse_args(command_line_args)
 
     return args
@@ -276,10 +358,88 @@ def xyz_str_to_coords(xyz_str):
     """
     Convert a string of xyz format to a numpy array of coordinates
     """
-    xyz_lines = xyz_str.split("\n")[2:]
-    coords = [
-        [float(coord) for coord in line.split()[1:]] for line in xyz_lines if line
-    ]
-    coords = np.array(coords)
-    atomic_numbers = [get_element(line.split()[0]).number for line in xyz_lines if line]
+    tokens = "".join(xyz_str.split("\n", 2)[2:]).split()
+    symbols = tokens[0::4]
+    del tokens[0::4]
+    coords = np.array(tokens, dtype=float).reshape(-1, 3)
+    atomic_numbers = list(map(get_element_table()[0].__getitem__, symbols))
     return atomic_numbers, coords
+
+
+def get_xyz_columns(xyz_column):
+    """
+    Columns of the atomic numbers and (N, 3) coordinates that replace the ``*xyz_str`` column
+    ``xyz_column`` in the typed input tables, e.g. ``std_atomic_numbers`` and ``std_coords``
+    for ``std_xyz_str``.
+    """
+    prefix = xyz_column[: -len("xyz_str")]
+    return f"{prefix}atomic_numbers", f"{prefix}coords"
+
+
+def get_xyz(row, xyz_column):
+    """
+    Geometry of a row, as the ``(atomic_numbers, coords)`` arrays of the typed columns if the
+    table has them, or as the string of xyz format of ``xyz_column``.
+    """
+    atomic_numbers_column, coords_column = get_xyz_columns(xyz_column)
+    if atomic_numbers_column in row.index:
+        return row[atomic_numbers_column], row[coords_column]
+    return row[xyz_column]
+
+
+def get_atomic_numbers_and_coords(xyz):
+    """
+    Atomic numbers and coordinates of a geometry given either as a string of xyz format
+    or as an ``(atomic_numbers, coords)`` pair of arrays.
+    """
+    if isinstance(xyz, str):
+        return xyz_str_to_coords(xyz)
+    atomic_numbers, coords = xyz
+    atomic_numbers = np.asarray(atomic_numbers, dtype=int).tolist()
+    return atomic_numbers, np.asarray(coords, dtype=float).reshape(-1, 3)
+
+
+def get_frequencies(frequencies):
+    """
+    Frequencies given either as a stringified list or as an array of floats.
+    """
+    if isinstance(frequencies, str):
+        frequencies = ast.literal_eval(frequencies)
+    return np.asarray(frequencies, dtype=float)
+
+
+@lru_cache(maxsize=None)
+def get_element_table():
+    """
+    Atomic numbers by symbol and masses (kg/mol) indexed by atomic number of the RMG
+    elements, so that whole geometries are mapped without per-atom ``get_element`` calls.
+    """
+    elements = [element for element in element_list if element.isotope == -1]
+    atomic_numbers = {element.symbol: element.number for element in elements}
+    masses = np.full(max(atomic_numbers.values()) + 1, np.nan)
+    for element in elements:
+        masses[element.number] = element.mass
+    masses.flags.writeable = False
+    return atomic_numbers, masses
+
+
+def get_mass(atomic_numbers):
+    """
+    Mass of a molecule in kg.
+    """
+    mass = get_element_table()[1][np.asarray(atomic_numbers, dtype=int)].sum()
+    if np.isnan(mass):
+        raise ValueError(f"Could not recognize all element numbers {atomic_numbers}")
+    return float(mass) / constants.Na, "kg"
+
+
+def load_input_table(path):
+    """
+    Load the input table of the Arkane scripts, either a .csv file or a .pkl file with typed
+    columns, where the frequencies are float64 arrays and each ``*xyz_str`` column is replaced
+    by uint8 atomic numbers and float64 (N, 3) coordinates, as written by
+    convert_arkane_inputs.py, see ``get_xyz_columns``.
+    """
+    if str(path).endswith(".pkl"):
+        return pd.read_pickle(path)
+    return pd.read_csv(path)
@@ -0,0 +1,157 @@
+"""
+This module benchmarks XtbLog on a corpus of xTB logs against the previous implementation,
+which read the log once per property with ``readlines``, and checks that both parse the
+same termination, energies, frequencies and IR intensities
+"""
+
+import argparse
+import glob
+import os
+import re
+import time
+
+import numpy as np
+
+from autoqm.calculation.log_parser import XtbLog
+
+
+class LegacyXtbLog:
+    def __init__(self, file):
+        self.file = file
+        self.name = os.path.basename(file)
+
+        self.GetTermination()
+        if self.termination:
+            try:
+                self.GetFreq()
+            except:
+                pass
+            self.GetE()
+
+    def GetTermination(self):
+        with open(self.file) as fh:
+            for line in fh:
+                if (
+                    line.find("normal termination") > -1
+                    and not line.find("abnormal termination") > -1
+                ):
+                    self.termination = True
+                    return True
+            self.termination = False
+
+    def GetFreq(self):
+        with open(self.file) as fh:
+            txt = fh.readlines()
+
+        txt = [x.strip() for x in txt]
+        for i, line in enumerate(txt):
+            if line.find("Frequency Printout") > -1:
+                txt = txt[i + 3 :]
+                break
+
+        waveNums = []
+        for i, line in enumerate(txt):
+            if line.find("reduced masses") > -1:
+                txt = txt[i + 1 :]
+                break
+            m = re.findall("\s+(-?\d+\.\d+)", line)
+            if m:
+                for match in m:
+                    waveNums.append(float(match.strip()))
+
+        for i, line in enumerate(txt):
+            if line.find("IR intensities") > -1:
+                txt = txt[i + 1 :]
+                break
+
+        intensities = []
+        for i, line in enumerate(txt):
+            if line.find("Raman intensities") > -1:
+                txt = txt[i + 1 :]
+                break
+            m = re.findall("\d+:\s+(\d+\.\d+)", line)
+            if m:
+                for match in m:
+                    intensities.append(float(match))
+
+        waveNums, intensities = list(
+            zip(*[(w, i) for w, i in zip(waveNums, intensities) if w != 0])
+        )
+
+        if waveNums and intensities and len(waveNums) == len(intensities):
+            self.wavenum = waveNums
+            self.ir_intensities = intensities
+
+    def GetE(self):
+        with open(self.file) as fh:
+            txt = fh.readlines()
+
+        txt = [x.strip() for x in txt]
+        for i, line in enumerate(txt):
+            m = re.search("TOTAL ENERGY\s+(-?\d+\.\d+)", line)
+            if m:
+                self.E = m[1]
+                continue
+            m = re.search("TOTAL FREE ENERGY\s+(-?\d+\.\d+)", line)
+            if m:
+                self.G = float(m[1])
+
+
+def same_results(log, legacy_log):
+    if log.termination != legacy_log.termination:
+        return False
+    for attr in ["E", "G", "wavenum", "ir_intensities"]:
+        if hasattr(log, attr) != hasattr(legacy_log, attr):
+            return False
+        if hasattr(log, attr) and not np.allclose(
+            np.asarray(getattr(log, attr), dtype=float),
+            np.asarray(getattr(legacy_log, attr), dtype=float),
+        ):
+            return False
+    return True
+
+
+def parse_logs(log_class, log_paths, n_repeats):
+    start_time = time.time()
+    for _ in range(n_repeats):
+        logs = [log_class(log_path) for log_path in log_paths]
+    return logs, (time.time() - start_time) / n_repeats / len(log_paths)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--log_dir",
+        type=str,
+        help="Folder searched recursively for xTB .log files",
+        required=True,
+    )
+    parser.add_argument(
+        "--n_repeats", type=int, help="Number of times the corpus is parsed", default=3
+    )
+    args = parser.parse_args()
+
+    log_paths = sorted(
+        glob.glob(os.path.join(args.log_dir, "**", "*.log"), recursive=True)
+    )
+    print(f"Number of logs: {len(log_paths)}")
+
+    legacy_logs, legacy_time = parse_logs(LegacyXtbLog, log_paths, args.n_repeats)
+    logs, new_time = parse_logs(XtbLog, log_paths, args.n_repeats)
+
+    mismatches = [
+        log.file
+        for log, legacy_log in zip(logs, legacy_logs)
+        if not same_results(log, legacy_log)
+    ]
+    print(f"Number of logs with different results: {len(mismatches)}")
+    for log_path in mismatches:
+        print(log_path)
+
+    print(f"Legacy: {legacy_time * 1000:.3f} ms per log")
+    print(f"Single pass: {new_time * 1000:.3f} ms per log")
+    print(f"Speedup: {legacy_time / new_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
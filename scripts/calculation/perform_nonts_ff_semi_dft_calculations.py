@@ -142,6 +142,29 @@ parser.add_argument(
     default=62400,  # 3900*16
     help="amount of ram (MB) allocated for each DFT calculation",
 )
+parser.add_argument(
+    "--DFT_opt_freq_save_chk",
+    action="store_true",
+    help="write the Gaussian checkpoint file to the output folder so that interrupted DFT jobs resume from it",
+)
+parser.add_argument(
+    "--DFT_opt_freq_restart_mode",
+    type=str,
+    default="geom_check",
+    choices=["geom_check", "opt_restart"],
+    help="how to resume from the checkpoint file, geom_check: geom=check guess=read, opt_restart: opt=restart",
+)
+parser.add_argument(
+    "--DFT_opt_freq_compress_chk",
+    action="store_true",
+    help="gzip the checkpoint file of converged DFT jobs",
+)
+parser.add_argument(
+    "--DFT_opt_freq_max_chk_size",
+    type=int,
+    default=None,
+    help="maximum size (MB) of the checkpoint file to keep for converged DFT jobs",
+)
 
 # specify paths
 parser.add_argument(
@@ -469,6 +492,7 @@ for _ in range(1):
                             DFT_opt_freq_dir, "outputs", f"outputs_{ids}", f"{mol_id}"
                         )
                         os.makedirs(output_mol_dir, exist_ok=True)
+                        chk_dir = output_mol_dir if args.DFT_opt_freq_save_chk else None
 
                         print(
                             f"Optimizing lowest energy semiempirical opted conformer with DFT method for {mol_id} {smi}..."
@@ -501,6 +525,10 @@ for _ in range(1):
                                 args.scratch_dir,
                                 subinputs_dir,
                                 output_mol_dir,
+                                chk_dir=chk_dir,
+                                restart_mode=args.DFT_opt_freq_restart_mode,
+                                compress_chk=args.DFT_opt_freq_compress_chk,
+                                max_chk_size=args.DFT_opt_freq_max_chk_size,
                             )
 
                             if not converged:
@@ -535,6 +563,10 @@ for _ in range(1):
                                     args.scratch_dir,
                                     subinputs_dir,
                                     output_mol_dir,
+                                    chk_dir=chk_dir,
+                                    restart_mode=args.DFT_opt_freq_restart_mode,
+                                    compress_chk=args.DFT_opt_freq_compress_chk,
+                                    max_chk_size=args.DFT_opt_freq_max_chk_size,
                                 )
 
                         else:
@@ -572,6 +604,10 @@ for _ in range(1):
                                 args.scratch_dir,
                                 subinputs_dir,
                                 output_mol_dir,
+                                chk_dir=chk_dir,
+                                restart_mode=args.DFT_opt_freq_restart_mode,
+                                compress_chk=args.DFT_opt_freq_compress_chk,
+                                max_chk_size=args.DFT_opt_freq_max_chk_size,
                             )
 
     print("DFT optimization and frequency calculation done.")
@@ -51,6 +51,10 @@ def main(args):
     logging.info("Loading templates...")
     with open(args.template_file, "r") as f:
         template = f.read()
+    merged_template = None
+    if args.merged_template_file is not None:
+        with open(args.merged_template_file, "r") as f:
+            merged_template = f.read()
 
     logging.info("Setting up directories...")
     submit_dir = Path.cwd().absolute()
@@ -153,6 +157,16 @@ def main(args):
                     mult = id_to_mult_dict[job_id]
                     xyz_str = id_to_xyz_dict[job_id]
 
+                    if args.DFT_opt_freq_chk_dir is not None:
+                        chk_path = (
+                            args.DFT_opt_freq_chk_dir
+                            / f"outputs_{job_id_div_1000}"
+                            / f"{job_id}"
+                            / f"{job_id}.chk"
+                        )
+                    else:
+                        chk_path = None
+
                     dft_scf_qm_descriptor(
                         g16_path=args.g16_path,
                         job_id=job_id,
@@ -163,6 +177,8 @@ def main(args):
                         scratch_dir=args.scratch_dir,
                         subinputs_dir=subinputs_dir,
                         suboutputs_dir=suboutputs_dir,
+                        chk_path=chk_path,
+                        merged_template=merged_template,
                     )
 
 
@@ -61,6 +61,29 @@ parser.add_argument(
     default=62400,  # 3900*16
     help="amount of ram (MB) allocated for each DFT calculation",
 )
+parser.add_argument(
+    "--DFT_opt_freq_save_chk",
+    action="store_true",
+    help="write the Gaussian checkpoint file to the output folder so that interrupted DFT jobs resume from it",
+)
+parser.add_argument(
+    "--DFT_opt_freq_restart_mode",
+    type=str,
+    default="geom_check",
+    choices=["geom_check", "opt_restart"],
+    help="how to resume from the checkpoint file, geom_check: geom=check guess=read, opt_restart: opt=restart",
+)
+parser.add_argument(
+    "--DFT_opt_freq_compress_chk",
+    action="store_true",
+    help="gzip the checkpoint file of converged DFT jobs",
+)
+parser.add_argument(
+    "--DFT_opt_freq_max_chk_size",
+    type=int,
+    default=None,
+    help="maximum size (MB) of the checkpoint file to keep for converged DFT jobs",
+)
 
 # specify paths
 parser.add_argument(
@@ -216,6 +239,10 @@ for _ in range(1):
                         args.scratch_dir,
                         input_rxn_dir,
                         output_rxn_dir,
+                        chk_dir=output_rxn_dir if args.DFT_opt_freq_save_chk else None,
+                        restart_mode=args.DFT_opt_freq_restart_mode,
+                        compress_chk=args.DFT_opt_freq_compress_chk,
+                        max_chk_size=args.DFT_opt_freq_max_chk_size,
                     )
 
     print("DFT optimization and frequency calculation done.")
@@ -0,0 +1,88 @@
+"""
+This module indexes the inputs_*/outputs_* trees of all calculation stages of a campaign into a
+small sqlite database and prints the number of queued, running, failed and done jobs per stage
+with their throughput and ETA. Only directory listings and file mtimes are read, and
+unchanged directories are skipped on later runs.
+"""
+
+import argparse
+import os
+import time
+
+import pandas as pd
+
+from autoqm.calculation.status_index import (
+    STAGES,
+    connect,
+    get_job_states,
+    index_stage,
+    summarize_job_states,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--output_folder", type=str, default="output", help="output folder name"
+    )
+    parser.add_argument(
+        "--database",
+        type=str,
+        help="sqlite file of the index, output_folder/status_index.sqlite by default",
+        default=None,
+    )
+    parser.add_argument(
+        "--stages",
+        type=str,
+        nargs="+",
+        choices=list(STAGES),
+        help="stages to index and report",
+        default=list(STAGES),
+    )
+    for stage, stage_config in STAGES.items():
+        parser.add_argument(
+            f"--{stage}_folder",
+            type=str,
+            help=f"folder for {stage} in the output folder",
+            default=stage_config["folder"],
+        )
+    parser.add_argument(
+        "--window",
+        type=float,
+        help="time window in seconds over which the throughput is measured",
+        default=3600.0,
+    )
+    args = parser.parse_args()
+
+    database = args.database or os.path.join(args.output_folder, "status_index.sqlite")
+    conn = connect(database)
+    try:
+        start_time = time.time()
+        stages = []
+        for stage in args.stages:
+            stage_dir = os.path.join(
+                args.output_folder, getattr(args, f"{stage}_folder")
+            )
+            if not os.path.isdir(stage_dir):
+                continue
+            num_listed = index_stage(
+                conn,
+                stage,
+                stage_dir,
+                STAGES[stage]["output_suffix"],
+                job_dir=STAGES[stage]["job_dir"],
+            )
+            print(f"{stage}: listed {num_listed} changed directories")
+            stages.append(stage)
+        print(f"Indexing took {time.time() - start_time:.1f} seconds")
+
+        report = summarize_job_states(get_job_states(conn), stages, args.window)
+    finally:
+        conn.close()
+
+    with pd.option_context("display.width", 200, "display.max_columns", None):
+        print(report.to_string(float_format="{:.4g}".format))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,12 @@
 import os
+import pickle as pkl
+from collections import Counter
 from tqdm import tqdm
 import pandas as pd
 from argparse import ArgumentParser
 from joblib import Parallel, delayed
 
-from autoqm.functional_group.analysis import functional_group_analysis
+from autoqm.functional_group.analysis import count_functional_groups_batch
 
 parser = ArgumentParser()
 parser.add_argument(
@@ -14,27 +16,145 @@ parser.add_argument(
     help="input smiles included in a .csv file",
 )
 parser.add_argument("--n_jobs", type=int, default=1, help="number of workers to use")
+parser.add_argument(
+    "--chunk_size",
+    type=int,
+    default=1000,
+    help="number of molecules analyzed by a worker at a time",
+)
+parser.add_argument(
+    "--read_chunk_size",
+    type=int,
+    default=100000,
+    help="number of molecules read from the input at a time, a checkpoint is written after each",
+)
+parser.add_argument(
+    "--cache_dir",
+    type=str,
+    default=None,
+    help="directory of the fragment cache shared by all workers and runs",
+)
+parser.add_argument(
+    "--membership",
+    type=str,
+    choices=["none", "dense", "sparse"],
+    default="none",
+    help="also save the functional groups of each molecule, as one row per molecule (dense) or one row per molecule and functional group (sparse)",
+)
+parser.add_argument(
+    "--resume",
+    action="store_true",
+    help="continue from the checkpoint of a previous run",
+)
 
 args = parser.parse_args()
 
-# load smiles
-print("Loading smiles...")
-df_smiles = pd.read_csv(args.input_smiles)
-smiles_list = df_smiles["smiles"].tolist()
+input_file_name = os.path.basename(args.input_smiles)
+output_file_name = input_file_name.replace(".csv", "_functional_groups.csv")
+checkpoint_file_name = input_file_name.replace(
+    ".csv", "_functional_groups_checkpoint.pkl"
+)
+membership_file_name = input_file_name.replace(
+    ".csv", f"_functional_groups_membership_{args.membership}.csv"
+)
+
+# load checkpoint
+num_rows = 0
+membership_size = 0
+functional_group_smiles_counts = Counter()
+if args.resume and os.path.exists(checkpoint_file_name):
+    with open(checkpoint_file_name, "rb") as f:
+        checkpoint = pkl.load(f)
+    num_rows = checkpoint["num_rows"]
+    functional_group_smiles_counts = checkpoint["counts"]
+    membership_size = checkpoint.get("membership_size", 0)
+    print(f"Resuming from checkpoint after {num_rows} molecules...")
+    # drop the membership rows appended after the checkpoint by an interrupted run
+    if args.membership != "none" and os.path.exists(membership_file_name):
+        with open(membership_file_name, "r+b") as f:
+            f.truncate(membership_size)
+elif args.membership != "none" and os.path.exists(membership_file_name):
+    os.remove(membership_file_name)
+
+
+def save_membership(smiles_list, membership, start_index):
+    if args.membership == "dense":
+        df_membership = pd.DataFrame(
+            {
+                "smiles": smiles_list,
+                "functional_group_smiles": [str(groups) for groups in membership],
+            },
+            index=range(start_index, start_index + len(smiles_list)),
+        )
+    else:
+        records = [
+            (start_index + i, smiles, functional_group_smiles, count)
+            for i, (smiles, groups) in enumerate(zip(smiles_list, membership))
+            for functional_group_smiles, count in Counter(groups).items()
+        ]
+        df_membership = pd.DataFrame(
+            records, columns=["mol_index", "smiles", "functional_group_smiles", "count"]
+        ).set_index("mol_index")
+    write_header = (
+        not os.path.exists(membership_file_name)
+        or os.path.getsize(membership_file_name) == 0
+    )
+    df_membership.to_csv(membership_file_name, mode="a", header=write_header)
+    return os.path.getsize(membership_file_name)
 
-# perform functional group analysis
+
+# perform functional group analysis, one read chunk at a time
 print("Performing functional group analysis...")
-outs = Parallel(n_jobs=args.n_jobs, backend="multiprocessing")(
-    delayed(functional_group_analysis)(smi) for smi in tqdm(smiles_list)
+df_reader = pd.read_csv(
+    args.input_smiles,
+    usecols=["smiles"],
+    chunksize=args.read_chunk_size,
+    skiprows=range(1, num_rows + 1),
 )
+with Parallel(n_jobs=args.n_jobs, backend="multiprocessing") as parallel:
+    for df_smiles in tqdm(df_reader):
+        smiles_list = df_smiles["smiles"].tolist()
+        chunks = [
+            smiles_list[i : i + args.chunk_size]
+            for i in range(0, len(smiles_list), args.chunk_size)
+        ]
+        outs = parallel(
+            delayed(count_functional_groups_batch)(
+                chunk,
+                cache_dir=args.cache_dir,
+                return_membership=args.membership != "none",
+            )
+            for chunk in chunks
+        )
+
+        # merge counts of the workers
+        for counts, _ in outs:
+            functional_group_smiles_counts.update(counts)
+
+        if args.membership != "none":
+            membership = [
+                groups for _, chunk_membership in outs for groups in chunk_membership
+            ]
+            membership_size = save_membership(smiles_list, membership, num_rows)
+
+        # save checkpoint, replacing the previous one only once it is complete, with the size of
+        # the membership file it is consistent with
+        num_rows += len(smiles_list)
+        with open(checkpoint_file_name + ".tmp", "wb") as f:
+            pkl.dump(
+                {
+                    "num_rows": num_rows,
+                    "counts": functional_group_smiles_counts,
+                    "membership_size": membership_size,
+                },
+                f,
+                protocol=pkl.HIGHEST_PROTOCOL,
+            )
+        os.replace(checkpoint_file_name + ".tmp", checkpoint_file_name)
 
 # collect results
-functional_group_smiles_list = [o for out in outs for o in out]
-unique_functional_group_smiles_list = list(set(functional_group_smiles_list))
+unique_functional_group_smiles_list = list(functional_group_smiles_counts)
 unique_functional_group_smiles_list.sort(key=lambda x: (len(x), x))
-functional_group_smiles_counts = {smi: 0 for smi in unique_functional_group_smiles_list}
-for smi in functional_group_smiles_list:
-    functional_group_smiles_counts[smi] += 1
 unique_functional_group_smiles_counts = [
     (smi, functional_group_smiles_counts[smi])
     for smi in unique_functional_group_smiles_list
@@ -45,6 +165,4 @@ print("Saving results...")
 df_groups = pd.DataFrame(
     unique_functional_group_smiles_counts, columns=["functional_group_smiles", "count"]
 )
-input_file_name = os.path.basename(args.input_smiles)
-output_file_name = input_file_name.replace(".csv", "_functional_groups.csv")
 df_groups.to_csv(output_file_name, index=False)
@@ -0,0 +1,116 @@
+"""
+This module benchmarks the bulk xyz formatting and parsing of autoqm.parser.utils against the
+previous line by line implementations on random 10 to 200-atom geometries, and checks that
+both give the same xyz strings, symbols and coordinates
+"""
+
+import argparse
+import timeit
+
+import numpy as np
+
+from autoqm.parser.utils import format_xyz, parse_xyz
+
+
+def legacy_make_xyz_str(symbols, coords):
+    xyz_str = ""
+    for s, c in zip(symbols, coords):
+        xyz_str = xyz_str + f"{s}  {c[0]: .10f}  {c[1]: .10f}  {c[2]: .10f}\n"
+    return xyz_str
+
+
+def legacy_clean_xyz_str(xyz_str):
+    coords = [x for x in xyz_str.splitlines()]
+    new_coords = []
+
+    for coord in coords:
+        symbol, x, y, z = coord.split()
+        new_coords.append(
+            "{} {:.6f} {:.6f} {:.6f}\n".format(symbol, float(x), float(y), float(z))
+        )
+
+    return "".join(new_coords)
+
+
+def legacy_get_symbols_and_coords(xyz):
+    lines = xyz.splitlines()
+    symbols = list()
+    coords = list()
+    for line in lines:
+        if line.strip():
+            symbol, x, y, z = line.split()
+            symbols.append(symbol)
+            coords.append([float(x), float(y), float(z)])
+    return symbols, np.array(coords)
+
+
+def clean_xyz_str(xyz_str):
+    return format_xyz(*parse_xyz(xyz_str), row_format="%s %.6f %.6f %.6f\n")
+
+
+def random_geometry(num_atoms, rng):
+    symbols = list(rng.choice(["C", "H", "N", "O"], num_atoms))
+    coords = rng.normal(scale=3.0, size=(num_atoms, 3))
+    return symbols, coords
+
+
+def time_per_call(func, args, n_repeats):
+    return (
+        min(timeit.repeat(lambda: func(*args), number=n_repeats, repeat=5)) / n_repeats
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--num_atoms",
+        type=int,
+        nargs="+",
+        help="Numbers of atoms of the benchmarked geometries",
+        default=[10, 25, 50, 100, 200],
+    )
+    parser.add_argument(
+        "--n_geometries",
+        type=int,
+        help="Number of random geometries checked per number of atoms",
+        default=100,
+    )
+    parser.add_argument(
+        "--n_repeats", type=int, help="Number of calls timed per function", default=1000
+    )
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    benchmarks = [
+        ("format", legacy_make_xyz_str, format_xyz, "geometry"),
+        ("clean", legacy_clean_xyz_str, clean_xyz_str, "xyz_str"),
+        ("parse", legacy_get_symbols_and_coords, parse_xyz, "xyz_str"),
+    ]
+
+    for num_atoms in args.num_atoms:
+        geometries = [random_geometry(num_atoms, rng) for _ in range(args.n_geometries)]
+        xyz_strs = [legacy_make_xyz_str(*geometry) for geometry in geometries]
+
+        mismatches = 0
+        for geometry, xyz_str in zip(geometries, xyz_strs):
+            mismatches += format_xyz(*geometry) != xyz_str
+            mismatches += clean_xyz_str(xyz_str) != legacy_clean_xyz_str(xyz_str)
+            symbols, coords = parse_xyz(xyz_str)
+            legacy_symbols, legacy_coords = legacy_get_symbols_and_coords(xyz_str)
+            mismatches += symbols != legacy_symbols or not np.array_equal(
+                coords, legacy_coords
+            )
+        print(f"{num_atoms} atoms, number of mismatches: {mismatches}")
+
+        for name, legacy_func, func, input_type in benchmarks:
+            inputs = geometries[0] if input_type == "geometry" else (xyz_strs[0],)
+            legacy_time = time_per_call(legacy_func, inputs, args.n_repeats)
+            new_time = time_per_call(func, inputs, args.n_repeats)
+            print(
+                f"    {name}: legacy {legacy_time * 1e6:.1f} us, "
+                f"bulk {new_time * 1e6:.1f} us, speedup {legacy_time / new_time:.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
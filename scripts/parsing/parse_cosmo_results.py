@@ -2,12 +2,19 @@ import os
 import sys
 import pickle as pkl
 import pandas as pd
-from joblib import Parallel, delayed
 from tqdm import tqdm
 from autoqm.parser.cosmo_parser import cosmo_parser
+from autoqm.parser.parallel import chunked_parse
 
 
-def main(input_smiles_path, output_file_name, n_jobs, solvent_path, output_dir):
+def main(
+    input_smiles_path,
+    output_file_name,
+    n_jobs,
+    solvent_path,
+    output_dir,
+    chunk_size=100,
+):
     submit_dir = os.getcwd()
 
     df_solute = pd.read_csv(input_smiles_path)
@@ -34,8 +41,12 @@ def main(input_smiles_path, output_file_name, n_jobs, solvent_path, output_dir):
             if file.endswith(".tar"):
                 tar_file_paths.append(os.path.join(root, file))
 
-    out = Parallel(n_jobs=n_jobs, backend="multiprocessing", verbose=5)(
-        delayed(cosmo_parser)(tar_file_path) for tar_file_path in tqdm(tar_file_paths)
+    out = chunked_parse(
+        cosmo_parser,
+        [(tar_file_path, (tar_file_path,)) for tar_file_path in tar_file_paths],
+        n_jobs=n_jobs,
+        chunk_size=chunk_size,
+        key=os.path.dirname,
     )
 
     out = [x for x in out if x is not None]
@@ -81,5 +92,13 @@ if __name__ == "__main__":
     n_jobs = int(sys.argv[3])
     solvent_path = sys.argv[4]
     cosmo_output_dir = sys.argv[5]
-
-    main(input_smiles_path, output_file_name, n_jobs, solvent_path, cosmo_output_dir)
+    chunk_size = int(sys.argv[6]) if len(sys.argv) > 6 else 100
+
+    main(
+        input_smiles_path,
+        output_file_name,
+        n_jobs,
+        solvent_path,
+        cosmo_output_dir,
+        chunk_size,
+    )
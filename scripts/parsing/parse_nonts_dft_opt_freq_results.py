@@ -3,11 +3,11 @@
 import os
 import pandas as pd
 import pickle as pkl
-from tqdm import tqdm
-from joblib import Parallel, delayed
 from argparse import ArgumentParser
 
+from autoqm.parser.connectivity import load_reference_connectivity
 from autoqm.parser.dft_opt_freq_parser import dft_opt_freq_parser
+from autoqm.parser.parallel import chunked_parse, iter_shards, sharded_parse
 
 parser = ArgumentParser()
 parser.add_argument(
@@ -28,6 +28,31 @@ parser.add_argument(
     required=True,
     help="number of jobs to run in parallel",
 )
+parser.add_argument(
+    "--chunk_size",
+    type=int,
+    default=100,
+    help="number of molecules from the same outputs_{ids} folder parsed by a worker at a time",
+)
+parser.add_argument(
+    "--shard_dir",
+    type=str,
+    default=None,
+    help="if given, each worker writes the results of one outputs_{ids} shard to this folder instead of returning them",
+)
+parser.add_argument(
+    "--reference_connectivity",
+    type=str,
+    default=None,
+    help=".pkl file of the connectivity of the input smiles, built on the first run and reused by later stages and re-parses",
+)
+parser.add_argument(
+    "--connectivity_backend",
+    type=str,
+    choices=["numpy", "openbabel"],
+    default="numpy",
+    help="how the bonds of the optimized geometries are perceived for the connectivity check",
+)
 args = parser.parse_args()
 
 input_smiles_path = args.input_smiles_path
@@ -54,42 +79,79 @@ for mol_id in mol_ids:
     )
     log_paths.append(log_path)
 
-out = Parallel(n_jobs=n_jobs, backend="multiprocessing", verbose=5)(
-    delayed(dft_opt_freq_parser)(path, is_ts=False, check_connectivity=True, smi=smi)
-    for path, smi in tqdm(
-        zip(log_paths, smiles_list)
-    )  # not able to use check_connectivity=True for TS
-)
+mol_id_to_connectivity = dict()
+if args.reference_connectivity is not None:
+    mol_id_to_connectivity = load_reference_connectivity(
+        args.reference_connectivity, mol_ids, smiles_list
+    )
+tasks = [
+    (
+        mol_id,
+        (
+            path,
+            False,
+            True,
+            smi,
+            mol_id_to_connectivity.get(mol_id),
+            args.connectivity_backend,
+        ),
+    )
+    for mol_id, path, smi in zip(mol_ids, log_paths, smiles_list)
+]
+
+if args.shard_dir is not None:
+    manifest_df = sharded_parse(
+        dft_opt_freq_parser,
+        tasks,
+        output_file_name,
+        args.shard_dir,
+        n_jobs=n_jobs,
+        keyed=False,
+    )
+    manifest_path = os.path.join(args.shard_dir, f"{output_file_name}_manifest.csv")
+
+    print(f"Total number of molecules: {len(mol_ids)}")
+    print(f"Total number of failed molecules: {manifest_df.num_failed.sum()}")
+
+    valid_jobs_shards = iter_shards(manifest_path)
+else:
+    out = chunked_parse(
+        dft_opt_freq_parser,
+        tasks,
+        n_jobs=n_jobs,
+        chunk_size=args.chunk_size,
+    )
+
+    failed_jobs = dict()
+    valid_jobs = dict()
+    for mol_id, (failed_job, valid_job) in zip(mol_ids, out):
+        if failed_job:
+            failed_jobs[mol_id] = failed_job
+        if valid_job:
+            valid_jobs[mol_id] = valid_job
 
-failed_jobs = dict()
-valid_jobs = dict()
-for mol_id, (failed_job, valid_job) in zip(mol_ids, out):
-    if failed_job:
-        failed_jobs[mol_id] = failed_job
-    if valid_job:
-        valid_jobs[mol_id] = valid_job
+    with open(os.path.join(f"{output_file_name}.pkl"), "wb") as outfile:
+        pkl.dump(valid_jobs, outfile, protocol=pkl.HIGHEST_PROTOCOL)
 
-with open(os.path.join(f"{output_file_name}.pkl"), "wb") as outfile:
-    pkl.dump(valid_jobs, outfile, protocol=pkl.HIGHEST_PROTOCOL)
+    with open(os.path.join(f"{output_file_name}_failed.pkl"), "wb") as outfile:
+        pkl.dump(failed_jobs, outfile, protocol=pkl.HIGHEST_PROTOCOL)
 
-with open(os.path.join(f"{output_file_name}_failed.pkl"), "wb") as outfile:
-    pkl.dump(failed_jobs, outfile, protocol=pkl.HIGHEST_PROTOCOL)
+    print(f"Total number of molecules: {len(mol_ids)}")
+    print(f"Total number of failed molecules: {len(failed_jobs)}")
+    print(failed_jobs)
 
-print(f"Total number of molecules: {len(mol_ids)}")
-print(f"Total number of failed molecules: {len(failed_jobs)}")
-print(failed_jobs)
+    valid_jobs_shards = [valid_jobs]
 
 mol_id_to_DFT_opted_xyz_std_ori = {}
-for mol_id, valid_job in valid_jobs.items():
-    mol_id_to_DFT_opted_xyz_std_ori[mol_id] = valid_job["dft_xyz_std_ori"]
+mol_id_to_DFT_opted_xyz_input_ori = {}
+for valid_jobs in valid_jobs_shards:
+    for mol_id, valid_job in valid_jobs.items():
+        mol_id_to_DFT_opted_xyz_std_ori[mol_id] = valid_job["dft_xyz_std_ori"]
+        mol_id_to_DFT_opted_xyz_input_ori[mol_id] = valid_job["dft_xyz_input_ori"]
 
 with open(os.path.join(f"{output_file_name}_xyz_std_ori.pkl"), "wb") as outfile:
     pkl.dump(mol_id_to_DFT_opted_xyz_std_ori, outfile, protocol=pkl.HIGHEST_PROTOCOL)
 
-mol_id_to_DFT_opted_xyz_input_ori = {}
-for mol_id, valid_job in valid_jobs.items():
-    mol_id_to_DFT_opted_xyz_input_ori[mol_id] = valid_job["dft_xyz_input_ori"]
-
 with open(os.path.join(f"{output_file_name}_xyz_input_ori.pkl"), "wb") as outfile:
     pkl.dump(mol_id_to_DFT_opted_xyz_input_ori, outfile, protocol=pkl.HIGHEST_PROTOCOL)
 
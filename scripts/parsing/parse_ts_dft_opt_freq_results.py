@@ -9,6 +9,7 @@ from joblib import Parallel, delayed
 from argparse import ArgumentParser
 
 from autoqm.parser.dft_opt_freq_parser import dft_opt_freq_parser
+from autoqm.parser.parallel import iter_shards, sharded_parse
 
 parser = ArgumentParser()
 parser.add_argument(
@@ -29,6 +30,12 @@ parser.add_argument(
     required=True,
     help="number of jobs to run in parallel",
 )
+parser.add_argument(
+    "--shard_dir",
+    type=str,
+    default=None,
+    help="if given, each worker writes the results of one outputs_{ids} shard to this folder instead of returning them",
+)
 args = parser.parse_args()
 
 input_smiles_path = args.input_smiles_path
@@ -54,44 +61,61 @@ for rxn_id in rxn_ids:
     )
     log_paths.append(log_path)
 
-out = Parallel(n_jobs=n_jobs, backend="multiprocessing", verbose=5)(
-    delayed(dft_opt_freq_parser)(
-        path,
-        is_ts=True,
-        check_connectivity=False,
+if args.shard_dir is not None:
+    manifest_df = sharded_parse(
+        dft_opt_freq_parser,
+        [(rxn_id, (path, True, False)) for rxn_id, path in zip(rxn_ids, log_paths)],
+        output_file_name,
+        args.shard_dir,
+        n_jobs=n_jobs,
+        keyed=False,
+    )
+    manifest_path = os.path.join(args.shard_dir, f"{output_file_name}_manifest.csv")
+
+    print(f"Total number of molecules: {len(rxn_ids)}")
+    print(f"Total number of failed molecules: {manifest_df.num_failed.sum()}")
+
+    valid_jobs_shards = iter_shards(manifest_path)
+else:
+    out = Parallel(n_jobs=n_jobs, backend="multiprocessing", verbose=5)(
+        delayed(dft_opt_freq_parser)(
+            path,
+            is_ts=True,
+            check_connectivity=False,
+        )
+        for path in tqdm(log_paths)  # not able to use check_connectivity=True for TS
     )
-    for path in tqdm(log_paths)  # not able to use check_connectivity=True for TS
-)
 
-failed_jobs = dict()
-valid_jobs = dict()
-for rxn_id, (failed_job, valid_job) in zip(rxn_ids, out):
-    if failed_job:
-        failed_jobs[rxn_id] = failed_job
-    if valid_job:
-        valid_jobs[rxn_id] = valid_job
+    failed_jobs = dict()
+    valid_jobs = dict()
+    for rxn_id, (failed_job, valid_job) in zip(rxn_ids, out):
+        if failed_job:
+            failed_jobs[rxn_id] = failed_job
+        if valid_job:
+            valid_jobs[rxn_id] = valid_job
 
-with open(os.path.join(f"{output_file_name}.pkl"), "wb") as outfile:
-    pkl.dump(valid_jobs, outfile, protocol=pkl.HIGHEST_PROTOCOL)
+    with open(os.path.join(f"{output_file_name}.pkl"), "wb") as outfile:
+        pkl.dump(valid_jobs, outfile, protocol=pkl.HIGHEST_PROTOCOL)
 
-with open(os.path.join(f"{output_file_name}_failed.pkl"), "wb") as outfile:
-    pkl.dump(failed_jobs, outfile, protocol=pkl.HIGHEST_PROTOCOL)
+    with open(os.path.join(f"{output_file_name}_failed.pkl"), "wb") as outfile:
+        pkl.dump(failed_jobs, outfile, protocol=pkl.HIGHEST_PROTOCOL)
 
-print(f"Total number of molecules: {len(rxn_ids)}")
-print(f"Total number of failed molecules: {len(failed_jobs)}")
-print(failed_jobs)
+    print(f"Total number of molecules: {len(rxn_ids)}")
+    print(f"Total number of failed molecules: {len(failed_jobs)}")
+    print(failed_jobs)
+
+    valid_jobs_shards = [valid_jobs]
 
 rxn_id_to_DFT_opted_xyz_std_ori = {}
-for rxn_id, valid_job in valid_jobs.items():
-    rxn_id_to_DFT_opted_xyz_std_ori[rxn_id] = valid_job["dft_xyz_std_ori"]
+rxn_id_to_DFT_opted_xyz_input_ori = {}
+for valid_jobs in valid_jobs_shards:
+    for rxn_id, valid_job in valid_jobs.items():
+        rxn_id_to_DFT_opted_xyz_std_ori[rxn_id] = valid_job["dft_xyz_std_ori"]
+        rxn_id_to_DFT_opted_xyz_input_ori[rxn_id] = valid_job["dft_xyz_input_ori"]
 
 with open(os.path.join(f"{output_file_name}_xyz_std_ori.pkl"), "wb") as outfile:
     pkl.dump(rxn_id_to_DFT_opted_xyz_std_ori, outfile, protocol=pkl.HIGHEST_PROTOCOL)
 
-rxn_id_to_DFT_opted_xyz_input_ori = {}
-for rxn_id, valid_job in valid_jobs.items():
-    rxn_id_to_DFT_opted_xyz_input_ori[rxn_id] = valid_job["dft_xyz_input_ori"]
-
 with open(os.path.join(f"{output_file_name}_xyz_input_ori.pkl"), "wb") as outfile:
     pkl.dump(rxn_id_to_DFT_opted_xyz_input_ori, outfile, protocol=pkl.HIGHEST_PROTOCOL)
 
@@ -4,6 +4,8 @@ import pickle as pkl
 import pandas as pd
 from joblib import Parallel, delayed
 
+from autoqm.parser.parallel import sharded_parse
+
 
 class OrcaLog(object):
     def __init__(self, path):
@@ -93,12 +95,24 @@ def parser(mol_id, mol_smi):
     return failed_jobs, valid_job
 
 
-def main(input_smiles_path, output_file_name, n_jobs):
+def main(input_smiles_path, output_file_name, n_jobs, shard_dir=None):
 
     df = pd.read_csv(input_smiles_path)
     mol_ids = df["id"].tolist()
     mol_id_to_smi = dict(zip(df["id"].tolist(), df["smiles"].tolist()))
 
+    if shard_dir is not None:
+        manifest_df = sharded_parse(
+            parser,
+            [(mol_id, (mol_id, mol_id_to_smi[mol_id])) for mol_id in mol_ids],
+            output_file_name,
+            shard_dir,
+            n_jobs=n_jobs,
+        )
+        print(f"Total number of jobs: {len(mol_ids)}")
+        print(f"Number of failed jobs: {manifest_df.num_failed.sum()}")
+        return
+
     out = Parallel(n_jobs=n_jobs, backend="multiprocessing", verbose=5)(
         delayed(parser)(mol_id, mol_id_to_smi[mol_id]) for mol_id in mol_ids
     )
@@ -125,5 +139,6 @@ if __name__ == "__main__":
     input_smiles_path = sys.argv[1]
     output_file_name = sys.argv[2]
     n_jobs = int(sys.argv[3])
+    shard_dir = sys.argv[4] if len(sys.argv) > 4 else None
 
-    main(input_smiles_path, output_file_name, n_jobs)
+    main(input_smiles_path, output_file_name, n_jobs, shard_dir)
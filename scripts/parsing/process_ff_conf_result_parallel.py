@@ -8,18 +8,57 @@ import pickle as pkl
 from tqdm import tqdm
 from joblib import Parallel, delayed
 
+from autoqm.parser.connectivity import load_reference_connectivity
 from autoqm.parser.ff_conf_parser import ff_conf_parser
+from autoqm.parser.parallel import sharded_parse
 
 input_smiles_path = sys.argv[1]
 output_file_name = sys.argv[2]
 n_jobs = int(sys.argv[3])
+shard_dir = sys.argv[4] if len(sys.argv) > 4 and sys.argv[4] != "None" else None
+reference_connectivity_path = sys.argv[5] if len(sys.argv) > 5 else None
 
 df = pd.read_csv(input_smiles_path)
 mol_ids = list(df.id)
 mol_id_to_smi = dict(zip(df.id, df.smiles))
 
+mol_id_to_connectivity = dict()
+if reference_connectivity_path is not None:
+    mol_id_to_connectivity = load_reference_connectivity(
+        reference_connectivity_path, mol_ids, df.smiles
+    )
+
+if shard_dir is not None:
+    manifest_df = sharded_parse(
+        ff_conf_parser,
+        [
+            (
+                mol_id,
+                (
+                    mol_id,
+                    mol_id_to_smi[mol_id],
+                    None,
+                    mol_id_to_connectivity.get(mol_id),
+                ),
+            )
+            for mol_id in mol_ids
+        ],
+        output_file_name,
+        shard_dir,
+        n_jobs=n_jobs,
+    )
+    print(f"Total number of molecules: {len(mol_ids)}")
+    print(f"Total number of failed molecules: {manifest_df.num_failed.sum()}")
+    print("Done!")
+    sys.exit(0)
+
 out = Parallel(n_jobs=n_jobs, backend="multiprocessing", verbose=5)(
-    delayed(ff_conf_parser)(mol_id, mol_id_to_smi[mol_id]) for mol_id in tqdm(mol_ids)
+    delayed(ff_conf_parser)(
+        mol_id,
+        mol_id_to_smi[mol_id],
+        pre_connectivity=mol_id_to_connectivity.get(mol_id),
+    )
+    for mol_id in tqdm(mol_ids)
 )
 
 failed_jobs = dict()
@@ -5,14 +5,17 @@ import os
 import sys
 import pandas as pd
 import pickle as pkl
-from tqdm import tqdm
-from joblib import Parallel, delayed
 
+from autoqm.parser.connectivity import load_reference_connectivity
 from autoqm.parser.semiempirical_opt_parser import semiempirical_opt_parser
+from autoqm.parser.parallel import chunked_parse, sharded_parse
 
 input_smiles_path = sys.argv[1]
 output_file_name = sys.argv[2]
 n_jobs = int(sys.argv[3])
+shard_dir = sys.argv[4] if len(sys.argv) > 4 and sys.argv[4] != "None" else None
+chunk_size = int(sys.argv[5]) if len(sys.argv) > 5 else 100
+reference_connectivity_path = sys.argv[6] if len(sys.argv) > 6 else None
 
 ##
 # input_smiles_path = "inputs/reactants_products_aug11b_inputs.csv"
@@ -23,12 +26,39 @@ df = pd.read_csv(input_smiles_path)
 mol_id_to_smi = dict(zip(df.id, df.smiles))
 mol_ids = list(df.id)
 
+mol_id_to_connectivity = dict()
+if reference_connectivity_path is not None:
+    mol_id_to_connectivity = load_reference_connectivity(
+        reference_connectivity_path, mol_ids, df.smiles
+    )
+tasks = [
+    (
+        mol_id,
+        (mol_id, mol_id_to_smi[mol_id], None, mol_id_to_connectivity.get(mol_id)),
+    )
+    for mol_id in mol_ids
+]
+
 ##
 # mol_ids = mol_ids[:500]
 
-out = Parallel(n_jobs=n_jobs, backend="multiprocessing", verbose=5)(
-    delayed(semiempirical_opt_parser)(mol_id, mol_id_to_smi[mol_id])
-    for mol_id in tqdm(mol_ids)
+if shard_dir is not None:
+    manifest_df = sharded_parse(
+        semiempirical_opt_parser,
+        tasks,
+        output_file_name,
+        shard_dir,
+        n_jobs=n_jobs,
+    )
+    print(f"Total number of molecules: {len(mol_ids)}")
+    print(f"Total number of molecules with failed jobs: {manifest_df.num_failed.sum()}")
+    sys.exit(0)
+
+out = chunked_parse(
+    semiempirical_opt_parser,
+    tasks,
+    n_jobs=n_jobs,
+    chunk_size=chunk_size,
 )
 
 failed_jobs = dict()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# coding: utf-8
+import time
+import pickle as pkl
+from argparse import ArgumentParser
+
+import pandas as pd
+
+from autoqm.parser.connectivity import get_xyz_connectivity
+from autoqm.parser.parallel import chunked_parse
+
+parser = ArgumentParser()
+parser.add_argument(
+    "--xyz_path",
+    type=str,
+    required=True,
+    help="path to a .pkl file of {id: xyz string}, such as the _xyz_input_ori.pkl of the DFT parsing",
+)
+parser.add_argument(
+    "--output_file_name",
+    type=str,
+    required=True,
+    help="name of the .csv file listing the geometries whose connectivity differs",
+)
+parser.add_argument(
+    "--n_jobs",
+    type=int,
+    default=1,
+    help="number of jobs to run in parallel",
+)
+parser.add_argument(
+    "--chunk_size",
+    type=int,
+    default=1000,
+    help="number of geometries compared by a worker at a time",
+)
+args = parser.parse_args()
+
+
+def compare_backends(mol_id, xyz):
+    result = {"id": mol_id}
+    connectivities = dict()
+    for backend in ["numpy", "openbabel"]:
+        start_time = time.perf_counter()
+        try:
+            connectivities[backend] = get_xyz_connectivity(xyz, backend=backend)
+        except Exception as e:
+            result[f"{backend}_error"] = str(e)
+            connectivities[backend] = (0, [])
+        result[f"{backend}_time"] = time.perf_counter() - start_time
+
+    numpy_bonds = set(map(tuple, connectivities["numpy"][1]))
+    openbabel_bonds = set(map(tuple, connectivities["openbabel"][1]))
+    result["num_atoms"] = connectivities["openbabel"][0]
+    result["only_numpy"] = str(sorted(numpy_bonds - openbabel_bonds))
+    result["only_openbabel"] = str(sorted(openbabel_bonds - numpy_bonds))
+    result["same"] = numpy_bonds == openbabel_bonds
+    return result
+
+
+with open(args.xyz_path, "rb") as f:
+    mol_id_to_xyz = pkl.load(f)
+
+out = chunked_parse(
+    compare_backends,
+    [(mol_id, (mol_id, xyz)) for mol_id, xyz in mol_id_to_xyz.items()],
+    n_jobs=args.n_jobs,
+    chunk_size=args.chunk_size,
+)
+df = pd.DataFrame(out)
+df[~df["same"]].to_csv(f"{args.output_file_name}.csv", index=False)
+
+print(f"Total number of geometries: {len(df)}")
+print(f"Number of geometries with different connectivity: {(~df['same']).sum()}")
+for backend in ["numpy", "openbabel"]:
+    print(f"Mean {backend} time: {df[f'{backend}_time'].mean() * 1000:.3f} ms")
+print("Done!")
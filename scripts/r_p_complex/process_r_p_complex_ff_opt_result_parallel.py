@@ -4,34 +4,24 @@ from argparse import ArgumentParser
 import pandas as pd
 from joblib import Parallel, delayed
 from rdkit import Chem
-from rdmc.mol import RDKitMol
 
+from autoqm.calculation.geometry_store import get_shard_ids, iter_records, load_index
 
-def sdf_parser(sdf_file_path):
-    rxn_id = int(os.path.basename(sdf_file_path).split(".")[0].split("_")[1])
 
-    r_mol, p_mol, ts_mol = RDKitMol.FromFile(
-        sdf_file_path, removeHs=False, sanitize=False
-    )
+def load_r_p_complexes(store_dir, shard_id):
+    """
+    Load the reactions of a shard of the geometry store that passed the connectivity check.
+    """
+    out = []
+    for rxn_id, (r_mol, p_mol, ts_mol) in iter_records(
+        store_dir, shard_id, only_valid=True
+    ):
+        r_smi = r_mol.GetProp("_Name")
+        p_smi = p_mol.GetProp("_Name")
+        rxn_smi = ts_mol.GetProp("_Name")
+        out.append((rxn_id, r_smi, p_smi, rxn_smi, r_mol, p_mol, ts_mol))
+    return out
 
-    r_smi = r_mol.GetProp("_Name")
-    p_smi = p_mol.GetProp("_Name")
-    rxn_smi = ts_mol.GetProp("_Name")
-
-    pre_r_mol = RDKitMol.FromSmiles(r_smi, removeHs=False, sanitize=True)
-    pre_p_mol = RDKitMol.FromSmiles(p_smi, removeHs=False, sanitize=True)
-
-    pre_r_adj = pre_r_mol.GetAdjacencyMatrix()
-    pre_p_adj = pre_p_mol.GetAdjacencyMatrix()
-
-    r_adj = r_mol.GetAdjacencyMatrix()
-    if not (r_adj == pre_r_adj).all():
-        return None
-    p_adj = p_mol.GetAdjacencyMatrix()
-    if not (p_adj == pre_p_adj).all():
-        return None
-
-    return rxn_id, r_smi, p_smi, rxn_smi, r_mol._mol, p_mol._mol, ts_mol._mol
 
 parser = ArgumentParser()
 parser.add_argument(
@@ -40,9 +30,7 @@ parser.add_argument(
     required=True,
     help="input smiles included in a .csv file",
 )
-parser.add_argument(
-    "--output_name", type=str, required=True, help="output file name"
-)
+parser.add_argument("--output_name", type=str, required=True, help="output file name")
 parser.add_argument(
     "--num_tasks",
     type=int,
@@ -58,19 +46,18 @@ df = pd.read_csv(input_smiles_path)
 
 rxn_ids = df.id
 
-success_sdf_paths = []
-for root, dirs, files in os.walk("output/r_p_complex_ff_opt/outputs"):
-    for file in files:
-        if file.endswith(".sdf"):
-            success_sdf_paths.append(os.path.join(root, file))
+store_dir = "output/r_p_complex_ff_opt/outputs"
+
+shard_ids = get_shard_ids(store_dir)
+num_stored = sum(len(load_index(store_dir, shard_id)) for shard_id in shard_ids)
 
 out = Parallel(n_jobs=n_jobs, backend="multiprocessing", verbose=5)(
-    delayed(sdf_parser)(sdf_path) for sdf_path in success_sdf_paths
+    delayed(load_r_p_complexes)(store_dir, shard_id) for shard_id in shard_ids
 )
-out = [x for x in out if x is not None]
+out = [x for shard_out in out for x in shard_out]
 
 print(f"Total number of reactions: {len(rxn_ids)}")
-print(f"Number of successful TSs: {len(success_sdf_paths)}")
+print(f"Number of successful TSs: {num_stored}")
 print(f"Number of successful r complexes, p complexes, TSs: {len(out)}")
 
 success_rxn_ids = [x[0] for x in out]
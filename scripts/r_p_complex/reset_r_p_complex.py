@@ -1,10 +1,16 @@
 from argparse import ArgumentParser
+from collections import defaultdict
 import os
 import pickle as pkl
 import pandas as pd
+from joblib import Parallel, delayed
 from rdkit import Chem
 
-from autoqm.calculation.reset_r_p_complex import reset_r_p_complex_ff_opt
+from autoqm.calculation.geometry_store import load_index
+from autoqm.calculation.reset_r_p_complex import (
+    merge_r_p_complex_sdfs,
+    reset_r_p_complex_ff_opt_shard,
+)
 
 parser = ArgumentParser()
 parser.add_argument(
@@ -51,6 +57,46 @@ parser.add_argument(
     help="folder for reactant complex and product complex force field optimization",
 )
 
+# force field optimization settings
+parser.add_argument(
+    "--ff_max_step",
+    type=int,
+    default=2000,
+    help="maximum number of steps of each force field optimization",
+)
+parser.add_argument(
+    "--ff_tol",
+    type=float,
+    default=1e-8,
+    help="energy convergence criterion of each force field optimization, a larger value stops the optimizations earlier",
+)
+
+# batched mode
+parser.add_argument(
+    "--batched",
+    action="store_true",
+    help="process whole shards of reactions in a process pool and append them to one rxns_{shard_id}.sdf geometry store per shard",
+)
+parser.add_argument(
+    "--n_jobs",
+    type=int,
+    default=1,
+    help="number of shards processed in parallel in batched mode",
+)
+parser.add_argument(
+    "--shard_size",
+    type=int,
+    default=1000,
+    help="reactions with the same ts_id // shard_size are written to the same shard in batched mode",
+)
+
+# migration of the per-reaction sdf files
+parser.add_argument(
+    "--migrate_sdfs",
+    action="store_true",
+    help="one-time migration of the per-reaction rxn_{ts_id}.sdf files of earlier runs into the rxns_{shard_id}.sdf geometry store, the merged files are deleted",
+)
+
 # specify paths
 parser.add_argument(
     "--RDMC_path",
@@ -106,52 +152,93 @@ xyz_list = list(df[args.xyz_column])
 ts_id_to_rxn_smi = dict(zip(ts_ids, rxn_smiles_list))
 ts_id_to_dft_xyz = dict(zip(ts_ids, xyz_list))
 
-print("Making inputs...")
 tasks = list(zip(ts_ids, rxn_smiles_list, xyz_list))
-for ts_id, rxn_smi, dft_xyz in tasks[args.task_id :: args.num_tasks]:
-    ids = int(ts_id // 1000)
-    suboutputs_dir = os.path.join(outputs_dir, f"outputs_{ids}")
-    os.makedirs(suboutputs_dir, exist_ok=True)
-    if not os.path.exists(os.path.join(suboutputs_dir, f"rxn_{ts_id}.sdf")):
-        subinputs_dir = os.path.join(inputs_dir, f"inputs_{ids}")
-        os.makedirs(subinputs_dir, exist_ok=True)
-        if not os.path.exists(
-            os.path.join(subinputs_dir, f"rxn_{ts_id}.in")
-        ) and not os.path.exists(os.path.join(subinputs_dir, f"rxn_{ts_id}.tmp")):
-            ts_id_input_path = os.path.join(subinputs_dir, f"rxn_{ts_id}.in")
-            with open(ts_id_input_path, "w") as f:
-                f.write(rxn_smi)
-            print(ts_id)
-            print(rxn_smi)
-
-print("FF optimization for reactant and product complexes...")
-for _ in range(5):
-    for subinputs_folder in os.listdir(inputs_dir):
-        ids = subinputs_folder.split("_")[1]
-        subinputs_dir = os.path.join(inputs_dir, subinputs_folder)
-        suboutputs_dir = os.path.join(outputs_dir, f"outputs_{ids}")
-        for input_file in os.listdir(subinputs_dir):
-            if ".in" in input_file:
-                ts_id = int(input_file.split(".in")[0].split("rxn_")[1])
-                try:
-                    os.rename(
-                        os.path.join(subinputs_dir, input_file),
-                        os.path.join(subinputs_dir, f"rxn_{ts_id}.tmp"),
-                    )
-                except:
-                    continue
-                else:
-                    rxn_smi = ts_id_to_rxn_smi[ts_id]
-                    dft_xyz = ts_id_to_dft_xyz[ts_id]
-                    print(ts_id)
-                    print(rxn_smi)
-                    reset_r_p_complex_ff_opt(
-                        rxn_smi,
-                        dft_xyz,
-                        ts_id,
-                        subinputs_dir,
-                        suboutputs_dir,
-                        args.scratch_dir,
-                    )
+
+if args.migrate_sdfs:
+    print("Migrating per-reaction sdf files...")
+    shard_to_sdf_paths = defaultdict(list)
+    for root, dirs, files in os.walk(outputs_dir):
+        for file in files:
+            if file.startswith("rxn_") and file.endswith(".sdf"):
+                ts_id = int(file.split(".")[0].split("_")[1])
+                shard_to_sdf_paths[ts_id // 1000].append(os.path.join(root, file))
+    shard_ids = sorted(shard_to_sdf_paths)[args.task_id :: args.num_tasks]
+
+    num_merged = Parallel(n_jobs=args.n_jobs, backend="multiprocessing", verbose=5)(
+        delayed(merge_r_p_complex_sdfs)(
+            shard_to_sdf_paths[shard_id], outputs_dir, shard_id
+        )
+        for shard_id in shard_ids
+    )
+    print(f"Merged {sum(num_merged)} sdf files into the geometry store")
+
+elif args.batched:
+    print("Making shards...")
+    shard_to_tasks = defaultdict(list)
+    for ts_id, rxn_smi, dft_xyz in tasks:
+        shard_to_tasks[int(ts_id // args.shard_size)].append((ts_id, rxn_smi, dft_xyz))
+    shard_ids = sorted(shard_to_tasks)[args.task_id :: args.num_tasks]
+
+    print("FF optimization for reactant and product complexes...")
+    out = Parallel(n_jobs=args.n_jobs, backend="multiprocessing", verbose=5)(
+        delayed(reset_r_p_complex_ff_opt_shard)(
+            shard_to_tasks[shard_id],
+            outputs_dir,
+            shard_id,
+            max_step=args.ff_max_step,
+            tol=args.ff_tol,
+        )
+        for shard_id in shard_ids
+    )
+    num_tasks = sum(shard_out["num_tasks"] for shard_out in out)
+    num_stored = sum(shard_out["num_stored"] for shard_out in out)
+    num_success = sum(shard_out["num_success"] for shard_out in out)
+    print(
+        f"{num_success} of {num_tasks - num_stored} new reactions in {len(out)} shards succeeded"
+    )
+
+else:
+    print("Making inputs...")
+    shard_to_tasks = defaultdict(list)
+    for ts_id, rxn_smi, dft_xyz in tasks:
+        shard_to_tasks[int(ts_id // 1000)].append((ts_id, rxn_smi, dft_xyz))
+    os.makedirs(inputs_dir, exist_ok=True)
+    for shard_id in sorted(shard_to_tasks)[args.task_id :: args.num_tasks]:
+        stored_ids = set(load_index(outputs_dir, shard_id)["id"])
+        if all(ts_id in stored_ids for ts_id, _, _ in shard_to_tasks[shard_id]):
+            continue
+        shard_input_path = os.path.join(inputs_dir, f"rxns_{shard_id}.in")
+        if not os.path.exists(shard_input_path) and not os.path.exists(
+            os.path.join(inputs_dir, f"rxns_{shard_id}.tmp")
+        ):
+            with open(shard_input_path, "w") as f:
+                f.write("")
+            print(shard_id)
+
+    # each shard of the geometry store is claimed by one worker, which is its only writer
+    print("FF optimization for reactant and product complexes...")
+    for _ in range(5):
+        for input_file in os.listdir(inputs_dir):
+            if not (input_file.startswith("rxns_") and input_file.endswith(".in")):
+                continue
+            shard_id = int(input_file.split(".in")[0].split("rxns_")[1])
+            tmp_input_path = os.path.join(inputs_dir, f"rxns_{shard_id}.tmp")
+            try:
+                os.rename(os.path.join(inputs_dir, input_file), tmp_input_path)
+            except:
+                continue
+            else:
+                print(shard_id)
+                shard_out = reset_r_p_complex_ff_opt_shard(
+                    shard_to_tasks[shard_id],
+                    outputs_dir,
+                    shard_id,
+                    max_step=args.ff_max_step,
+                    tol=args.ff_tol,
+                )
+                print(
+                    f"{shard_out['num_success']} of {shard_out['num_tasks'] - shard_out['num_stored']} new reactions in shard {shard_id} succeeded"
+                )
+                os.remove(tmp_input_path)
 
 print("Done!")